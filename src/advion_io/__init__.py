@@ -6,17 +6,29 @@ on Linux, macOS and Windows alike.
 """
 from .data_reader import (
     DataReader,
+    SCAN_INDEX_DTYPE,
     DatxFile,
+    LazyIntensities,
+    MassStatistics,
     ScanIndex,
+    SpectrumCacheStats,
+    SpectrumPrefixSums,
     decode_intensities_blob,
 )
 from .data_writer import DataWriter, encode_intensities_blob
+from .live_reader import LiveReader
 
 __all__ = [
     "DataReader",
     "DataWriter",
     "DatxFile",
+    "LazyIntensities",
+    "LiveReader",
+    "MassStatistics",
+    "SCAN_INDEX_DTYPE",
     "ScanIndex",
+    "SpectrumCacheStats",
+    "SpectrumPrefixSums",
     "decode_intensities_blob",
     "encode_intensities_blob",
 ]
@@ -0,0 +1,180 @@
+"""Shared plumbing for jobs that read many ``.datx`` archives.
+
+:mod:`advion_io.catalog`, :mod:`advion_io.ion_index` and
+:mod:`advion_io.similarity` each process archives one per job, in worker
+processes, and report failures per file instead of aborting the batch
+(:func:`run_per_file`).  The two indexes also keep one shard directory
+per archive, named after its path and tagged with its content
+fingerprint.  A shard is written to a pending directory and renamed into
+place (:func:`staged_directory`), so a concurrent reader never sees half
+of one, and :func:`update_shards` rebuilds only the shards whose
+archive changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .data_reader import _Members
+
+__all__ = [
+    "PENDING_SUFFIX",
+    "collect_archives",
+    "fingerprint",
+    "iter_shards",
+    "run_per_file",
+    "shard_name",
+    "staged_directory",
+    "update_shards",
+]
+
+#: Suffix of shard directories that are still being written.
+PENDING_SUFFIX = ".pending"
+
+
+def run_per_file(
+    func: Callable[..., Any], jobs: list[tuple], workers: int | None
+) -> Iterator[tuple[str, Any]]:
+    """Run ``func(*job)`` for each job; yields ``(job[0], result)`` in job order.
+
+    ``job[0]`` is the archive path.  A job that raises yields its
+    exception as the result.  ``workers`` as for
+    :class:`concurrent.futures.ProcessPoolExecutor`; ``1`` (or a single
+    job) runs in-process.
+    """
+    if not jobs:
+        return
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            try:
+                yield job[0], func(*job)
+            except Exception as exc:  # noqa: BLE001 - reported per file
+                yield job[0], exc
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(job[0], pool.submit(func, *job)) for job in jobs]
+        for path, future in futures:
+            try:
+                yield path, future.result()
+            except Exception as exc:  # noqa: BLE001 - reported per file
+                yield path, exc
+
+
+def shard_name(path: str) -> str:
+    """Directory name of the shard for archive ``path``."""
+    return hashlib.sha256(path.encode("utf-8")).hexdigest()[:24]
+
+
+def fingerprint(path: str) -> str:
+    """Content fingerprint of the archive (or loose folder) at ``path``."""
+    members = _Members(Path(path))
+    try:
+        return members.fingerprint()
+    finally:
+        members.close()
+
+
+def collect_archives(paths: str | Path | Iterable[str | Path]) -> tuple[Path | None, list[str]]:
+    """Resolve ``paths`` to ``(root, archive paths)``.
+
+    A directory is walked recursively for ``.datx`` files and returned
+    as ``root``; a single path or an iterable of paths gives ``None``.
+    """
+    if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+        root = Path(paths).resolve()
+        return root, [str(p) for p in sorted(root.glob("**/*.datx"))]
+    if isinstance(paths, (str, Path)):
+        return None, [str(Path(paths).resolve())]
+    return None, [str(Path(p).resolve()) for p in paths]
+
+
+@contextmanager
+def staged_directory(target: Path) -> Iterator[Path]:
+    """Yield a fresh pending directory that replaces ``target`` on success.
+
+    On error the pending directory is removed and ``target`` is left
+    untouched.
+    """
+    pending = target.with_name(f"{target.name}.{uuid.uuid4().hex}{PENDING_SUFFIX}")
+    pending.mkdir()
+    try:
+        yield pending
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(pending, target)
+    except BaseException:
+        shutil.rmtree(pending, ignore_errors=True)
+        raise
+
+
+def iter_shards(root: Path, meta_name: str) -> Iterator[tuple[Path, dict]]:
+    """Yield ``(directory, meta)`` of every finished shard under ``root``."""
+    for entry in sorted(root.iterdir()):
+        meta_path = entry / meta_name
+        if entry.name.endswith(PENDING_SUFFIX) or not meta_path.is_file():
+            continue
+        yield entry, json.loads(meta_path.read_text(encoding="utf-8"))
+
+
+def update_shards(
+    paths: str | Path | Iterable[str | Path],
+    shards: Mapping[str, Any],
+    build: Callable[..., Any],
+    make_job: Callable[[str, str], tuple],
+    workers: int | None,
+    prepare: Callable[[str], None] | None = None,
+) -> tuple[int, int, int, int]:
+    """(Re)build the shards of new or changed archives.
+
+    ``shards`` maps indexed archive paths to objects with ``directory``
+    and ``fingerprint`` attributes.  For a directory ``paths``, shards of
+    archives under it that no longer exist are deleted.  Every other
+    archive whose fingerprint differs from its shard's is built by
+    running ``build(*make_job(path, fingerprint))`` through
+    :func:`run_per_file`.  ``prepare(path)``, if given, runs first for
+    each archive to be considered, in this process.
+
+    Returns ``(added, unchanged, removed, failed)``.
+    """
+    root, files = collect_archives(paths)
+    removed = 0
+    if root is not None:
+        prefix = os.path.join(str(root), "")
+        present = set(files)
+        for path in [p for p in shards if p.startswith(prefix) and p not in present]:
+            shutil.rmtree(shards[path].directory, ignore_errors=True)
+            removed += 1
+
+    jobs: list[tuple] = []
+    unchanged = failed = 0
+    for path in files:
+        try:
+            fp = fingerprint(path)
+            if prepare is not None:
+                prepare(path)
+        except Exception as exc:  # noqa: BLE001 - reported per file
+            logging.warning("could not index %s: %s", path, exc)
+            failed += 1
+            continue
+        shard = shards.get(path)
+        if shard is not None and shard.fingerprint == fp:
+            unchanged += 1
+        else:
+            jobs.append(make_job(path, fp))
+
+    added = 0
+    for path, result in run_per_file(build, jobs, workers):
+        if isinstance(result, BaseException):
+            logging.warning("could not index %s: %s", path, result)
+            failed += 1
+        else:
+            added += 1
+    return added, unchanged, removed, failed
@@ -0,0 +1,348 @@
+"""SQLite catalogue of a directory tree of ``.datx`` acquisitions.
+
+Answering questions such as "runs from instrument X in March whose TIC
+exceeds N" by reopening thousands of archives is slow.  :class:`Catalog`
+keeps one SQLite database with a row per acquisition (header fields,
+retention-time range, stored TIC summary) and a row per scan (time,
+stored TIC, base peak intensity and m/z), so such queries take
+milliseconds.
+
+Updates are incremental: a file is only re-read when its size or
+modification time changed, and rows for files that disappeared are
+dropped.  Files are summarised in parallel worker processes.
+
+The ``datx-catalog`` console script wraps this module::
+
+    datx-catalog update runs.sqlite /data/acquisitions
+    datx-catalog runs runs.sqlite --instrument CMS-0001 \\
+        --since 2026-03-01 --until 2026-04-01 --min-tic 1e9
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from .batch import run_per_file
+from .data_reader import DatxFile
+
+__all__ = ["Catalog", "CatalogUpdate", "main"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id               INTEGER PRIMARY KEY,
+    path             TEXT NOT NULL UNIQUE,
+    size             INTEGER NOT NULL,
+    mtime_ns         INTEGER NOT NULL,
+    date             TEXT,
+    acquired_at      TEXT,
+    instrument_id    TEXT,
+    hardware_type    TEXT,
+    software_version TEXT,
+    firmware_version TEXT,
+    data_type        TEXT,
+    num_spectra      INTEGER,
+    num_masses       INTEGER,
+    rt_start         REAL,
+    rt_end           REAL,
+    max_tic          REAL,
+    total_tic        REAL
+);
+CREATE INDEX IF NOT EXISTS runs_instrument_time ON runs (instrument_id, acquired_at);
+CREATE INDEX IF NOT EXISTS runs_acquired_at ON runs (acquired_at);
+CREATE INDEX IF NOT EXISTS runs_max_tic ON runs (max_tic);
+CREATE TABLE IF NOT EXISTS scans (
+    run_id              INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    scan                INTEGER NOT NULL,
+    time                REAL NOT NULL,
+    tic                 REAL NOT NULL,
+    base_peak_intensity REAL,
+    base_peak_mz        REAL,
+    PRIMARY KEY (run_id, scan)
+) WITHOUT ROWID;
+"""
+
+_RUN_COLUMNS = (
+    "path",
+    "size",
+    "mtime_ns",
+    "date",
+    "acquired_at",
+    "instrument_id",
+    "hardware_type",
+    "software_version",
+    "firmware_version",
+    "data_type",
+    "num_spectra",
+    "num_masses",
+    "rt_start",
+    "rt_end",
+    "max_tic",
+    "total_tic",
+)
+
+
+@dataclass(frozen=True)
+class CatalogUpdate:
+    """What one :meth:`Catalog.update` call did."""
+
+    added: int       # files (re-)summarised
+    unchanged: int   # files skipped because size and mtime matched
+    removed: int     # rows dropped for files that no longer exist
+    failed: int      # files that could not be read
+
+
+def _acquired_at(date: str) -> str | None:
+    """Convert the ``.scans`` date (``2026.05.07 14:36:10``) to ISO 8601."""
+    try:
+        return _dt.datetime.strptime(date, "%Y.%m.%d %H:%M:%S").isoformat()
+    except ValueError:
+        return None
+
+
+def _summarise(path: str, base_peaks: bool) -> tuple[dict, list[tuple]]:
+    """Read one archive; returns its ``runs`` row and its ``scans`` rows.
+
+    Top-level so it can run in a worker process.  Without ``base_peaks``
+    only the metadata is read (see :meth:`DatxFile.open_metadata`).
+    """
+    st = os.stat(path)
+    with DatxFile(path, spectra=base_peaks, cache_bytes=0) as dx:
+        times = dx.retention_times
+        tic = dx.tic
+        n = dx.num_spectra
+        run = {
+            "path": path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "date": dx.date,
+            "acquired_at": _acquired_at(dx.date),
+            "instrument_id": dx.hardware_id,
+            "hardware_type": dx.metadata.meta.hardware_type,
+            "software_version": dx.software_version,
+            "firmware_version": dx.firmware_version,
+            "data_type": dx.data_type,
+            "num_spectra": n,
+            "num_masses": dx.num_masses,
+            "rt_start": float(times[0]) if n else None,
+            "rt_end": float(times[-1]) if n else None,
+            "max_tic": float(tic.max()) if n else None,
+            "total_tic": float(tic.sum()),
+        }
+        bp_intensity: list[float | None] = [None] * n
+        bp_mz: list[float | None] = [None] * n
+        if base_peaks and n and dx.num_masses:
+            masses = dx.masses
+            for i, spectrum in enumerate(dx.iter_spectra()):
+                j = int(np.argmax(spectrum))
+                bp_intensity[i] = float(spectrum[j])
+                bp_mz[i] = float(masses[j])
+        scans = list(
+            zip(range(n), times.tolist(), tic.tolist(), bp_intensity, bp_mz)
+        )
+    return run, scans
+
+
+class Catalog:
+    """A SQLite catalogue of ``.datx`` files.
+
+    Parameters
+    ----------
+    db_path:
+        Database file; created (with its schema) if absent.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self._db = sqlite3.connect(self.db_path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    # -- updating -------------------------------------------------------
+
+    def update(
+        self,
+        root: str | Path,
+        workers: int | None = None,
+        base_peaks: bool = True,
+    ) -> CatalogUpdate:
+        """Bring the catalogue in line with every ``.datx`` under ``root``.
+
+        Parameters
+        ----------
+        root:
+            Directory to walk recursively.
+        workers:
+            Worker processes for reading files; ``None`` uses the CPU
+            count and ``1`` reads in-process.
+        base_peaks:
+            Decode spectra to record each scan's base peak.  Without it
+            only metadata is read, which is much faster.
+        """
+        root = Path(root).resolve()
+        # Only rows under ``root`` take part in pruning.  Compare a plain
+        # prefix: ``LIKE`` would treat ``_`` and ``%`` in paths as wildcards.
+        prefix = os.path.join(str(root), "")
+        known = {
+            row["path"]: (row["size"], row["mtime_ns"])
+            for row in self._db.execute(
+                "SELECT path, size, mtime_ns FROM runs WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+        }
+        todo: list[str] = []
+        unchanged = 0
+        present: set[str] = set()
+        for path in sorted(root.glob("**/*.datx")):
+            key = str(path)
+            present.add(key)
+            st = path.stat()
+            if known.get(key) == (st.st_size, st.st_mtime_ns):
+                unchanged += 1
+            else:
+                todo.append(key)
+
+        gone = [p for p in known if p not in present]
+        with self._db:
+            self._db.executemany("DELETE FROM runs WHERE path = ?", [(p,) for p in gone])
+
+        added = failed = 0
+        jobs = [(path, base_peaks) for path in todo]
+        for path, result in run_per_file(_summarise, jobs, workers):
+            if isinstance(result, BaseException):
+                logging.warning("could not catalogue %s: %s", path, result)
+                failed += 1
+                continue
+            self._store(*result)
+            added += 1
+        return CatalogUpdate(added=added, unchanged=unchanged, removed=len(gone), failed=failed)
+
+    def _store(self, run: dict, scans: list[tuple]) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM runs WHERE path = ?", (run["path"],))
+            cur = self._db.execute(
+                f"INSERT INTO runs ({', '.join(_RUN_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_RUN_COLUMNS))})",
+                [run[c] for c in _RUN_COLUMNS],
+            )
+            run_id = cur.lastrowid
+            self._db.executemany(
+                "INSERT INTO scans VALUES (?, ?, ?, ?, ?, ?)",
+                ((run_id, *scan) for scan in scans),
+            )
+
+    # -- querying -------------------------------------------------------
+
+    def find_runs(
+        self,
+        instrument_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        min_tic: float | None = None,
+    ) -> list[sqlite3.Row]:
+        """Return runs matching every given filter, oldest first.
+
+        ``since`` / ``until`` are ISO dates or date-times compared with
+        the acquisition time (``until`` is exclusive); ``min_tic`` keeps
+        runs with at least one scan whose stored TIC exceeds it.
+        """
+        where: list[str] = []
+        params: list[object] = []
+        if instrument_id is not None:
+            where.append("instrument_id = ?")
+            params.append(instrument_id)
+        if since is not None:
+            where.append("acquired_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("acquired_at < ?")
+            params.append(until)
+        if min_tic is not None:
+            where.append("max_tic > ?")
+            params.append(float(min_tic))
+        sql = "SELECT * FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY acquired_at, path"
+        return self._db.execute(sql, params).fetchall()
+
+    def scans(self, path: str | Path) -> list[sqlite3.Row]:
+        """Return the per-scan summaries of one catalogued file."""
+        return self._db.execute(
+            "SELECT scans.* FROM scans JOIN runs ON runs.id = scans.run_id "
+            "WHERE runs.path = ? ORDER BY scan",
+            (str(Path(path).resolve()),),
+        ).fetchall()
+
+    def query(self, sql: str, params: Iterable[object] = ()) -> list[sqlite3.Row]:
+        """Run an arbitrary read query against the catalogue."""
+        return self._db.execute(sql, tuple(params)).fetchall()
+
+
+# ---------------------------------------------------------------------------
+# Console script
+# ---------------------------------------------------------------------------
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="datx-catalog", description="Catalogue .datx acquisitions in SQLite."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    upd = sub.add_parser("update", help="scan a directory tree into the catalogue")
+    upd.add_argument("database")
+    upd.add_argument("root")
+    upd.add_argument("--workers", type=int, default=None)
+    upd.add_argument(
+        "--no-base-peaks",
+        action="store_true",
+        help="read metadata only; skip decoding spectra for base peaks",
+    )
+
+    runs = sub.add_parser("runs", help="list catalogued runs")
+    runs.add_argument("database")
+    runs.add_argument("--instrument")
+    runs.add_argument("--since", help="ISO date, inclusive")
+    runs.add_argument("--until", help="ISO date, exclusive")
+    runs.add_argument("--min-tic", type=float)
+
+    args = parser.parse_args(argv)
+    with Catalog(args.database) as catalog:
+        if args.command == "update":
+            result = catalog.update(
+                args.root, workers=args.workers, base_peaks=not args.no_base_peaks
+            )
+            print(
+                f"added {result.added}, unchanged {result.unchanged}, "
+                f"removed {result.removed}, failed {result.failed}"
+            )
+        else:
+            for row in catalog.find_runs(
+                args.instrument, args.since, args.until, args.min_tic
+            ):
+                print(
+                    f"{row['acquired_at'] or row['date']}\t{row['instrument_id']}\t"
+                    f"{row['num_spectra']}\t{row['max_tic']}\t{row['path']}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -33,22 +33,39 @@ The per-scan binary format used inside ``.spectra`` is decoded by
 """
 from __future__ import annotations
 
+import hashlib
+import mmap
+import os
 import re
 import struct
+import warnings
 import zipfile
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, Sequence
+from typing import TYPE_CHECKING, Iterator, Sequence
 from xml.etree import ElementTree as ET
 
 import numpy as np
 
 from .constants import AdvionDataErrorCode
+from .decoded_cache import DecodedCache
+from .metadata import DatxMetadata, Segment
+
+if TYPE_CHECKING:
+    from .live_reader import LiveReader
 
 __all__ = [
     "DataReader",
     "DatxFile",
+    "LazyIntensities",
+    "MassStatistics",
+    "SCAN_INDEX_DTYPE",
     "ScanIndex",
+    "SpectrumCacheStats",
+    "SpectrumPrefixSums",
     "decode_intensities_blob",
 ]
 
@@ -68,6 +85,130 @@ _SCAN_RE = re.compile(
 )
 
 
+# Blanking the tags of the ``<scan>`` section leaves a plain table of
+# numbers.  Doing it with C-level ``bytes`` passes is several times
+# faster than a regex: first drop every tag letter except the exponent
+# ``e``/``E`` (so ``<time>`` becomes ``<e>``), then blank what is left.
+_SCAN_TAG_LETTERS = bytes(
+    c for c in range(256) if chr(c).isascii() and chr(c).isalpha() and chr(c) not in "eE"
+)
+_SCAN_TAG_PUNCT = bytes.maketrans(b"<>/", b"   ")
+
+#: Record layout of :attr:`DatxFile.scan_index`.
+SCAN_INDEX_DTYPE = np.dtype(
+    [("time", "<f8"), ("offset", "<i8"), ("size", "<i8"), ("tic", "<f8")]
+)
+
+
+def _split_scans_xml(data: bytes) -> tuple[str, bytes]:
+    """Split ``.scans`` into its header text and the ``<scan>`` records."""
+    cut = data.find(b"<scan>")
+    if cut < 0:
+        return data.decode("utf-8"), b""
+    return data[:cut].decode("utf-8"), data[cut:]
+
+
+def _parse_scan_records(body: bytes) -> np.ndarray:
+    """Parse a run of ``<scan>`` records into an ``(n, 4)`` float64 table.
+
+    Columns are time, byte offset, byte size and TIC.  All numbers are
+    converted in one :func:`numpy.fromstring` call once the tags are
+    blanked out (see :data:`_SCAN_TAG_LETTERS`).  If that fails, or does
+    not yield exactly four numbers per record (unexpected element order
+    or extra children), we fall back to the stricter per-record
+    :data:`_SCAN_RE`.
+    """
+    n = body.count(b"<scan>")
+    if n == 0:
+        return np.zeros((0, 4), dtype=np.float64)
+    text = body.translate(None, _SCAN_TAG_LETTERS)
+    text = text.replace(b"</e>", b" ").replace(b"<e>", b" ").translate(_SCAN_TAG_PUNCT)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            values = np.fromstring(text, dtype=np.float64, sep=" ")
+        except ValueError:
+            # Leftover text numpy cannot split; let the regex decide.
+            values = np.empty(0)
+    if values.size == 4 * n:
+        return values.reshape(n, 4)
+    records = _SCAN_RE.findall(body.decode("ascii", errors="replace"))
+    return np.array(records, dtype=np.float64).reshape(-1, 4)
+
+
+# Optional binary scan-index sidecar (``<root>.scanidx``), written by
+# :meth:`advion_io.DataWriter.create_datx_file` next to the ``.scans``
+# XML.  Layout, all little-endian:
+#
+#   * 32-byte header: 8-byte magic, uint32 version, uint32 reserved,
+#     uint64 scan count, uint32 CRC-32 of the payload, 4 pad bytes.
+#   * payload: the four index columns back to back — float64 times,
+#     int64 offsets, int64 sizes, float64 TICs — ``count`` values each.
+#
+# The vendor reader ignores members it does not know about.
+SCAN_INDEX_SIDECAR_EXT = ".scanidx"
+_SIDECAR_MAGIC = b"ADVSCIDX"
+_SIDECAR_VERSION = 1
+_SIDECAR_HEADER = struct.Struct("<8sIIQI4x")
+_SIDECAR_COLUMNS = ("<f8", "<i8", "<i8", "<f8")
+
+
+def _render_scan_index_sidecar(table: np.ndarray) -> bytes:
+    """Serialise an ``(n, 4)`` scan table (see :func:`_parse_scan_records`)."""
+    payload = b"".join(
+        np.ascontiguousarray(table[:, k]).astype(dtype).tobytes()
+        for k, dtype in enumerate(_SIDECAR_COLUMNS)
+    )
+    header = _SIDECAR_HEADER.pack(
+        _SIDECAR_MAGIC, _SIDECAR_VERSION, 0, table.shape[0], zlib.crc32(payload)
+    )
+    return header + payload
+
+
+def _read_scan_index_sidecar(data: bytes) -> tuple[np.ndarray, ...] | None:
+    """Inverse of :func:`_render_scan_index_sidecar`.
+
+    Returns the four index columns as read-only views into ``data``, or
+    ``None`` for anything that is not a complete, intact sidecar of a
+    known version, so callers can fall back to the XML.
+    """
+    if len(data) < _SIDECAR_HEADER.size:
+        return None
+    magic, version, _reserved, count, crc = _SIDECAR_HEADER.unpack_from(data)
+    if magic != _SIDECAR_MAGIC or version != _SIDECAR_VERSION:
+        return None
+    payload = memoryview(data)[_SIDECAR_HEADER.size :]
+    if len(payload) != 32 * count or zlib.crc32(payload) != crc:
+        return None
+    return tuple(
+        np.frombuffer(payload, dtype=dtype, count=count, offset=8 * count * k)
+        for k, dtype in enumerate(_SIDECAR_COLUMNS)
+    )
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    """Mark ``arr`` read-only so it can be handed out without copying."""
+    arr.flags.writeable = False
+    return arr
+
+
+def _uniform_step(axis: np.ndarray) -> float:
+    """Spacing of an evenly spaced, increasing axis, or ``0.0`` if it is not.
+
+    Allows 1 % jitter in the spacing, which covers the float32 rounding
+    of stored mass axes.
+    """
+    if axis.size < 2:
+        return 0.0
+    step = (float(axis[-1]) - float(axis[0])) / (axis.size - 1)
+    if step <= 0:
+        return 0.0
+    ideal = float(axis[0]) + step * np.arange(axis.size)
+    if np.max(np.abs(axis - ideal)) > 0.01 * step:
+        return 0.0
+    return step
+
+
 def _strip_ns(tag: str) -> str:
     """Return the local tag name (``{ns}foo`` \u2192 ``foo``)."""
     return tag.rsplit("}", 1)[-1] if "}" in tag else tag
@@ -83,6 +224,71 @@ class ScanIndex:
     tic: float           # advertised total ion current
 
 
+@dataclass(frozen=True)
+class SpectrumCacheStats:
+    """Counters for the decoded-spectrum cache of a :class:`DatxFile`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    resident_bytes: int      # bytes of decoded spectra currently held
+    capacity_bytes: int | None  # budget; ``None`` means unbounded
+
+
+@dataclass(frozen=True, eq=False)
+class MassStatistics:
+    """Per-m/z summary of a set of scans (see :meth:`DatxFile.mass_statistics`).
+
+    ``variance`` is the population variance.  Statistics of disjoint
+    scan sets combine exactly with :meth:`merge`.
+    """
+
+    count: int                    # number of scans summarised
+    mean: np.ndarray              # float64, shape (num_masses,)
+    variance: np.ndarray          # float64
+    max: np.ndarray               # float32
+    nonzero_fraction: np.ndarray  # float64, share of scans with signal
+
+    @classmethod
+    def of_block(cls, rows: np.ndarray) -> "MassStatistics":
+        """Statistics of the scans in the rows of ``rows``."""
+        rows = np.asarray(rows)
+        mean = rows.mean(axis=0, dtype=np.float64)
+        deviation = rows - mean
+        m2 = np.einsum("ij,ij->j", deviation, deviation)
+        return cls(
+            count=rows.shape[0],
+            mean=mean,
+            variance=m2 / rows.shape[0],
+            max=rows.max(axis=0).astype(np.float32),
+            nonzero_fraction=np.count_nonzero(rows, axis=0) / rows.shape[0],
+        )
+
+    def merge(self, other: "MassStatistics") -> "MassStatistics":
+        """Statistics of the union of two disjoint scan sets (Chan et al.)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        m2 = (
+            self.variance * self.count
+            + other.variance * other.count
+            + delta * delta * (self.count * other.count / n)
+        )
+        return MassStatistics(
+            count=n,
+            mean=self.mean + delta * (other.count / n),
+            variance=m2 / n,
+            max=np.maximum(self.max, other.max),
+            nonzero_fraction=(
+                self.nonzero_fraction * self.count
+                + other.nonzero_fraction * other.count
+            ) / n,
+        )
+
+
 # ---------------------------------------------------------------------------
 # Per-scan decoder
 # ---------------------------------------------------------------------------
@@ -137,6 +343,8 @@ _BIT_REVERSE_TABLE = np.array(
 def decode_intensities_blob(
     chunk: bytes | memoryview,
     samples_per_scan: int,
+    start: int = 0,
+    stop: int | None = None,
 ) -> np.ndarray:
     """Decode one scan from its raw ``.spectra`` byte slice.
 
@@ -149,14 +357,20 @@ def decode_intensities_blob(
     samples_per_scan:
         ``samplesPerScan`` from the ``.scans`` XML (typically 11999 for
         an m/z 100\u2013700 acquisition at 0.05 spacing).
+    start, stop:
+        Decode only samples ``start:stop`` (default: all).  Decoding
+        stops as soon as ``stop`` is reached, so a low mass window costs
+        a fraction of a full scan.
 
     Returns
     -------
     numpy.ndarray
-        Shape ``(samples_per_scan,)``, dtype ``float32``; values match
+        Shape ``(stop - start,)``, dtype ``float32``; values match
         what the Advion reference implementation hands back for the same
         scan.
     """
+    stop = samples_per_scan if stop is None else min(stop, samples_per_scan)
+    start = max(0, min(start, stop))
     if len(chunk) < 14:
         raise ValueError("scan chunk too short for header")
 
@@ -206,7 +420,7 @@ def decode_intensities_blob(
         else:
             v = 0
 
-        if out_idx >= samples_per_scan:
+        if out_idx >= stop:
             break
 
         if stream1[g] > 0:
@@ -228,16 +442,136 @@ def decode_intensities_blob(
                 d_used += 1
             out_idx += ext
 
-        # Run-length pad: ``stream1[g] - 1`` more copies of ``v``.
-        for k in range(1, stream1[g]):
-            pos = out_idx + k
-            if pos >= samples_per_scan:
-                break
-            out[pos] = v
+        # Run-length pad: ``stream1[g] - 1`` more copies of ``v``.  The
+        # padded samples have not been written yet, so zero runs (the
+        # bulk of a scan) need no work at all.
+        run = stream1[g]
+        if v != 0 and run > 1:
+            out[out_idx + 1 : min(out_idx + run, samples_per_scan)] = v
+
+        out_idx += run
+
+    return out[start:stop].astype(np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Archive members
+# ---------------------------------------------------------------------------
 
-        out_idx += stream1[g]
 
-    return out.astype(np.float32, copy=False)
+class _Members(Mapping):
+    """Lazily loaded members of a ``.datx`` archive or loose folder.
+
+    Each entry is indexed three ways for convenience: by full path
+    (``"<stem>/<stem>.spectra"``), by basename (``"<stem>.spectra"``)
+    and by extension (``".spectra"``; first file with that extension
+    wins).  Only the zip central directory (or the folder listing) is
+    read up front; a member's bytes are read, or memory-mapped for
+    loose folders, on first access and then kept.
+    """
+
+    def __init__(self, path: Path):
+        self._names: dict[str, str] = {}
+        self._sources: dict[str, zipfile.ZipInfo | Path] = {}
+        self._blobs: dict[str, bytes | mmap.mmap] = {}
+        self._maps: list[mmap.mmap] = []
+        self._zip: zipfile.ZipFile | None = None
+        if path.is_dir():
+            # Prefix names with the folder name so they look exactly
+            # like the paths inside the zipped archive.
+            for p in sorted(path.iterdir()):
+                if p.is_file():
+                    self._add(f"{path.name}/{p.name}", p)
+        else:
+            self._zip = zipfile.ZipFile(path, "r")
+            for info in self._zip.infolist():
+                if not info.is_dir():
+                    self._add(info.filename, info)
+
+    def _add(self, name: str, source: zipfile.ZipInfo | Path) -> None:
+        self._sources[name] = source
+        basename = name.rsplit("/", 1)[-1]
+        self._names[name] = name
+        self._names.setdefault(basename, name)
+        if "." in basename:
+            ext = "." + basename.rsplit(".", 1)[-1]
+            self._names.setdefault(ext, name)
+
+    def __getitem__(self, key: str) -> bytes | mmap.mmap:
+        name = self._names[key]
+        blob = self._blobs.get(name)
+        if blob is None:
+            source = self._sources[name]
+            if isinstance(source, Path):
+                blob = self._map_file(source)
+            else:
+                blob = self._zip.read(source)
+            self._blobs[name] = blob
+        return blob
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def fingerprint(self) -> str:
+        """Identify the content without reading any member.
+
+        Archives use each member's name, CRC-32 and size from the
+        central directory; loose folders use name, size and mtime.
+        """
+        digest = hashlib.sha256()
+        for name in sorted(self._sources):
+            source = self._sources[name]
+            if isinstance(source, Path):
+                st = source.stat()
+                fields = (name, st.st_size, st.st_mtime_ns)
+            else:
+                fields = (name, source.CRC, source.file_size)
+            digest.update(repr(fields).encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def head(self, key: str, size: int) -> bytes:
+        """Return up to the first ``size`` bytes of a member.
+
+        Archive members are decompressed only as far as needed.
+        """
+        name = self._names[key]
+        blob = self._blobs.get(name)
+        source = self._sources[name]
+        if blob is None and isinstance(source, zipfile.ZipInfo):
+            with self._zip.open(source) as fh:
+                return fh.read(size)
+        return self[key][:size]
+
+    def _map_file(self, path: Path) -> bytes | mmap.mmap:
+        """Return a read-only map of ``path`` (``b""`` for empty files)."""
+        with path.open("rb") as fh:
+            if fh.seek(0, 2) == 0:
+                # ``mmap`` refuses zero-length files.
+                return b""
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def close(self) -> None:
+        """Drop loaded members and release the archive and any maps."""
+        self._blobs.clear()
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # A caller still holds a view (e.g. ``np.frombuffer``);
+                # the map is released once that view is collected.
+                pass
+        self._maps.clear()
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
 
 
 # ---------------------------------------------------------------------------
@@ -248,10 +582,36 @@ def decode_intensities_blob(
 class DatxFile:
     """Read an Advion ``.datx`` archive without any vendor code.
 
-    The class can be used as a context manager.  Once opened, all the
-    interesting binary parts of the archive are kept in memory; for a
-    typical ~2 MB file this is fine.  Spectra are decoded lazily and
-    cached.
+    The class can be used as a context manager.  Archive members are
+    read on first access and then kept in memory; for a typical ~2 MB
+    file this is fine.  Spectra are decoded lazily and cached.  When the
+    archive carries the binary scan-index sidecar written by
+    ``DataWriter.create_datx_file(scan_index=True)`` it is used in place
+    of parsing the ``.scans`` XML.
+
+    ``cache_bytes`` bounds the memory spent on decoded spectra.  The
+    default (``None``) keeps every decoded scan; a smaller budget keeps
+    the most recently used scans and evicts the rest; ``0`` disables
+    caching for one-pass streaming jobs.  See :attr:`cache_stats`.
+
+    ``cache_dir`` enables a persistent decoded cache (see
+    :class:`advion_io.decoded_cache.DecodedCache`): the first full decode
+    is written there as ``.npy`` files, and later opens of the same
+    archive memory-map them, so :attr:`intensities` is available at once
+    and out-of-core.  Decoded rows then live in that memmap and
+    ``cache_bytes`` does not apply.  ``cache_dir_bytes`` caps the size of
+    the cache directory.
+
+    ``spectra=False`` (or :meth:`open_metadata`) opens only what is
+    needed for cataloguing: the central directory and the ``.scans``
+    index, plus ``.meta`` and the other text members on demand.  Header
+    fields, the scan index and the mass axis are available; asking for
+    spectra raises :class:`RuntimeError`.
+
+    ``path`` may also name the loose ``<folder>/<root_name>/`` directory
+    that :class:`advion_io.DataWriter` fills before zipping.  Members
+    are then memory-mapped rather than read, so a finished run can be
+    analysed without the zip/unzip round-trip.
     """
 
     # File extensions inside the archive.  Each archive contains a
@@ -264,13 +624,40 @@ class DatxFile:
     _METHOD_EXT = ".method"
     _TUNE_EXT = ".tune"
     _ION_EXT = ".ion"
+    _SCAN_INDEX_EXT = SCAN_INDEX_SIDECAR_EXT
 
-    def __init__(self, path: str | Path):
+    def __init__(
+        self,
+        path: str | Path,
+        cache_bytes: int | None = None,
+        cache_dir: str | Path | None = None,
+        cache_dir_bytes: int | None = None,
+        spectra: bool = True,
+    ):
+        if cache_bytes is not None and cache_bytes < 0:
+            raise ValueError("cache_bytes must be >= 0 or None")
         self.path = Path(path)
-        self._files: dict[str, bytes] = {}
-        self._load()
-
-        scans_xml = self._text(self._SCANS_EXT)
+        self.has_spectra = bool(spectra)
+        self._files = _Members(self.path)
+        self._check_required()
+
+        # Prefer the binary scan-index sidecar; then only the ``.scans``
+        # header needs reading.  Fall back to parsing the XML records.
+        columns = None
+        sidecar = self._raw(self._SCAN_INDEX_EXT)
+        if sidecar is not None:
+            columns = _read_scan_index_sidecar(sidecar)
+        if columns is None:
+            scans_xml, records = _split_scans_xml(self._raw(self._SCANS_EXT))
+            table = _parse_scan_records(records)
+            columns = (
+                np.ascontiguousarray(table[:, 0]),
+                table[:, 1].astype(np.int64),
+                table[:, 2].astype(np.int64),
+                np.ascontiguousarray(table[:, 3]),
+            )
+        else:
+            scans_xml = self._scans_header()
         self.samples_per_scan = self._extract_int(scans_xml, "samplesPerScan")
         self.data_type = self._extract_text(scans_xml, "dataType")
         self.store_as_float = (
@@ -281,13 +668,70 @@ class DatxFile:
         self.hardware_id = self._extract_text(scans_xml, "hardwareID", "")
         self.date = self._extract_text(scans_xml, "date", "")
 
-        self.scans: list[ScanIndex] = [
-            ScanIndex(time=float(t), offset=int(o), size=int(s), tic=float(tic))
-            for t, o, s, tic in _SCAN_RE.findall(scans_xml)
-        ]
+        # Struct-of-arrays scan index: one contiguous column per field.
+        (
+            self._scan_times,
+            self._scan_offsets,
+            self._scan_sizes,
+            self._scan_tics,
+        ) = columns
+        self._scan_index: np.ndarray | None = None
+        self._scans: list[ScanIndex] | None = None
+
+        # Read-only axes, built once and shared by every caller.
+        self._masses: np.ndarray | None = None
+        self._retention_times: np.ndarray | None = None
+        self._tic: np.ndarray | None = None
+        # Axis properties for the value-based selectors; see
+        # :meth:`_search_masses`.  ``0.0`` means "not uniform".
+        self._mass_step: float | None = None
+        self._times_sorted: bool | None = None
+        self._prefix_sums: SpectrumPrefixSums | None = None
+        self._metadata: DatxMetadata | None = None
+
+        # Decoded spectra live in one ``(num_spectra, num_masses)`` store,
+        # allocated on first decode; ``_decoded`` flags the filled rows.
+        # ``np.empty`` only commits memory for rows actually written.
+        self._store: np.ndarray | None = None
+        self._store_view: np.ndarray | None = None
+        self._decoded = np.zeros(self.num_spectra, dtype=bool)
+
+        # A budget smaller than the whole file switches to an LRU of
+        # independent rows, so evicting a scan never overwrites an array
+        # a caller still holds.  ``None`` means "unbounded store".
+        self._cache_bytes = cache_bytes
+        self._cache_rows: int | None = None
+        row_bytes = 4 * self.num_masses
+        if cache_bytes is not None and cache_bytes < row_bytes * self.num_spectra:
+            self._cache_rows = cache_bytes // row_bytes if row_bytes else 0
+        self._lru: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._n_decoded = 0
+
+        self._disk_cache: DecodedCache | None = None
+        self._pending_entry: Path | None = None
+        if cache_dir is not None and self.has_spectra:
+            self._disk_cache = DecodedCache(cache_dir, cache_dir_bytes)
+            self._cache_key = self._files.fingerprint()
+            self._cache_rows = None
+            self._load_disk_cache()
+
+    @classmethod
+    def open_metadata(cls, path: str | Path) -> "DatxFile":
+        """Open ``path`` for metadata only; shorthand for ``spectra=False``."""
+        return cls(path, spectra=False)
+
+    @staticmethod
+    def follow(folder: str | Path, poll_interval: float = 0.05) -> "LiveReader":
+        """Tail the loose folder of an acquisition that is still running.
+
+        See :class:`advion_io.live_reader.LiveReader`.
+        """
+        from .live_reader import LiveReader
 
-        self._spectra_cache: list[np.ndarray | None] = [None] * len(self.scans)
-        self._all_intensities: np.ndarray | None = None
+        return LiveReader(folder, poll_interval=poll_interval)
 
     # -- context manager helpers ----------------------------------------
 
@@ -299,16 +743,54 @@ class DatxFile:
 
     def close(self) -> None:
         """Drop all cached data and references."""
-        self._files.clear()
-        self._spectra_cache = []
-        self._all_intensities = None
+        self._files.close()
+        self._store = None
+        self._store_view = None
+        self._decoded = np.zeros(0, dtype=bool)
+        self._lru.clear()
+        self._prefix_sums = None
+        if self._pending_entry is not None:
+            self._disk_cache.discard(self._pending_entry)
+            self._pending_entry = None
 
     # -- public API -----------------------------------------------------
 
     @property
     def num_spectra(self) -> int:
         """Number of acquired scans."""
-        return len(self.scans)
+        return self._scan_times.shape[0]
+
+    @property
+    def scan_index(self) -> np.ndarray:
+        """The ``.scans`` index as a read-only :data:`SCAN_INDEX_DTYPE` array."""
+        if self._scan_index is None:
+            index = np.empty(self.num_spectra, dtype=SCAN_INDEX_DTYPE)
+            index["time"] = self._scan_times
+            index["offset"] = self._scan_offsets
+            index["size"] = self._scan_sizes
+            index["tic"] = self._scan_tics
+            index.flags.writeable = False
+            self._scan_index = index
+        return self._scan_index
+
+    @property
+    def scans(self) -> list[ScanIndex]:
+        """The scan index as :class:`ScanIndex` objects.
+
+        Kept for backward compatibility; built on first access.  Prefer
+        :attr:`scan_index` or the array properties for large runs.
+        """
+        if self._scans is None:
+            self._scans = [
+                ScanIndex(time=t, offset=o, size=s, tic=tic)
+                for t, o, s, tic in zip(
+                    self._scan_times.tolist(),
+                    self._scan_offsets.tolist(),
+                    self._scan_sizes.tolist(),
+                    self._scan_tics.tolist(),
+                )
+            ]
+        return self._scans
 
     @property
     def num_masses(self) -> int:
@@ -317,48 +799,110 @@ class DatxFile:
 
     @property
     def masses(self) -> np.ndarray:
-        """The m/z axis as a 1-D ``float32`` array of length ``num_masses``."""
-        raw = self._files[self._MASSES_EXT]
-        return np.frombuffer(raw, dtype="<f4").copy()
+        """The m/z axis as a 1-D ``float32`` array of length ``num_masses``.
+
+        The array is shared and read-only; copy it before modifying.
+        """
+        if self._masses is None:
+            raw = self._raw(self._MASSES_EXT)
+            self._masses = _read_only(np.frombuffer(raw, dtype="<f4"))
+        return self._masses
 
     @property
     def retention_times(self) -> np.ndarray:
-        """Retention times as a 1-D ``float32`` array."""
-        return np.array([s.time for s in self.scans], dtype=np.float32)
+        """Retention times as a shared, read-only 1-D ``float32`` array."""
+        if self._retention_times is None:
+            self._retention_times = _read_only(self._scan_times.astype(np.float32))
+        return self._retention_times
 
     @property
     def tic(self) -> np.ndarray:
-        """Total ion current values as stored in the ``.scans`` index."""
-        return np.array([s.tic for s in self.scans], dtype=np.float64)
+        """Total ion current values as stored in the ``.scans`` index.
+
+        The array is shared and read-only; copy it before modifying.
+        """
+        if self._tic is None:
+            self._tic = _read_only(self._scan_tics.view())
+        return self._tic
 
     def get_spectrum(self, index: int) -> np.ndarray:
-        """Return the decoded intensities for scan ``index`` as ``float32``."""
+        """Return the decoded intensities for scan ``index`` as ``float32``.
+
+        The result is read-only.  With the default unbounded cache it is
+        a row view into the shared decoded store.
+        """
         if index < 0 or index >= self.num_spectra:
             raise IndexError(
                 f"spectrum index {index} out of range [0, {self.num_spectra})"
             )
-        cached = self._spectra_cache[index]
-        if cached is not None:
-            return cached
-        scan = self.scans[index]
-        blob = self._files[self._SPECTRA_EXT]
-        chunk = blob[scan.offset : scan.offset + scan.size]
-        spectrum = decode_intensities_blob(chunk, self.samples_per_scan)
-        self._spectra_cache[index] = spectrum
-        return spectrum
+        self._require_spectra()
+        if self._cache_rows is None:
+            if self._decoded[index]:
+                self._hits += 1
+            else:
+                self._misses += 1
+                self._decode_into_store(index)
+            return self._store_view[index]
+
+        row = self._lru.get(index)
+        if row is not None:
+            self._hits += 1
+            self._lru.move_to_end(index)
+            return row
+        self._misses += 1
+        row = _read_only(self._decode(index))
+        if self._cache_rows > 0:
+            self._lru[index] = row
+            if len(self._lru) > self._cache_rows:
+                self._lru.popitem(last=False)
+                self._evictions += 1
+        return row
+
+    @property
+    def cache_stats(self) -> SpectrumCacheStats:
+        """Hit/miss/eviction counters and resident size of the spectrum cache."""
+        rows = self._n_decoded if self._cache_rows is None else len(self._lru)
+        return SpectrumCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            resident_bytes=rows * 4 * self.num_masses,
+            capacity_bytes=self._cache_bytes,
+        )
 
     @property
     def intensities(self) -> np.ndarray:
         """Full ``(num_spectra, num_masses)`` matrix of intensities.
 
-        Decoded lazily on first access and cached.
+        Decoded lazily on first access and cached.  This is the same
+        read-only store that :meth:`get_spectrum` hands out rows of, so
+        a fully decoded file costs exactly one matrix.
+
+        With a bounded ``cache_bytes`` the matrix is assembled afresh on
+        every access (reusing cached rows) and is not itself cached.
         """
-        if self._all_intensities is None:
+        self._require_spectra()
+        if self._cache_rows is not None:
             arr = np.empty((self.num_spectra, self.num_masses), dtype=np.float32)
             for i in range(self.num_spectra):
-                arr[i] = self.get_spectrum(i)
-            self._all_intensities = arr
-        return self._all_intensities
+                row = self._lru.get(i)
+                arr[i] = row if row is not None else self._decode(i)
+            return _read_only(arr)
+        for i in np.flatnonzero(~self._decoded):
+            self._decode_into_store(int(i))
+        if self._store_view is None:
+            self._allocate_store()
+        return self._store_view
+
+    @property
+    def lazy_intensities(self) -> "LazyIntensities":
+        """The intensity matrix as a lazily decoded, NumPy-indexable view.
+
+        ``dx.lazy_intensities[rows, cols]`` decodes only the selected
+        scans, and only up to the last selected mass; see
+        :class:`LazyIntensities`.
+        """
+        return LazyIntensities(self)
 
     def iter_spectra(self) -> Iterator[np.ndarray]:
         """Yield decoded scans one at a time (no full-matrix allocation)."""
@@ -366,16 +910,28 @@ class DatxFile:
             yield self.get_spectrum(i)
 
     def get_averaged_spectrum(self, indices: Sequence[int]) -> np.ndarray:
-        """Return the mean spectrum over the given scan indices."""
+        """Return the mean spectrum over the given scan indices.
+
+        A contiguous ascending range is answered from :meth:`prefix_sums`
+        in O(num_masses) once that index has been built.
+        """
         if len(indices) == 0:
             raise ValueError("indices must be non-empty")
+        run = _as_range(indices)
+        if run is not None and self._prefix_sums is not None:
+            return self._prefix_sums.mean_spectrum(*run)
         acc = np.zeros(self.num_masses, dtype=np.float64)
         for i in indices:
             acc += self.get_spectrum(i)
         return (acc / len(indices)).astype(np.float32)
 
     def generate_xic(self, mass_indices: Sequence[int]) -> np.ndarray:
-        """Sum intensities over a set of mass indices across every scan."""
+        """Sum intensities over a set of mass indices across every scan.
+
+        Each scan's window is summed in float32, as the reference does;
+        ``prefix_sums().xic(start, stop)`` gives the exact float64 sums
+        of a contiguous window in O(num_spectra).
+        """
         xic = np.zeros(self.num_spectra, dtype=np.float64)
         mass_indices = np.asarray(list(mass_indices), dtype=np.int64)
         for i in range(self.num_spectra):
@@ -383,6 +939,187 @@ class DatxFile:
             xic[i] = spec[mass_indices].sum()
         return xic.astype(np.float32)
 
+    def prefix_sums(
+        self, path: str | Path | None = None, chunk_scans: int = 256
+    ) -> "SpectrumPrefixSums":
+        """Build (once) the summed-area table of the intensities.
+
+        Afterwards the sum or mean spectrum of any contiguous scan range
+        and the XIC of any contiguous mass window cost one subtraction,
+        and :meth:`get_averaged_spectrum` uses it automatically for such
+        ranges.  See :class:`SpectrumPrefixSums`.
+
+        Parameters
+        ----------
+        path:
+            Optional ``.npy`` file for the table.  It is written there
+            (as a memmap, so the build needs no extra RAM) and, when the
+            file already exists with the right shape, memory-mapped
+            instead of rebuilt.  Delete it if the archive changes.
+        chunk_scans:
+            Scans decoded and accumulated per step of the build.
+        """
+        if self._prefix_sums is not None:
+            return self._prefix_sums
+        self._require_spectra()
+        n, m = self.num_spectra, self.num_masses
+        shape = (n + 1, m + 1)
+        if path is not None and Path(path).is_file():
+            table = np.load(path, mmap_mode="r")
+            if table.shape == shape and table.dtype == np.float64:
+                self._prefix_sums = SpectrumPrefixSums(table)
+                return self._prefix_sums
+        if path is not None:
+            table = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+        else:
+            table = np.empty(shape, dtype=np.float64)
+        table[0] = 0.0
+        table[:, 0] = 0.0
+        block = np.empty((min(chunk_scans, n), m), dtype=np.float64)
+        for first in range(0, n, chunk_scans):
+            count = min(chunk_scans, n - first)
+            rows = block[:count]
+            for j in range(count):
+                rows[j] = self.get_spectrum(first + j)
+            np.cumsum(rows, axis=1, out=rows)
+            np.cumsum(rows, axis=0, out=rows)
+            rows += table[first, 1:]
+            table[first + 1 : first + 1 + count, 1:] = rows
+        if isinstance(table, np.memmap):
+            table.flush()
+            table = np.load(path, mmap_mode="r")
+        self._prefix_sums = SpectrumPrefixSums(_read_only(table))
+        return self._prefix_sums
+
+    def mass_statistics(
+        self,
+        scan_range: tuple[int, int] | None = None,
+        block_scans: int = 256,
+        workers: int | None = 1,
+    ) -> MassStatistics:
+        """Per-m/z mean, variance, maximum and non-zero fraction over scans.
+
+        One streaming pass: scans ``start <= i < stop`` of ``scan_range``
+        (default all) are decoded ``block_scans`` at a time and each
+        block is merged into the running statistics, so at most one
+        block is held.  Scans already in the decoded cache are read from
+        it; the others are decoded without being cached.
+
+        ``workers`` other than ``1`` splits the range across that many
+        worker processes (``None``: one per CPU), each reopening the
+        archive, and merges their results.
+        """
+        self._require_spectra()
+        start, stop = scan_range if scan_range is not None else (0, self.num_spectra)
+        if not 0 <= start < stop <= self.num_spectra:
+            raise ValueError(
+                f"scan_range {scan_range} is empty or outside [0, {self.num_spectra})"
+            )
+        if block_scans < 1:
+            raise ValueError("block_scans must be at least 1")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1, or None for one per CPU")
+        if workers == 1:
+            return self._mass_statistics(start, stop, block_scans)
+        from concurrent.futures import ProcessPoolExecutor
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        parts = min(workers, stop - start)
+        bounds = np.linspace(start, stop, parts + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=parts) as pool:
+            futures = [
+                pool.submit(_mass_statistics_job, self.path, lo, hi, block_scans)
+                for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+            ]
+            stats = futures[0].result()
+            for future in futures[1:]:
+                stats = stats.merge(future.result())
+        return stats
+
+    def _mass_statistics(self, start: int, stop: int, block_scans: int) -> MassStatistics:
+        m = self.num_masses
+        block = np.empty((min(block_scans, stop - start), m), dtype=np.float32)
+        stats = None
+        for first in range(start, stop, block_scans):
+            rows = block[: min(block_scans, stop - first)]
+            for j in range(rows.shape[0]):
+                rows[j] = self._row(first + j)
+            part = MassStatistics.of_block(rows)
+            stats = part if stats is None else stats.merge(part)
+        return stats
+
+    # -- Value-based selection ------------------------------------------
+
+    def scans_between(self, t0: float, t1: float) -> np.ndarray:
+        """Indices of the scans with ``t0 <= retention time <= t1``."""
+        times = self.retention_times
+        if self._times_sorted is None:
+            self._times_sorted = bool(np.all(times[1:] >= times[:-1]))
+        if not self._times_sorted:
+            times = times.astype(np.float64)
+            return np.flatnonzero((times >= t0) & (times <= t1))
+        lo = int(np.searchsorted(times, t0, side="left"))
+        hi = int(np.searchsorted(times, t1, side="right"))
+        return np.arange(lo, max(lo, hi))
+
+    def mass_indices_between(self, mz0: float, mz1: float) -> np.ndarray:
+        """Indices of the m/z samples with ``mz0 <= mass <= mz1``."""
+        lo = self._search_masses(mz0, "left")
+        hi = self._search_masses(mz1, "right")
+        return np.arange(lo, max(lo, hi))
+
+    def nearest_mass_index(self, mz: float, tol_ppm: float | None = None) -> int:
+        """Index of the m/z sample closest to ``mz``.
+
+        With ``tol_ppm``, raises :class:`KeyError` if that sample is more
+        than ``tol_ppm`` parts per million away from ``mz``.
+        """
+        masses = self.masses
+        if masses.size == 0:
+            raise KeyError(f"no m/z samples in {self.path}")
+        mz = float(mz)
+        i = self._search_masses(mz, "left")
+        if i == masses.size or (i > 0 and mz - float(masses[i - 1]) <= float(masses[i]) - mz):
+            i -= 1
+        if tol_ppm is not None and abs(float(masses[i]) - mz) > abs(mz) * tol_ppm * 1e-6:
+            raise KeyError(f"no m/z sample within {tol_ppm} ppm of {mz}")
+        return i
+
+    def generate_xic_between(self, mz0: float, mz1: float) -> np.ndarray:
+        """:meth:`generate_xic` over every m/z sample in ``[mz0, mz1]``."""
+        return self.generate_xic(self.mass_indices_between(mz0, mz1))
+
+    def get_averaged_spectrum_between(self, t0: float, t1: float) -> np.ndarray:
+        """:meth:`get_averaged_spectrum` over every scan in ``[t0, t1]``."""
+        return self.get_averaged_spectrum(self.scans_between(t0, t1))
+
+    def _search_masses(self, mz: float, side: str) -> int:
+        """``np.searchsorted(self.masses, mz, side)``, O(1) on a uniform axis."""
+        masses = self.masses
+        if self._mass_step is None:
+            self._mass_step = _uniform_step(masses)
+        step = self._mass_step
+        if step == 0.0:
+            return int(np.searchsorted(masses, mz, side=side))
+        n = masses.size
+        mz = float(mz)
+        i = min(max(int(np.ceil((mz - float(masses[0])) / step)), 0), n)
+        # The float32 axis is only approximately uniform: step to the
+        # exact searchsorted position (at most a sample or two away).
+        # Compare in float64, as ``np.searchsorted`` does.
+        if side == "left":
+            while i > 0 and float(masses[i - 1]) >= mz:
+                i -= 1
+            while i < n and float(masses[i]) < mz:
+                i += 1
+        else:
+            while i > 0 and float(masses[i - 1]) > mz:
+                i -= 1
+            while i < n and float(masses[i]) <= mz:
+                i += 1
+        return i
+
     # -- Optional access to text files inside the archive --------------
 
     @property
@@ -409,40 +1146,147 @@ class DatxFile:
         """Return the inner file names (full paths) present in the archive."""
         return [k for k in self._files if "/" in k]
 
+    @property
+    def metadata(self) -> DatxMetadata:
+        """The ``.meta``, ``.method``, tune and ion-source XML, parsed once.
+
+        See :class:`advion_io.metadata.DatxMetadata`.
+        """
+        if self._metadata is None:
+            self._metadata = DatxMetadata(self)
+        return self._metadata
+
     # -- internals ------------------------------------------------------
 
-    def _load(self) -> None:
-        """Load every member of the ``.datx`` archive into memory.
+    def _allocate_store(self) -> None:
+        shape = (self.num_spectra, self.num_masses)
+        if self._disk_cache is not None and self.num_spectra > 0:
+            # Decode straight into the pending on-disk entry.
+            self._pending_entry, self._store = self._disk_cache.create(
+                self._cache_key, shape
+            )
+        else:
+            self._store = np.empty(shape, dtype=np.float32)
+        self._store_view = _read_only(self._store.view())
+
+    def _load_disk_cache(self) -> None:
+        """Adopt a matching entry of the persistent cache, if there is one."""
+        hit = self._disk_cache.lookup(self._cache_key)
+        if hit is None or hit["intensities"].shape != (self.num_spectra, self.num_masses):
+            return
+        self._store_view = hit["intensities"]
+        self._decoded[:] = True
+        self._n_decoded = self.num_spectra
+        self._masses = hit["masses"]
+        self._retention_times = hit["retention_times"]
+        self._tic = hit["tic"]
+
+    def _commit_disk_cache(self) -> None:
+        """Publish the now fully decoded store to the persistent cache."""
+        axes = {
+            "masses": self.masses,
+            "retention_times": self.retention_times,
+            "tic": self.tic,
+        }
+        self._disk_cache.commit(self._cache_key, self._pending_entry, self._store, axes)
+        self._pending_entry = None
+
+    def _decode(self, index: int, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Decode samples ``start:stop`` of scan ``index`` without touching any cache."""
+        offset = int(self._scan_offsets[index])
+        blob = self._files[self._SPECTRA_EXT]
+        chunk = blob[offset : offset + int(self._scan_sizes[index])]
+        return decode_intensities_blob(chunk, self.samples_per_scan, start, stop)
+
+    def _row(self, index: int) -> np.ndarray:
+        """Scan ``index`` from the cache if resident, else decoded without caching."""
+        if self._cache_rows is None:
+            if self._decoded[index]:
+                return self._store_view[index]
+        else:
+            row = self._lru.get(index)
+            if row is not None:
+                return row
+        return self._decode(index)
+
+    def _window(self, index: int, start: int, stop: int) -> np.ndarray:
+        """Samples ``start:stop`` of scan ``index``, from the cache if possible.
 
-        Each entry is indexed three ways for convenience: by full path
-        (``"<stem>/<stem>.spectra"``), by basename
-        (``"<stem>.spectra"``) and by extension (``".spectra"``).
+        A full-width request goes through :meth:`get_spectrum` (and so
+        fills the cache); a narrower one is decoded only as far as
+        ``stop`` and not cached.
         """
-        with zipfile.ZipFile(self.path, "r") as zf:
-            for info in zf.infolist():
-                if info.is_dir():
-                    continue
-                blob = zf.read(info)
-                name = info.filename
-                basename = name.rsplit("/", 1)[-1]
-                self._files[name] = blob
-                self._files.setdefault(basename, blob)
-                if "." in basename:
-                    ext = "." + basename.rsplit(".", 1)[-1]
-                    # First file with this extension wins.
-                    self._files.setdefault(ext, blob)
-
-        required = (self._SCANS_EXT, self._MASSES_EXT, self._SPECTRA_EXT)
+        if self._cache_rows is None:
+            if self._decoded[index]:
+                return self._store_view[index, start:stop]
+        else:
+            row = self._lru.get(index)
+            if row is not None:
+                return row[start:stop]
+        if start == 0 and stop == self.num_masses:
+            return self.get_spectrum(index)
+        return self._decode(index, start, stop)
+
+    def _read_block(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Gather ``intensities[rows][:, cols]`` decoding only what is needed."""
+        self._require_spectra()
+        out = np.empty((rows.size, cols.size), dtype=np.float32)
+        if out.size == 0:
+            return out
+        lo, hi = int(cols.min()), int(cols.max()) + 1
+        local = cols - lo
+        contiguous = local.size == hi - lo and bool(np.all(np.diff(local) == 1))
+        for j, i in enumerate(rows.tolist()):
+            window = self._window(i, lo, hi)
+            out[j] = window if contiguous else window[local]
+        return out
+
+    def _decode_into_store(self, index: int) -> None:
+        """Decode scan ``index`` into its row of the shared store."""
+        if self._store is None:
+            self._allocate_store()
+        self._store[index] = self._decode(index)
+        self._decoded[index] = True
+        self._n_decoded += 1
+        if self._n_decoded == self.num_spectra and self._pending_entry is not None:
+            self._commit_disk_cache()
+
+    def _require_spectra(self) -> None:
+        if not self.has_spectra:
+            raise RuntimeError(
+                f"{self.path} was opened for metadata only (spectra=False); "
+                "reopen it with spectra=True to read spectra"
+            )
+
+    def _check_required(self) -> None:
+        if self.has_spectra:
+            required = (self._SCANS_EXT, self._MASSES_EXT, self._SPECTRA_EXT)
+        else:
+            required = (self._SCANS_EXT,)
         missing = [e for e in required if e not in self._files]
         if missing:
+            self._files.close()
             raise ValueError(f"{self.path}: missing required entries {missing}")
 
+    def _scans_header(self) -> str:
+        """Return the ``.scans`` header without reading the scan records."""
+        size = 4096
+        while True:
+            head = self._files.head(self._SCANS_EXT, size)
+            cut = head.find(b"<scan>")
+            if cut >= 0 or len(head) < size:
+                return _split_scans_xml(head)[0]
+            size *= 4
+
     def _raw(self, key: str, default: bytes | None = None) -> bytes | None:
         """Return the raw bytes of a member by ext, basename, or full path."""
-        return self._files.get(key, default)
+        data = self._files.get(key)
+        if data is None:
+            return default
+        return data if isinstance(data, bytes) else data[:]
 
     def _text(self, ext: str, default: str | None = None) -> str:
-        data = self._files.get(ext)
+        data = self._raw(ext)
         if data is None:
             if default is None:
                 raise KeyError(f"{ext} not present in {self.path}")
@@ -466,6 +1310,206 @@ class DatxFile:
         return int(cls._extract_text(xml, tag))
 
 
+def _mass_statistics_job(
+    path: Path, start: int, stop: int, block_scans: int
+) -> MassStatistics:
+    """Worker-process body of :meth:`DatxFile.mass_statistics`."""
+    with DatxFile(path, cache_bytes=0) as dx:
+        return dx._mass_statistics(start, stop, block_scans)
+
+
+class LazyIntensities:
+    """Lazily decoded ``(num_spectra, num_masses)`` view of a :class:`DatxFile`.
+
+    Supports NumPy indexing on both axes (integers, slices, boolean masks
+    and integer arrays, with NumPy's broadcasting rules) and returns a
+    new ``float32`` array.  Only the selected scans are decoded, each up
+    to the highest selected mass; scans already in the spectrum cache
+    are read from it.  The cost of a selection is therefore
+    proportional to its size, not to the run.
+
+    ``np.asarray(lazy)`` (and any NumPy function given the object)
+    decodes the whole matrix via :attr:`DatxFile.intensities`.
+    """
+
+    ndim = 2
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, dx: DatxFile):
+        self._dx = dx
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self._dx.num_spectra, self._dx.num_masses)
+
+    @property
+    def size(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return f"LazyIntensities(shape={self.shape}, dtype={self.dtype})"
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        arr = self._dx.intensities
+        if dtype is not None:
+            arr = arr.astype(dtype, copy=False)
+        return arr.copy() if copy else arr
+
+    def __getitem__(self, key) -> np.ndarray:
+        row_key, col_key = self._split_key(key)
+        rows, row_sel = self._axis(row_key, self.shape[0], 0)
+        cols, col_sel = self._axis(col_key, self.shape[1], 1)
+        return self._dx._read_block(rows, cols)[row_sel, col_sel]
+
+    def _split_key(self, key) -> tuple[object, object]:
+        if isinstance(key, np.ndarray) and key.dtype == bool and key.ndim == 2:
+            if key.shape != self.shape:
+                raise IndexError(
+                    f"boolean index of shape {key.shape} does not match {self.shape}"
+                )
+            return np.nonzero(key)
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is None for k in key):
+            raise IndexError("np.newaxis is not supported")
+        n_ellipsis = sum(k is Ellipsis for k in key)
+        if n_ellipsis > 1:
+            raise IndexError("an index can only have a single ellipsis ('...')")
+        if n_ellipsis:
+            at = next(i for i, k in enumerate(key) if k is Ellipsis)
+            fill = (slice(None),) * (3 - len(key))
+            key = key[:at] + fill + key[at + 1 :]
+        if len(key) > 2:
+            raise IndexError(f"too many indices: array is 2-dimensional, got {len(key)}")
+        return key + (slice(None),) * (2 - len(key))
+
+    @staticmethod
+    def _axis(key, n: int, axis: int) -> tuple[np.ndarray, object]:
+        """Resolve one axis' key to the indices to read and a key into them."""
+        if isinstance(key, slice):
+            return np.arange(*key.indices(n)), slice(None)
+        if isinstance(key, (int, np.integer)) and not isinstance(key, (bool, np.bool_)):
+            index = int(key)
+            if not -n <= index < n:
+                raise IndexError(
+                    f"index {index} is out of bounds for axis {axis} with size {n}"
+                )
+            return np.array([index % n]), 0
+        arr = np.asarray(key)
+        if arr.dtype == bool:
+            if arr.shape != (n,):
+                raise IndexError(
+                    f"boolean index of shape {arr.shape} does not match axis {axis} "
+                    f"with size {n}"
+                )
+            arr = np.flatnonzero(arr)
+        elif arr.size == 0:
+            arr = arr.astype(np.int64)
+        elif not np.issubdtype(arr.dtype, np.integer):
+            raise IndexError(
+                "only integers, slices, ellipsis and integer or boolean arrays "
+                "are valid indices"
+            )
+        if arr.size and (arr.min() < -n or arr.max() >= n):
+            raise IndexError(f"index out of bounds for axis {axis} with size {n}")
+        needed, inverse = np.unique(arr % n if n else arr, return_inverse=True)
+        return needed, inverse.reshape(arr.shape)
+
+
+class SpectrumPrefixSums:
+    """Summed-area table of a run's ``(num_spectra, num_masses)`` intensities.
+
+    ``table[i, j]`` is the float64 sum of ``intensities[:i, :j]``, so
+    the table has one more row and column than the run.  Sums over any
+    rectangle of scans and masses are then a handful of lookups: a
+    scan-range spectrum costs O(num_masses) and a mass-window XIC
+    O(num_spectra), whatever the size of the range.  Ranges are
+    half-open ``start:stop`` index ranges.
+
+    Integer-valued intensities (the usual ``storeAsFloat=false`` case)
+    are summed exactly, so results match a scan-by-scan loop bit for
+    bit.  Built by :meth:`DatxFile.prefix_sums`.
+    """
+
+    def __init__(self, table: np.ndarray):
+        self.table = table
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """``(num_spectra, num_masses)`` of the indexed run."""
+        return (self.table.shape[0] - 1, self.table.shape[1] - 1)
+
+    def sum_spectrum(self, start: int, stop: int) -> np.ndarray:
+        """Sum of scans ``start:stop`` as a float64 spectrum."""
+        start, stop = self._range(start, stop, 0)
+        cumulative = self.table[stop] - self.table[start]
+        return np.diff(cumulative)
+
+    def mean_spectrum(self, start: int, stop: int) -> np.ndarray:
+        """Mean of scans ``start:stop`` as a float32 spectrum."""
+        start, stop = self._range(start, stop, 0)
+        if stop == start:
+            raise ValueError("scan range must be non-empty")
+        return (self.sum_spectrum(start, stop) / (stop - start)).astype(np.float32)
+
+    def xic(
+        self,
+        mass_start: int,
+        mass_stop: int,
+        scan_start: int = 0,
+        scan_stop: int | None = None,
+    ) -> np.ndarray:
+        """Per-scan sums of masses ``mass_start:mass_stop`` (float64)."""
+        mass_start, mass_stop = self._range(mass_start, mass_stop, 1)
+        scan_stop = self.shape[0] if scan_stop is None else scan_stop
+        scan_start, scan_stop = self._range(scan_start, scan_stop, 0)
+        rows = self.table[scan_start : scan_stop + 1]
+        return np.diff(rows[:, mass_stop] - rows[:, mass_start])
+
+    def total(
+        self, start: int, stop: int, mass_start: int = 0, mass_stop: int | None = None
+    ) -> float:
+        """Sum of scans ``start:stop`` over masses ``mass_start:mass_stop``."""
+        start, stop = self._range(start, stop, 0)
+        mass_stop = self.shape[1] if mass_stop is None else mass_stop
+        mass_start, mass_stop = self._range(mass_start, mass_stop, 1)
+        t = self.table
+        return float(
+            t[stop, mass_stop] - t[start, mass_stop] - t[stop, mass_start] + t[start, mass_start]
+        )
+
+    def _range(self, start: int, stop: int, axis: int) -> tuple[int, int]:
+        n = self.shape[axis]
+        start, stop = int(start), int(stop)
+        if not 0 <= start <= stop <= n:
+            raise IndexError(f"range {start}:{stop} out of bounds for axis {axis} with size {n}")
+        return start, stop
+
+
+# Spectra per vectorised delta block: about 16 MB of float32.
+_DELTA_BLOCK_ELEMENTS = 1 << 22
+
+# Delta backgrounds remembered per DataReader.
+_BG_CACHE_SIZE = 8
+
+# Initial margin, in samples, around the targets of a delta XIC.
+_DELTA_XIC_PAD = 32
+
+
+def _as_range(indices: Sequence[int]) -> tuple[int, int] | None:
+    """``(start, stop)`` if ``indices`` is ``start, start + 1, ..., stop - 1``."""
+    arr = np.asarray(indices)
+    if arr.ndim != 1 or arr.size == 0 or not np.issubdtype(arr.dtype, np.integer):
+        return None
+    start = int(arr[0])
+    if start < 0 or not np.array_equal(arr, np.arange(start, start + arr.size)):
+        return None
+    return start, start + arr.size
+
+
 # ---------------------------------------------------------------------------
 # Advion-shaped DataReader API
 # ---------------------------------------------------------------------------
@@ -482,8 +1526,9 @@ class DataReader:
     Parameters
     ----------
     path:
-        Path to a ``.datx`` archive (``bytes`` or ``str`` accepted).
-        Folder-style inputs are not supported.
+        Path to a ``.datx`` archive (``bytes`` or ``str`` accepted), or
+        to the loose ``<folder>/<root_name>/`` directory written by
+        :class:`advion_io.DataWriter` before it zips the archive.
     debug_output:
         Accepted for API compatibility; this reader does not emit
         debug output.
@@ -491,6 +1536,11 @@ class DataReader:
         Accepted for API compatibility.  When true, every scan is
         decoded eagerly into the in-memory cache so subsequent
         ``get_spectrum`` calls are O(1).
+    cache_bytes:
+        Memory budget for decoded spectra, forwarded to
+        :class:`DatxFile`.  ``None`` (the default) caches every scan.
+    cache_dir, cache_dir_bytes:
+        Optional persistent decoded cache, forwarded to :class:`DatxFile`.
     """
 
     # ------------------------------------------------------------------
@@ -502,6 +1552,9 @@ class DataReader:
         path: str | bytes | Path,
         debug_output: bool = False,
         decode_spectra: bool = False,
+        cache_bytes: int | None = None,
+        cache_dir: str | Path | None = None,
+        cache_dir_bytes: int | None = None,
     ) -> None:
         if isinstance(path, bytes):
             path = path.decode("utf-8")
@@ -509,11 +1562,16 @@ class DataReader:
         self.debug_output = bool(debug_output)
         self.decode_spectra = bool(decode_spectra)
 
-        self._dx = DatxFile(self.path)
+        self._dx = DatxFile(
+            self.path,
+            cache_bytes=cache_bytes,
+            cache_dir=cache_dir,
+            cache_dir_bytes=cache_dir_bytes,
+        )
 
         # Lazily-parsed metadata caches.
-        self._segments: list[_Segment] | None = None
         self._scalar_channels: list[_ScalarChannel] | None = None
+        self._scalar_bases: list[_ScalarTimeBase] | None = None
         self._aux_files: list[_AuxFile] | None = None
         self._is_centroid: bool | None = None
 
@@ -526,8 +1584,15 @@ class DataReader:
         self._bg_threshold = 1.0
         self._bg_min_width = 0.05
         self._bg_noise_offset = 0
-        self._bg_dirty = True
+        # The background depends only on (start_time, end_time,
+        # noise_offset); threshold and min_width apply afterwards.
+        # Recent backgrounds are kept by that key, and the float64 sum
+        # of the last contiguous scan window is kept so a slid window
+        # only adds and removes the scans that entered or left it.
+        self._bg_key: tuple[float, float, int] | None = None
         self._bg_spectrum: np.ndarray | None = None
+        self._bg_cache: OrderedDict[tuple[float, float, int], np.ndarray] = OrderedDict()
+        self._bg_window: tuple[int, int, np.ndarray] | None = None
 
         if self.decode_spectra:
             _ = self._dx.intensities  # forces full decode + caching
@@ -579,14 +1644,7 @@ class DataReader:
 
     def get_hardware_type(self) -> str:
         """Return the hardware type recorded in the ``.meta`` file."""
-        try:
-            root = ET.fromstring(self._dx.meta_xml)
-        except ET.ParseError:
-            return ""
-        for el in root.iter():
-            if _strip_ns(el.tag) == "hardwareType":
-                return (el.text or "").strip()
-        return ""
+        return self._dx.metadata.meta.hardware_type
 
     def get_instrument_id(self) -> str:
         return self._dx.hardware_id
@@ -595,13 +1653,21 @@ class DataReader:
     # Mass / time / spectrum access
     # ------------------------------------------------------------------
 
-    def get_masses(self) -> np.ndarray:
-        """Return the m/z axis as a float32 array of length ``getNumMasses``."""
-        return self._dx.masses
+    def get_masses(self, copy: bool = False) -> np.ndarray:
+        """Return the m/z axis as a float32 array of length ``getNumMasses``.
+
+        The array is shared and read-only unless ``copy`` is true.
+        """
+        masses = self._dx.masses
+        return masses.copy() if copy else masses
+
+    def get_retention_times(self, copy: bool = False) -> np.ndarray:
+        """Return the retention times as a float32 array of length ``getNumSpectra``.
 
-    def get_retention_times(self) -> np.ndarray:
-        """Return the retention times as a float32 array of length ``getNumSpectra``."""
-        return self._dx.retention_times
+        The array is shared and read-only unless ``copy`` is true.
+        """
+        times = self._dx.retention_times
+        return times.copy() if copy else times
 
     def get_TIC(self, index: int) -> float:
         """Return the TIC recorded for ``index`` in the ``.scans`` XML.
@@ -611,7 +1677,7 @@ class DataReader:
         the int \u2192 float32 cast in :meth:`get_spectrum`).
         """
         self._check_spectrum_index(index)
-        return float(self._dx.scans[index].tic)
+        return float(self._dx._scan_tics[index])
 
     def get_spectrum(self, index: int) -> np.ndarray:
         self._check_spectrum_index(index)
@@ -638,6 +1704,16 @@ class DataReader:
             self._check_mass_index(int(m))
         return self._dx.generate_xic([int(m) for m in mass_indices])
 
+    def build_prefix_sums(self, path: str | Path | None = None) -> "SpectrumPrefixSums":
+        """Build the summed-area index of the intensities.
+
+        An extension over the reference API: afterwards averaged spectra
+        over contiguous scan ranges and the delta background are
+        computed in one subtraction, and the returned index answers XIC
+        window sums the same way.  See :meth:`DatxFile.prefix_sums`.
+        """
+        return self._dx.prefix_sums(path)
+
     # ------------------------------------------------------------------
     # Peak Express delta background / delta spectrum
     # ------------------------------------------------------------------
@@ -667,8 +1743,6 @@ class DataReader:
         self._bg_threshold = float(threshold)
         self._bg_min_width = float(min_width)
         self._bg_noise_offset = int(noise_offset)
-        self._bg_dirty = True
-        self._bg_spectrum = None
 
     def get_delta_background_spectrum(self) -> np.ndarray:
         """Return the current Peak Express delta-background spectrum."""
@@ -686,28 +1760,150 @@ class DataReader:
     def get_averaged_delta_spectrum(self, spectra_indices: Sequence[int]) -> np.ndarray:
         if len(spectra_indices) == 0:
             raise IOError(AdvionDataErrorCode.PARAMETER_OUT_OF_RANGE)
-        bg = self._ensure_background()
+        indices = self._scan_indices(spectra_indices)
         acc = np.zeros(self.get_num_masses(), dtype=np.float64)
-        n = 0
-        for i in spectra_indices:
-            i = int(i)
-            self._check_spectrum_index(i)
-            acc += self._compute_delta(self._dx.get_spectrum(i), bg)
-            n += 1
-        if n > 1:
-            acc /= n
+        for _first, block in self._iter_delta_blocks(indices):
+            # Row by row, so the float64 accumulation order is unchanged.
+            for row in block:
+                acc += row
+        if indices.size > 1:
+            acc /= indices.size
         return acc.astype(np.float32)
 
     def generate_delta_xic(self, mass_indices: Sequence[int]) -> np.ndarray:
-        bg = self._ensure_background()
         cols = np.asarray([int(m) for m in mass_indices], dtype=np.int64)
         for m in cols:
             self._check_mass_index(int(m))
-        out = np.zeros(self.get_num_spectra(), dtype=np.float32)
-        for i in range(self.get_num_spectra()):
-            delta = self._compute_delta(self._dx.get_spectrum(i), bg)
-            out[i] = float(delta[cols].sum())
-        return out
+        if cols.size == 0:
+            return np.zeros(self.get_num_spectra(), dtype=np.float32)
+        # Only the neighbourhood of the requested masses is evaluated.
+        targets = np.unique(cols)
+        values = self._delta_columns(targets)
+        return values[:, np.searchsorted(targets, cols)].sum(axis=1)
+
+    def get_delta_matrix(
+        self, scan_indices: Sequence[int] | None = None, sparse: bool = False
+    ) -> np.ndarray:
+        """Return the delta spectra of many scans as one matrix.
+
+        An extension over the reference API: row ``k`` equals
+        :meth:`get_delta_spectrum` ``(scan_indices[k])``, but scans are
+        processed in vectorised blocks.  ``scan_indices`` defaults to
+        every scan.
+
+        Deltas are mostly zero, so ``sparse=True`` returns a
+        ``scipy.sparse.csr_array`` instead of a dense ``float32`` array
+        (requires SciPy).
+        """
+        indices = self._scan_indices(scan_indices)
+        shape = (indices.size, self.get_num_masses())
+        if not sparse:
+            out = np.empty(shape, dtype=np.float32)
+            for first, block in self._iter_delta_blocks(indices):
+                out[first : first + block.shape[0]] = block
+            return out
+
+        try:
+            from scipy.sparse import csr_array
+        except ImportError as exc:  # pragma: no cover - depends on the env
+            raise ImportError("get_delta_matrix(sparse=True) requires SciPy") from exc
+        data: list[np.ndarray] = []
+        columns: list[np.ndarray] = []
+        counts = np.zeros(indices.size, dtype=np.int64)
+        for first, block in self._iter_delta_blocks(indices):
+            rows, cols = np.nonzero(block)
+            data.append(block[rows, cols])
+            columns.append(cols)
+            counts[first : first + block.shape[0]] = np.bincount(
+                rows, minlength=block.shape[0]
+            )
+        indptr = np.zeros(indices.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return csr_array(
+            (
+                np.concatenate(data) if data else np.zeros(0, np.float32),
+                np.concatenate(columns) if columns else np.zeros(0, np.int64),
+                indptr,
+            ),
+            shape=shape,
+        )
+
+    def sweep_delta_parameters(
+        self,
+        thresholds: Sequence[float],
+        min_widths: Sequence[float],
+        mass_indices: Sequence[int] | None = None,
+        scan_indices: Sequence[int] | None = None,
+    ) -> np.ndarray:
+        """Delta ICs (or delta XICs) for a whole grid of delta settings.
+
+        An extension over the reference API for tuning ``threshold`` and
+        ``min_width``.  ``out[i, j, k]`` is what :meth:`get_delta_ic`
+        ``(scan_indices[k])`` -- or, with ``mass_indices``,
+        :meth:`generate_delta_xic` -- returns after
+        :meth:`set_delta_background_parameters` with ``thresholds[i]``,
+        ``min_widths[j]`` and the current time window and noise offset.
+
+        The data are read once: the background and the ratio
+        ``(spectrum - bg) / bg`` are computed once per block of scans,
+        and each threshold only relabels the runs, whose sums are then
+        filtered by width.  Thresholds are compared in ``float32``, like
+        the ratio, so exactly the same samples are kept as there; their
+        sums are accumulated in ``float64``, so they agree with the
+        one-setting methods to ``float32`` rounding.
+
+        Returns a ``float32`` array of shape
+        ``(len(thresholds), len(min_widths), len(scan_indices))``.
+        """
+        thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1)
+        min_widths = np.asarray(min_widths, dtype=np.float64).reshape(-1)
+        if np.any(thresholds < 1) or np.any(min_widths < 0.05):
+            raise IOError(AdvionDataErrorCode.PARAMETER_OUT_OF_RANGE)
+        indices = self._scan_indices(scan_indices)
+        n_masses = self.get_num_masses()
+        weights = None
+        if mass_indices is not None:
+            cols = np.asarray([int(m) for m in mass_indices], dtype=np.int64)
+            for m in cols:
+                self._check_mass_index(int(m))
+            # Each run contributes its deltas at the requested masses,
+            # counted as often as they were requested.
+            weights = np.bincount(cols, minlength=n_masses).astype(np.float64)
+
+        out = np.zeros((thresholds.size, min_widths.size, indices.size), dtype=np.float64)
+        if indices.size == 0 or n_masses == 0:
+            return out.astype(np.float32)
+        bg = self._ensure_background()
+        end_masses = self._end_masses()
+        for first, spectra in self._iter_spectra_blocks(indices):
+            ratio = self._delta_ratio(spectra, bg)
+            n_rows = ratio.shape[0]
+            values = ratio if weights is None else ratio * weights
+            # One trailing zero so a run ending the block has a valid bound.
+            values = np.append(values.reshape(-1), values.dtype.type(0))
+            padded = np.zeros((n_rows, n_masses + 2), dtype=np.int8)
+            peak = padded[:, 1:-1].view(bool)
+            target = out[:, :, first : first + n_rows]
+            for t, threshold in enumerate(thresholds):
+                # Compared in float32, as _threshold_delta does, so boundary
+                # samples are kept or dropped exactly as there.
+                np.greater_equal(ratio, np.float32(threshold), out=peak)
+                flat = np.flatnonzero(np.diff(padded, axis=1))
+                if flat.size == 0:
+                    continue
+                rows, starts = np.divmod(flat[0::2], n_masses + 1)
+                ends = flat[1::2] - rows * (n_masses + 1)
+                widths = end_masses[ends] - end_masses[starts]
+                bounds = np.empty(flat.size, dtype=np.int64)
+                bounds[0::2] = rows * n_masses + starts
+                bounds[1::2] = rows * n_masses + ends
+                sums = np.add.reduceat(values, bounds, dtype=np.float64)[0::2]
+                for w, min_width in enumerate(min_widths):
+                    keep = widths >= min_width
+                    target[t, w] = np.bincount(
+                        rows[keep], weights=sums[keep], minlength=n_rows
+                    )
+        return out.astype(np.float32)
 
     def get_delta_ic(self, index: int) -> float:
         """Return :math:`\\sum` :meth:`get_delta_spectrum` ``(index)``."""
@@ -745,28 +1941,22 @@ class DataReader:
 
     def get_ion_source_optimization_xml(self, index: int = 0) -> str:
         seg = self._get_segment(index)
-        return seg.ion_source_xml if seg is not None else ""
+        if seg is None:
+            return ""
+        return self._dx.metadata.member_text(seg.ion_source_file)
 
     def get_tune_parameters_xml(self, index: int = 0) -> str:
         seg = self._get_segment(index)
-        return seg.tune_params_xml if seg is not None else ""
+        if seg is None:
+            return ""
+        return self._dx.metadata.member_text(seg.tune_params_file)
 
     # ------------------------------------------------------------------
     # Scan-mode / segment metadata
     # ------------------------------------------------------------------
 
     def get_scan_mode_index(self) -> int:
-        try:
-            root = ET.fromstring(self._dx.meta_xml)
-        except ET.ParseError:
-            return 0
-        for el in root.iter():
-            if _strip_ns(el.tag) == "scanModeIndex":
-                try:
-                    return int((el.text or "0").strip())
-                except ValueError:
-                    return 0
-        return 0
+        return self._dx.metadata.meta.scan_mode_index
 
     def get_num_segments(self) -> int:
         return len(self._get_segments())
@@ -796,17 +1986,65 @@ class DataReader:
             return chans[index].times.shape[0]
         return 0
 
-    def get_scalar_channel_times(self, index: int) -> np.ndarray:
+    def get_scalar_channel_times(self, index: int, copy: bool = False) -> np.ndarray:
+        """Return the sample times of scalar channel ``index`` (``float32``).
+
+        The array is shared and read-only unless ``copy`` is true.
+        """
         chans = self._get_scalar_channels()
         if not (0 <= index < len(chans)):
             raise IOError(AdvionDataErrorCode.CHANNEL_NOT_DEFINED)
-        return chans[index].times.copy()
+        times = chans[index].times
+        return times.copy() if copy else times
+
+    def get_scalar_channel_values(self, index: int, copy: bool = False) -> np.ndarray:
+        """Return the sample values of scalar channel ``index`` (``float32``).
 
-    def get_scalar_channel_values(self, index: int) -> np.ndarray:
+        The array is shared and read-only unless ``copy`` is true.
+        """
         chans = self._get_scalar_channels()
         if not (0 <= index < len(chans)):
             raise IOError(AdvionDataErrorCode.CHANNEL_NOT_DEFINED)
-        return chans[index].values.copy()
+        values = chans[index].values
+        return values.copy() if copy else values
+
+    def scalar_channels_at(
+        self, times: Sequence[float] | None = None, method: str = "previous"
+    ) -> np.ndarray:
+        """Sample every scalar channel at ``times`` (default: the retention times).
+
+        An extension over the reference API for correlating pressures,
+        temperatures and voltages with spectra.  Returns a ``float32``
+        array of shape ``(num_scalar_channels, len(times))``; row ``i``
+        follows channel ``i`` as numbered by the getters above.
+
+        ``method="previous"`` takes the last sample at or before each
+        time (the value in force when the scan was taken);
+        ``method="linear"`` interpolates between the neighbouring
+        samples.  Times before a channel's first sample -- and, for
+        ``"linear"``, after its last -- are ``NaN``, as are rows of
+        channels without samples.  Any other ``method`` raises
+        ``IOError(ADVIONDATA_PARAMETER_OUT_OF_RANGE)``.
+        """
+        if method not in ("previous", "linear"):
+            raise IOError(AdvionDataErrorCode.PARAMETER_OUT_OF_RANGE)
+        if times is None:
+            times = self._dx.retention_times
+        at = np.asarray(times, dtype=np.float64).reshape(-1)
+        out = np.full((self.get_num_scalar_channels(), at.size), np.nan, dtype=np.float32)
+        if self._scalar_bases is None:
+            self._scalar_bases = _scalar_time_bases(self._get_scalar_channels())
+        # Channels logged together share their sample times, so each
+        # distinct time base costs one lookup for all of its channels.
+        for base in self._scalar_bases:
+            if method == "linear":
+                for row, v in zip(base.rows.tolist(), base.values):
+                    out[row] = np.interp(at, base.times, v, left=np.nan, right=np.nan)
+                continue
+            idx = np.searchsorted(base.times, at, side="right") - 1
+            cols = np.flatnonzero(idx >= 0)
+            out[np.ix_(base.rows, cols)] = base.values[:, idx[cols]]
+        return out
 
     def get_scalar_channel_num_attributes(self, index: int) -> int:
         chans = self._get_scalar_channels()
@@ -853,20 +2091,59 @@ class DataReader:
     # Save
     # ------------------------------------------------------------------
 
-    def save(self, path: str | Path) -> None:
-        """Pickle ``{'masses', 'times', 'intensities'}`` to a gzipped file."""
-        import gzip
-        import pickle
+    def save(
+        self,
+        path: str | Path,
+        format: str | None = None,
+        level: int = 6,
+        codec: str = "zlib",
+        chunk_scans: int = 256,
+        workers: int | None = None,
+    ) -> Path:
+        """Write ``{'masses', 'times', 'intensities'}`` to ``path``.
+
+        The default is the gzipped pickle ``convert-all`` has always
+        written (``"npz"`` for a ``.npz`` suffix).  An extension over the
+        reference API: ``format`` also takes ``"npy"`` (a memory-mappable
+        directory) and ``"chunked"`` (blocks compressed with ``codec`` at
+        ``level`` on ``workers`` threads); see :mod:`advion_io.export`,
+        whose :func:`~advion_io.export.load` reads any of them back.
+        """
+        from .export import save
+
+        return save(
+            self._dx,
+            path,
+            format=format,
+            level=level,
+            codec=codec,
+            chunk_scans=chunk_scans,
+            workers=workers,
+        )
 
-        payload = {
-            "masses": self.get_masses(),
-            "times": self.get_retention_times(),
-            "intensities": np.stack(
-                [self.get_spectrum(i) for i in range(self.get_num_spectra())]
-            ),
-        }
-        with Path(path).open("wb") as p, gzip.GzipFile(fileobj=p, mode="wb") as gz:
-            pickle.dump(payload, gz)
+    def export_mzml(
+        self,
+        path: str | Path,
+        zero_trim: bool = False,
+        centroid: bool = False,
+        level: int = 6,
+        chunk_bytes: int = 1 << 16,
+    ) -> Path:
+        """Write the run to an indexed mzML file, one scan at a time.
+
+        An extension over the reference API; see
+        :func:`advion_io.mzml.write_mzml` for the options.
+        """
+        from .mzml import write_mzml
+
+        return write_mzml(
+            self._dx,
+            path,
+            zero_trim=zero_trim,
+            centroid=centroid,
+            level=level,
+            chunk_bytes=chunk_bytes,
+        )
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -879,6 +2156,15 @@ class DataReader:
                 f"[0, {self.get_num_spectra()})"
             )
 
+    def _scan_indices(self, scan_indices: Sequence[int] | None) -> np.ndarray:
+        """Validate ``scan_indices`` (default: every scan) as an int64 array."""
+        if scan_indices is None:
+            return np.arange(self.get_num_spectra())
+        indices = np.asarray([int(i) for i in scan_indices], dtype=np.int64)
+        for i in indices:
+            self._check_spectrum_index(int(i))
+        return indices
+
     def _check_mass_index(self, index: int) -> None:
         if index < 0 or index >= self.get_num_masses():
             raise IndexError(
@@ -888,25 +2174,62 @@ class DataReader:
     # -- background / delta math ---------------------------------------
 
     def _ensure_background(self) -> np.ndarray:
-        if not self._bg_dirty and self._bg_spectrum is not None:
+        key = (self._bg_start_time, self._bg_end_time, self._bg_noise_offset)
+        if key == self._bg_key and self._bg_spectrum is not None:
             return self._bg_spectrum
-        n_masses = self.get_num_masses()
-        bg = np.zeros(n_masses, dtype=np.float64)
-        n = 0
-        times = self._dx.retention_times
-        for i in range(self.get_num_spectra()):
-            t = float(times[i])
-            if self._bg_start_time <= t <= self._bg_end_time:
-                bg += self._dx.get_spectrum(i)
-                n += 1
-        if n > 0:
-            bg = bg / n + self._bg_noise_offset
-        # When no scans fall inside the window we leave ``bg`` at zero;
-        # ``_compute_delta`` short-circuits to a zero output in that
-        # case to avoid divide-by-zero.
-        self._bg_spectrum = bg.astype(np.float32)
-        self._bg_dirty = False
-        return self._bg_spectrum
+        bg = self._bg_cache.get(key)
+        if bg is None:
+            window = self._dx.scans_between(self._bg_start_time, self._bg_end_time)
+            n = window.size
+            total = self._window_sum(window)
+            if n > 0:
+                total = total / n + self._bg_noise_offset
+            # When no scans fall inside the window we leave ``bg`` at zero;
+            # ``_compute_delta`` short-circuits to a zero output in that
+            # case to avoid divide-by-zero.
+            bg = _read_only(total.astype(np.float32))
+            self._bg_cache[key] = bg
+            if len(self._bg_cache) > _BG_CACHE_SIZE:
+                self._bg_cache.popitem(last=False)
+        else:
+            self._bg_cache.move_to_end(key)
+        self._bg_key = key
+        self._bg_spectrum = bg
+        return bg
+
+    def _window_sum(self, window: np.ndarray) -> np.ndarray:
+        """``float64`` sum of the spectra of the scans in ``window``."""
+        run = _as_range(window)
+        if run is None:
+            total = np.zeros(self.get_num_masses(), dtype=np.float64)
+            for i in window:
+                total += self._dx.get_spectrum(int(i))
+            return total
+        if self._dx._prefix_sums is not None:
+            return self._dx._prefix_sums.sum_spectrum(*run)
+
+        lo, hi = run
+        total = None
+        if self._bg_window is not None:
+            a, b, previous = self._bg_window
+            # Slide the previous window when that touches fewer scans
+            # than summing the new one afresh.
+            if abs(lo - a) + abs(hi - b) < hi - lo:
+                total = previous.copy()
+                for i in range(lo, a):
+                    total += self._dx.get_spectrum(i)
+                for i in range(a, lo):
+                    total -= self._dx.get_spectrum(i)
+                for i in range(b, hi):
+                    total += self._dx.get_spectrum(i)
+                for i in range(hi, b):
+                    total -= self._dx.get_spectrum(i)
+        if total is None:
+            total = np.zeros(self.get_num_masses(), dtype=np.float64)
+            for i in range(lo, hi):
+                total += self._dx.get_spectrum(i)
+        self._bg_window = (lo, hi, total)
+        return total
 
     def _compute_delta(
         self, spectrum: np.ndarray, background: np.ndarray
@@ -921,38 +2244,182 @@ class DataReader:
            (``masses[run_end] - masses[run_start]``) is less than
            ``min_width``.
         """
-        delta = np.zeros_like(spectrum, dtype=np.float32)
+        return self._compute_delta_block(spectrum[np.newaxis, :], background)[0]
+
+    def _compute_delta_block(
+        self, spectra: np.ndarray, background: np.ndarray
+    ) -> np.ndarray:
+        """:meth:`_compute_delta` for a ``(n_scans, num_masses)`` block at once."""
+        delta, padded = self._threshold_delta(spectra, background)
+        self._drop_narrow_runs(delta, padded, self._end_masses())
+        return delta
+
+    def _threshold_delta(
+        self, spectra: np.ndarray, background: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Pass 1 over a block: thresholded deltas and a zero-padded peak mask.
+
+        ``spectra`` and ``background`` may cover any contiguous slice of
+        the mass axis.  The mask is ``int8`` with one zero column on
+        either side of the slice.
+        """
+        delta = self._delta_ratio(spectra, background)
+
+        # ``threshold >= 1``, so the surviving deltas are exactly the
+        # positive ones.
+        n_rows, n_masses = delta.shape
+        padded = np.zeros((n_rows, n_masses + 2), dtype=np.int8)
+        peak = padded[:, 1:-1].view(bool)
+        np.greater_equal(delta, self._bg_threshold, out=peak)
+        np.multiply(delta, peak, out=delta)
+        return delta, padded
+
+    @staticmethod
+    def _delta_ratio(spectra: np.ndarray, background: np.ndarray) -> np.ndarray:
+        """``(spectra - bg) / bg`` where ``bg > 0``, else zero, in ``float32``."""
+        delta = np.zeros(spectra.shape, dtype=np.float32)
         bg = background.astype(np.float32, copy=False)
         nonzero = bg > 0
-        if nonzero.any():
-            d = (spectrum[nonzero] - bg[nonzero]) / bg[nonzero]
-            d = np.where(d < self._bg_threshold, 0.0, d)
-            delta[nonzero] = d
-
-        # Pass 2: drop runs of consecutive non-zero deltas narrower
-        # than ``min_width`` m/z.  We find run boundaries with
-        # ``np.diff`` and then zero the offending slices.
-        masses = self._dx.masses
-        is_peak = delta > 0
-        edges = np.diff(np.concatenate(([False], is_peak, [False])).astype(np.int8))
-        starts = np.where(edges == 1)[0]
-        ends = np.where(edges == -1)[0]  # exclusive
-        last_mass = float(masses[-1])
-        for s, e in zip(starts, ends):
-            end_mass = float(masses[e]) if e < masses.size else last_mass
-            if end_mass - float(masses[s]) < self._bg_min_width:
-                delta[s:e] = 0.0
-
+        if nonzero.all():
+            np.subtract(spectra, bg, out=delta)
+            np.divide(delta, bg, out=delta)
+        elif nonzero.any():
+            delta[:, nonzero] = (spectra[:, nonzero] - bg[nonzero]) / bg[nonzero]
         return delta
 
+    def _drop_narrow_runs(
+        self, delta: np.ndarray, padded: np.ndarray, end_masses: np.ndarray
+    ) -> None:
+        """Pass 2: zero runs of consecutive non-zero deltas narrower than ``min_width``.
+
+        ``end_masses[j]`` is the m/z at which a run ending just before
+        column ``j`` of ``delta`` is measured (one longer than a row).
+        Runs of the whole block are labelled from one pass over the
+        edges of the padded peak mask; flat positions in ``edges``
+        alternate start, end, start, ...
+        """
+        edges = np.diff(padded, axis=1)
+        flat = np.flatnonzero(edges)
+        if flat.size == 0:
+            return
+        n_masses = delta.shape[1]
+        width = n_masses + 1
+        rows, cols = np.divmod(flat[0::2], width)
+        ends = flat[1::2] - rows * width  # exclusive
+        narrow = end_masses[ends] - end_masses[cols] < self._bg_min_width
+        if narrow.any():
+            starts = rows[narrow] * n_masses + cols[narrow]
+            lengths = ends[narrow] - cols[narrow]
+            offsets = np.arange(int(lengths.sum())) - np.repeat(
+                np.cumsum(lengths) - lengths, lengths
+            )
+            delta.reshape(-1)[np.repeat(starts, lengths) + offsets] = 0.0
+
+    def _end_masses(self) -> np.ndarray:
+        """The m/z axis in ``float64`` with the last mass repeated once.
+
+        A run reaching the last sample is measured up to that sample.
+        """
+        masses = self._dx.masses.astype(np.float64)
+        return np.append(masses, masses[-1])
+
+    def _delta_columns(self, targets: np.ndarray) -> np.ndarray:
+        """Delta values of every scan at the sorted, unique mass indices ``targets``.
+
+        Equal to ``get_delta_matrix()[:, targets]``, but each cluster of
+        nearby targets is evaluated on a window of
+        ``_DELTA_XIC_PAD`` samples either side.  Whether a delta survives
+        the width filter depends only on the run of consecutive peaks
+        containing it, so a window is widened (doubling the margin on
+        that side) until, in every scan, the runs containing the
+        targets end inside it.
+        """
+        bg = self._ensure_background()
+        end_masses = self._end_masses()
+        n_scans, n_masses = self.get_num_spectra(), self.get_num_masses()
+        out = np.zeros((n_scans, targets.size), dtype=np.float32)
+        split = np.flatnonzero(np.diff(targets) > 2 * _DELTA_XIC_PAD) + 1
+        first = 0
+        for cluster in np.split(targets, split):
+            lo = max(int(cluster[0]) - _DELTA_XIC_PAD, 0)
+            hi = min(int(cluster[-1]) + _DELTA_XIC_PAD + 1, n_masses)
+            cluster_out = out[:, first : first + cluster.size]
+            first += cluster.size
+            rows = max(1, _DELTA_BLOCK_ELEMENTS // (hi - lo))
+            for start in range(0, n_scans, rows):
+                stop = min(start + rows, n_scans)
+                lo, hi = self._delta_window_values(
+                    range(start, stop), cluster, lo, hi, bg, end_masses,
+                    cluster_out[start:stop],
+                )
+        return out
+
+    def _delta_window_values(
+        self,
+        scans: range,
+        cluster: np.ndarray,
+        lo: int,
+        hi: int,
+        bg: np.ndarray,
+        end_masses: np.ndarray,
+        out: np.ndarray,
+    ) -> tuple[int, int]:
+        """Fill ``out`` with the deltas of ``scans`` at ``cluster``; see :meth:`_delta_columns`.
+
+        Returns the final window, which the next block of scans starts from.
+        """
+        n_masses = self.get_num_masses()
+        while True:
+            spectra = np.empty((len(scans), hi - lo), dtype=np.float32)
+            for j, i in enumerate(scans):
+                spectra[j] = self._dx._window(i, lo, hi)
+            delta, padded = self._threshold_delta(spectra, bg[lo:hi])
+            peak = padded[:, 1:-1]
+            first, last = int(cluster[0]), int(cluster[-1])
+            # A run containing a target that reaches the window edge may
+            # continue beyond it; double the margin on that side and retry.
+            open_left = lo > 0 and bool(peak[:, : first - lo + 1].all(axis=1).any())
+            open_right = hi < n_masses and bool(peak[:, last - lo :].all(axis=1).any())
+            if not (open_left or open_right):
+                break
+            if open_left:
+                lo = max(lo - (first - lo + 1), 0)
+            if open_right:
+                hi = min(hi + (hi - last), n_masses)
+        self._drop_narrow_runs(delta, padded, end_masses[lo : hi + 1])
+        out[...] = delta[:, cluster - lo]
+        return lo, hi
+
+    def _iter_delta_blocks(
+        self, scan_indices: np.ndarray
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield ``(offset, delta_block)`` over ``scan_indices`` in blocks."""
+        bg = self._ensure_background()
+        for first, spectra in self._iter_spectra_blocks(scan_indices):
+            yield first, self._compute_delta_block(spectra, bg)
+
+    def _iter_spectra_blocks(
+        self, scan_indices: np.ndarray
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield ``(offset, spectra)`` over ``scan_indices`` in blocks.
+
+        The block buffer is reused; consume it before the next step.
+        """
+        n_masses = self.get_num_masses()
+        rows = max(1, _DELTA_BLOCK_ELEMENTS // max(n_masses, 1))
+        spectra = np.empty((min(rows, scan_indices.size), n_masses), dtype=np.float32)
+        for first in range(0, scan_indices.size, rows):
+            chunk = scan_indices[first : first + rows]
+            for j, i in enumerate(chunk.tolist()):
+                spectra[j] = self._dx.get_spectrum(i)
+            yield first, spectra[: chunk.size]
+
     # -- metadata parsing ----------------------------------------------
 
-    def _get_segments(self) -> list["_Segment"]:
-        if self._segments is None:
-            self._segments = _parse_segments(self._dx)
-        return self._segments
+    def _get_segments(self) -> tuple[Segment, ...]:
+        return self._dx.metadata.segments
 
-    def _get_segment(self, index: int) -> "_Segment | None":
+    def _get_segment(self, index: int) -> Segment | None:
         segments = self._get_segments()
         if 0 <= index < len(segments):
             return segments[index]
@@ -974,17 +2441,6 @@ class DataReader:
 # ---------------------------------------------------------------------------
 
 
-class _Segment:
-    """One ``<segment>`` element from the ``.meta`` file."""
-
-    __slots__ = ("start_time", "ion_source_xml", "tune_params_xml")
-
-    def __init__(self, start_time: float, ion_source_xml: str, tune_params_xml: str):
-        self.start_time = start_time
-        self.ion_source_xml = ion_source_xml
-        self.tune_params_xml = tune_params_xml
-
-
 class _ScalarChannel:
     __slots__ = ("name", "times", "values", "attributes")
 
@@ -1010,41 +2466,6 @@ class _AuxFile:
         self.text = text
 
 
-def _parse_segments(dx: DatxFile) -> list[_Segment]:
-    meta_xml = dx.meta_xml
-    if not meta_xml:
-        return []
-    try:
-        root = ET.fromstring(meta_xml)
-    except ET.ParseError:
-        return []
-
-    out: list[_Segment] = []
-    for el in root.iter():
-        if _strip_ns(el.tag) != "segment":
-            continue
-        start_time = 0.0
-        ion_file = ""
-        tune_file = ""
-        for child in el:
-            local = _strip_ns(child.tag)
-            text = (child.text or "").strip()
-            if local == "startTime":
-                try:
-                    start_time = float(text)
-                except ValueError:
-                    pass
-            elif local == "ionSourceFile":
-                ion_file = text
-            elif local == "tuneParamsFile":
-                tune_file = text
-
-        ion_xml = _read_member_text(dx, ion_file) if ion_file else ""
-        tune_xml = _read_member_text(dx, tune_file) if tune_file else ""
-        out.append(_Segment(start_time, ion_xml, tune_xml))
-    return out
-
-
 def _parse_scalar_channels(dx: DatxFile) -> list[_ScalarChannel]:
     """Parse every ``*.scalar`` member of the archive."""
     channels: list[_ScalarChannel] = []
@@ -1056,63 +2477,172 @@ def _parse_scalar_channels(dx: DatxFile) -> list[_ScalarChannel]:
         raw = dx._raw(full_name)
         if raw is None:
             continue
-        try:
-            root = ET.fromstring(raw)
-        except ET.ParseError:
-            continue
-        name = ""
-        attributes: list[tuple[str, float]] = []
-        times: list[float] = []
-        values: list[float] = []
-        # Walk direct children of <scalarChannel> only, so a stray
-        # <name>...</name> inside <attribute> doesn't shadow the channel
-        # name.
-        for child in root:
-            local = _strip_ns(child.tag)
-            if local == "name":
-                name = (child.text or "").strip()
-            elif local == "attribute":
-                # Layout: <attribute><name>X</name><value>1.5</value></attribute>
-                # or <attribute name="X" value="1.5"/>.  Support both.
-                a_name = child.attrib.get("name", "")
-                a_value = child.attrib.get("value", "")
-                for sub in child:
-                    sub_local = _strip_ns(sub.tag)
-                    if sub_local == "name":
-                        a_name = (sub.text or "").strip()
-                    elif sub_local == "value":
-                        a_value = (sub.text or "").strip()
-                try:
-                    attributes.append((a_name, float(a_value)))
-                except ValueError:
-                    attributes.append((a_name, 0.0))
-            elif local == "entry":
-                t = child.attrib.get("time", "")
-                v = child.attrib.get("value", "")
-                for sub in child:
-                    sub_local = _strip_ns(sub.tag)
-                    if sub_local == "time":
-                        t = (sub.text or "").strip()
-                    elif sub_local == "value":
-                        v = (sub.text or "").strip()
-                try:
-                    times.append(float(t))
-                    values.append(float(v))
-                except ValueError:
-                    pass
-        channels.append(
-            _ScalarChannel(
-                name=name,
-                times=np.asarray(times, dtype=np.float32),
-                values=np.asarray(values, dtype=np.float32),
-                attributes=attributes,
-            )
-        )
+        channel = _parse_scalar_xml(raw)
+        if channel is not None:
+            channels.append(channel)
     # Sort by name so ``foo.0.scalar`` precedes ``foo.1.scalar``.
     channels.sort(key=lambda c: c.name)
     return channels
 
 
+# In a run of scalar ``<entry>`` elements the only tag or attribute name
+# containing an ``i`` is ``time`` and the only one containing a ``u`` is
+# ``value``, so keeping just those letters spells each entry's field
+# order: ``iiuu`` (child elements, open and close tags) or ``iu``
+# (attributes).
+_SCALAR_NOT_ORDER_LETTERS = bytes(c for c in range(256) if c not in b"iu")
+_SCALAR_TAG_PUNCT = bytes.maketrans(b'<>/="', b"     ")
+# What may remain of an entry run once its tag names are removed.
+_SCALAR_ENTRY_CHARS = b'0123456789+-.eE \t\r\n<>/="'
+
+
+def _parse_scalar_entries(body: bytes) -> np.ndarray | None:
+    """Bulk-parse a run of ``<entry>`` elements into an ``(n, 2)`` float64 table.
+
+    Handles both ``<entry><time>T</time><value>V</value></entry>`` and
+    ``<entry time="T" value="V"/>``, mixed freely.  Returns ``None``
+    when the run holds anything else (other elements, comments, text
+    that is not a plain number, value before time), so the caller can
+    fall back to the element parser, which skips such entries.
+    """
+    if b"<!" in body or b"<attribute" in body or b"<name" in body:
+        return None
+    order = body.translate(None, _SCALAR_NOT_ORDER_LETTERS)
+    if order.replace(b"iiuu", b"").replace(b"iu", b""):
+        return None
+    n = body.count(b"<entry")
+    # Without the tag names only punctuation and the numbers are left;
+    # anything else (units, decimal commas, prefixes) means entries the
+    # element parser would drop.
+    text = body.replace(b"entry", b"").replace(b"time", b"").replace(b"value", b"")
+    if text.translate(None, _SCALAR_ENTRY_CHARS):
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            values = np.fromstring(
+                text.translate(_SCALAR_TAG_PUNCT), dtype=np.float64, sep=" "
+            )
+        except ValueError:
+            # e.g. a stray ``e`` or sign that is not part of a number.
+            return None
+    if values.size != 2 * n:
+        return None
+    return values.reshape(n, 2)
+
+
+def _parse_scalar_xml(raw: bytes) -> _ScalarChannel | None:
+    """Parse one ``.scalar`` member; ``None`` if it is not valid XML.
+
+    The ``<entry>`` run is handed to :func:`_parse_scalar_entries`, so
+    only the short header goes through ElementTree; anything the bulk
+    parser rejects is parsed element by element instead.
+    """
+    first = raw.find(b"<entry")
+    last = raw.rfind(b"</scalarChannel")
+    if 0 <= first < last:
+        table = _parse_scalar_entries(raw[first:last])
+        if table is not None:
+            channel = _parse_scalar_elements(raw[:first] + raw[last:])
+            if channel is not None:
+                channel.times = _read_only(table[:, 0].astype(np.float32))
+                channel.values = _read_only(table[:, 1].astype(np.float32))
+            return channel
+    return _parse_scalar_elements(raw)
+
+
+def _parse_scalar_elements(raw: bytes) -> _ScalarChannel | None:
+    """Parse one ``.scalar`` member with ElementTree, entry by entry."""
+    try:
+        root = ET.fromstring(raw)
+    except ET.ParseError:
+        return None
+    name = ""
+    attributes: list[tuple[str, float]] = []
+    times: list[float] = []
+    values: list[float] = []
+    # Walk direct children of <scalarChannel> only, so a stray
+    # <name>...</name> inside <attribute> doesn't shadow the channel
+    # name.
+    for child in root:
+        local = _strip_ns(child.tag)
+        if local == "name":
+            name = (child.text or "").strip()
+        elif local == "attribute":
+            # Layout: <attribute><name>X</name><value>1.5</value></attribute>
+            # or <attribute name="X" value="1.5"/>.  Support both.
+            a_name = child.attrib.get("name", "")
+            a_value = child.attrib.get("value", "")
+            for sub in child:
+                sub_local = _strip_ns(sub.tag)
+                if sub_local == "name":
+                    a_name = (sub.text or "").strip()
+                elif sub_local == "value":
+                    a_value = (sub.text or "").strip()
+            try:
+                attributes.append((a_name, float(a_value)))
+            except ValueError:
+                attributes.append((a_name, 0.0))
+        elif local == "entry":
+            t = child.attrib.get("time", "")
+            v = child.attrib.get("value", "")
+            for sub in child:
+                sub_local = _strip_ns(sub.tag)
+                if sub_local == "time":
+                    t = (sub.text or "").strip()
+                elif sub_local == "value":
+                    v = (sub.text or "").strip()
+            try:
+                times.append(float(t))
+                values.append(float(v))
+            except ValueError:
+                pass
+    return _ScalarChannel(
+        name=name,
+        times=_read_only(np.asarray(times, dtype=np.float32)),
+        values=_read_only(np.asarray(values, dtype=np.float32)),
+        attributes=attributes,
+    )
+
+
+class _ScalarTimeBase:
+    """Scalar channels sampled at the same times, stacked for lookups.
+
+    ``times`` is sorted ``float64``; ``values`` holds one ``float64`` row
+    per channel in ``rows`` (channel numbers), in the order of ``times``.
+    """
+
+    __slots__ = ("times", "values", "rows")
+
+    def __init__(self, times: np.ndarray, values: np.ndarray, rows: np.ndarray):
+        self.times = times
+        self.values = values
+        self.rows = rows
+
+
+def _scalar_time_bases(channels: list[_ScalarChannel]) -> list[_ScalarTimeBase]:
+    """Sort each channel's samples once and group channels by time base.
+
+    Channels without samples are left out.
+    """
+    groups: dict[bytes, tuple[np.ndarray, list[np.ndarray], list[int]]] = {}
+    for row, chan in enumerate(channels):
+        t = chan.times.astype(np.float64)
+        if t.size == 0:
+            continue
+        v = chan.values.astype(np.float64)
+        if np.any(t[1:] < t[:-1]):
+            order = np.argsort(t, kind="stable")
+            t, v = t[order], v[order]
+        group = groups.setdefault(t.tobytes(), (t, [], []))
+        group[1].append(v)
+        group[2].append(row)
+    return [
+        _ScalarTimeBase(t, np.vstack(values), np.asarray(rows, dtype=np.int64))
+        for t, values, rows in groups.values()
+    ]
+
+
 def _parse_aux_files(dx: DatxFile) -> list[_AuxFile]:
     """Parse the optional ``auxfiles`` index plus per-file payloads.
 
@@ -1157,24 +2687,6 @@ def _parse_aux_files(dx: DatxFile) -> list[_AuxFile]:
                 is_html = text.lower() == "true"
         if is_html and type_ == "text":
             type_ = "text/html"
-        body = _read_member_text(dx, name)
+        body = dx.metadata.member_text(name)
         out.append(_AuxFile(name=name, type_=type_, text=body))
     return out
-
-
-def _read_member_text(dx: DatxFile, name: str) -> str:
-    if not name:
-        return ""
-    blob = dx._raw(name)
-    if blob is None:
-        for fn in dx.list_files():
-            if fn.rsplit("/", 1)[-1] == name:
-                blob = dx._raw(fn)
-                if blob is not None:
-                    break
-    if blob is None:
-        return ""
-    try:
-        return blob.decode("utf-8")
-    except UnicodeDecodeError:
-        return blob.decode("utf-8", errors="replace")
@@ -28,6 +28,7 @@ from :mod:`advion_io.data_reader`.
 """
 from __future__ import annotations
 
+import os
 import struct
 import zipfile
 from pathlib import Path
@@ -37,7 +38,11 @@ from xml.sax.saxutils import escape
 import numpy as np
 
 from .constants import AdvionDataErrorCode
-from .data_reader import decode_intensities_blob
+from .data_reader import (
+    SCAN_INDEX_SIDECAR_EXT,
+    _render_scan_index_sidecar,
+    decode_intensities_blob,
+)
 
 __all__ = ["DataWriter", "encode_intensities_blob", "MAX_EXTENSIONS_PER_GROUP"]
 
@@ -278,6 +283,13 @@ def _xml_escape(text: str) -> str:
     return escape(text, {'"': "&quot;"})
 
 
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` via a temporary file and a rename."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
 class _ScalarChannel:
     """In-flight scalar channel state.
 
@@ -312,7 +324,10 @@ class DataWriter:
 
     Files are accumulated under ``<folder>/<root_name>/`` during the
     lifetime of the object and zipped into ``<folder>/<root_name>.datx``
-    by :meth:`create_datx_file`.
+    by :meth:`create_datx_file`.  The mass axis, the ``.spectra`` blob
+    and the ``.scans`` index are streamed to that folder as soon as they
+    are written, so an acquisition in progress can be followed with
+    :class:`advion_io.LiveReader`.
 
     Parameters
     ----------
@@ -375,6 +390,12 @@ class DataWriter:
         self._store_as_float = False
         self._next_scan_index = 0
 
+        # Open handles on the streamed ``.spectra`` / ``.scans`` files,
+        # plus the ``.scans`` header they were started with.
+        self._spectra_fh = None
+        self._scans_fh = None
+        self._streamed_header: str | None = None
+
         # Scalar channels + aux files.
         self._scalar_channels: list[_ScalarChannel] = []
         self._aux_files: list[_AuxFile] = []
@@ -391,6 +412,7 @@ class DataWriter:
         self.close()
 
     def close(self) -> None:
+        self._close_streams()
         self._closed = True
 
     # -- Static helpers -----------------------------------------------
@@ -477,6 +499,10 @@ class DataWriter:
         if arr.size == 0:
             raise IOError(AdvionDataErrorCode.PARAMETER_OUT_OF_RANGE)
         self._masses = arr.copy()
+        _write_atomic(
+            self._inner / f"{self.root_name}.masses",
+            self._masses.astype("<f4").tobytes(),
+        )
 
     def write_scan_data(
         self,
@@ -529,10 +555,10 @@ class DataWriter:
 
         offset = len(self._spectra_bytes)
         self._spectra_bytes.extend(chunk)
-        self._scan_records.append(
-            (float(retention_time), float(tic), offset, len(chunk))
-        )
+        record = (float(retention_time), float(tic), offset, len(chunk))
+        self._scan_records.append(record)
         self._next_scan_index += 1
+        self._stream_scan(chunk, record)
 
     def _promote_existing_to_float(self) -> None:
         """Re-encode previously bit-packed scans as raw float32.
@@ -557,6 +583,53 @@ class DataWriter:
             new_bytes.extend(new_chunk)
         self._spectra_bytes = new_bytes
         self._scan_records = new_records
+        if self._spectra_fh is not None:
+            self._restream()
+
+    # -- Streaming to the loose folder ---------------------------------
+
+    def _stream_scan(self, chunk: bytes, record: tuple[float, float, int, int]) -> None:
+        """Append one scan to the on-disk ``.spectra`` and ``.scans`` files.
+
+        The spectrum bytes are flushed before its index record, so a
+        reader that sees a record can always read the bytes it points at.
+        """
+        if self._spectra_fh is None and len(self._scan_records) > 1:
+            # Streams closed by create_datx_file(): rewrite both files
+            # from memory (this scan included) and keep appending.
+            self._restream()
+            return
+        if self._spectra_fh is None:
+            self._spectra_fh = (self._inner / f"{self.root_name}.spectra").open("wb")
+            self._scans_fh = (self._inner / f"{self.root_name}.scans").open("wb")
+            self._streamed_header = self._render_scans_header()
+            self._scans_fh.write(self._streamed_header.encode("utf-8"))
+        self._spectra_fh.write(chunk)
+        self._spectra_fh.flush()
+        self._scans_fh.write(self._render_scan_record(record).encode("utf-8"))
+        self._scans_fh.flush()
+
+    def _restream(self) -> None:
+        """Replace the streamed files after the whole dataset changed.
+
+        Both files are swapped in atomically, so a :class:`LiveReader`
+        sees a new file (and starts over) instead of a half-rewritten one.
+        """
+        self._close_streams()
+        spectra_path = self._inner / f"{self.root_name}.spectra"
+        scans_path = self._inner / f"{self.root_name}.scans"
+        _write_atomic(spectra_path, bytes(self._spectra_bytes))
+        self._streamed_header = self._render_scans_header()
+        _write_atomic(scans_path, self._render_scans_xml().encode("utf-8"))
+        self._spectra_fh = spectra_path.open("ab")
+        self._scans_fh = scans_path.open("ab")
+
+    def _close_streams(self) -> None:
+        for fh in (self._spectra_fh, self._scans_fh):
+            if fh is not None:
+                fh.close()
+        self._spectra_fh = None
+        self._scans_fh = None
 
     # -- Scalar channels ---------------------------------------------
 
@@ -616,9 +689,17 @@ class DataWriter:
 
     # -- Finalisation -------------------------------------------------
 
-    def create_datx_file(self) -> Path:
+    def create_datx_file(self, scan_index: bool = False) -> Path:
         """Materialise loose files and zip them into ``<root>.datx``.
 
+        Parameters
+        ----------
+        scan_index:
+            Also store the scan index as a compact binary member
+            (``<root>.scanidx``) next to the ``.scans`` XML.
+            :class:`advion_io.DatxFile` then opens the archive without
+            parsing the XML; other readers ignore the extra member.
+
         Returns
         -------
         pathlib.Path
@@ -629,17 +710,30 @@ class DataWriter:
         if not self._scan_records:
             raise IOError(AdvionDataErrorCode.NO_SPECTRA)
 
-        # 1. Write masses (raw little-endian float32).
-        masses_path = self._inner / f"{self.root_name}.masses"
-        masses_path.write_bytes(self._masses.astype("<f4").tobytes())
-
-        # 2. Concatenated per-scan spectra.
-        spectra_path = self._inner / f"{self.root_name}.spectra"
-        spectra_path.write_bytes(bytes(self._spectra_bytes))
+        # 1-2. Masses (raw little-endian float32) and the concatenated
+        # per-scan spectra were streamed as they arrived.
+        self._close_streams()
 
-        # 3. .scans XML index.
-        scans_path = self._inner / f"{self.root_name}.scans"
-        scans_path.write_text(self._render_scans_xml(), encoding="utf-8")
+        # 3. .scans XML index.  Also streamed; only rewritten when the
+        # header changed after the first scan went out.
+        if self._render_scans_header() != self._streamed_header:
+            _write_atomic(
+                self._inner / f"{self.root_name}.scans",
+                self._render_scans_xml().encode("utf-8"),
+            )
+            self._streamed_header = self._render_scans_header()
+
+        # 3b. Optional binary scan index.
+        sidecar_path = self._inner / f"{self.root_name}{SCAN_INDEX_SIDECAR_EXT}"
+        if scan_index:
+            table = np.array(
+                [(rt, off, size, tic) for rt, tic, off, size in self._scan_records],
+                dtype=np.float64,
+            )
+            _write_atomic(sidecar_path, _render_scan_index_sidecar(table))
+        else:
+            # Never ship a stale sidecar left over from an earlier run.
+            sidecar_path.unlink(missing_ok=True)
 
         # 4. .meta XML (hardware type, scan mode index, segments).
         meta_path = self._inner / f"{self.root_name}.meta"
@@ -707,7 +801,18 @@ class DataWriter:
             for p in sorted(self._inner.iterdir()):
                 if not p.is_file():
                     continue
-                zf.write(p, arcname=f"{self.root_name}/{p.name}")
+                # The binary scan index is stored uncompressed: inflating
+                # it would cost more than the XML parse it replaces.
+                compress_type = (
+                    zipfile.ZIP_STORED
+                    if p.suffix == SCAN_INDEX_SIDECAR_EXT
+                    else zipfile.ZIP_DEFLATED
+                )
+                zf.write(
+                    p,
+                    arcname=f"{self.root_name}/{p.name}",
+                    compress_type=compress_type,
+                )
         return out_path
 
     # -- Rendering helpers --------------------------------------------
@@ -716,6 +821,11 @@ class DataWriter:
         # Match the on-disk format produced by the Advion reference:
         # CRLF line endings, tab indents, header followed by ``<scan>``
         # lines.
+        return self._render_scans_header() + "".join(
+            self._render_scan_record(r) for r in self._scan_records
+        )
+
+    def _render_scans_header(self) -> str:
         lines = [
             '<?xml version="1.0" encoding="UTF-8"?>',
             '<scans version="1.1">',
@@ -727,13 +837,16 @@ class DataWriter:
             f"\t<hardwareID>{_xml_escape(self._instrument_id)}</hardwareID>",
             f"\t<storeAsFloat>{'true' if self._store_as_float else 'false'}</storeAsFloat>",
         ]
-        for rt, tic, off, size in self._scan_records:
-            lines.append(
-                f"<scan><time>{rt}</time><index>{off}</index>"
-                f"<size>{size}</size><tic>{tic}</tic></scan>"
-            )
         return "\r\n".join(lines) + "\r\n"
 
+    @staticmethod
+    def _render_scan_record(record: tuple[float, float, int, int]) -> str:
+        rt, tic, off, size = record
+        return (
+            f"<scan><time>{rt}</time><index>{off}</index>"
+            f"<size>{size}</size><tic>{tic}</tic></scan>\r\n"
+        )
+
     def _render_meta_xml(self) -> str:
         lines = ['<?xml version="1.0" encoding="UTF-8"?>',
                  '<acquisitionMetadata version="1.1">']
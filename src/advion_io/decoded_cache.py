@@ -0,0 +1,162 @@
+"""Persistent on-disk cache of decoded ``.datx`` intensity matrices.
+
+Decoding a long run from scratch on every open is the dominant cost of
+dashboard restarts and repeated batch jobs.  :class:`DecodedCache` keeps
+one directory per acquisition under a cache root::
+
+    <root>/<fingerprint>/intensities.npy      (num_spectra, num_masses) float32
+    <root>/<fingerprint>/masses.npy
+    <root>/<fingerprint>/retention_times.npy
+    <root>/<fingerprint>/tic.npy
+
+The fingerprint is derived from the archive's central directory (member
+names, CRCs and sizes), so it can be computed without reading any
+member.  Entries are memory-mapped on reopen, which also makes runs
+larger than RAM usable.  The matrix is decoded straight into a memmap in
+a temporary directory and renamed into place once complete, so readers
+never see a half-written entry.  An optional size cap evicts whole entry
+directories, least recently used first, and sweeps temporary
+directories left behind by decodes that crashed or were abandoned.
+
+Used through ``DatxFile(path, cache_dir=...)``; see
+:class:`advion_io.DatxFile`.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+__all__ = ["DecodedCache"]
+
+_MATRIX = "intensities.npy"
+_AXES = ("masses", "retention_times", "tic")
+_PENDING_SUFFIX = ".pending"
+
+
+class DecodedCache:
+    """A directory of decoded intensity matrices keyed by fingerprint.
+
+    Parameters
+    ----------
+    root:
+        Cache directory.  Created if absent.
+    max_bytes:
+        Size cap for the whole cache.  After each new entry the least
+        recently used entries are removed until the total fits.  ``None``
+        means no cap.
+    pending_grace:
+        Seconds after its last write before an unfinished entry counts
+        as abandoned and :meth:`evict` removes it.  Generous by default,
+        since a process may still be decoding a long run into it.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int | None = None,
+        pending_grace: float = 24 * 3600.0,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.pending_grace = pending_grace
+
+    def lookup(self, key: str) -> dict[str, np.ndarray] | None:
+        """Return read-only memmaps for ``key``, or ``None`` on a miss.
+
+        A hit marks the entry as most recently used.
+        """
+        entry = self.root / key
+        if not (entry / _MATRIX).is_file():
+            return None
+        try:
+            arrays = {
+                name: np.load(entry / f"{name}.npy", mmap_mode="r")
+                for name in ("intensities", *_AXES)
+            }
+        except (OSError, ValueError):
+            # Damaged entry (e.g. truncated by a full disk): drop it.
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(entry)
+        return arrays
+
+    def create(self, key: str, shape: tuple[int, int]) -> tuple[Path, np.ndarray]:
+        """Start a new entry; returns its pending directory and a writable memmap."""
+        pending = self.root / f"{key}.{uuid.uuid4().hex}{_PENDING_SUFFIX}"
+        pending.mkdir()
+        matrix = np.lib.format.open_memmap(
+            pending / _MATRIX, mode="w+", dtype=np.float32, shape=shape
+        )
+        return pending, matrix
+
+    def commit(
+        self, key: str, pending: Path, matrix: np.ndarray, axes: dict[str, np.ndarray]
+    ) -> None:
+        """Write the axes, publish ``pending`` as ``key`` and apply the size cap."""
+        matrix.flush()
+        for name in _AXES:
+            np.save(pending / f"{name}.npy", np.asarray(axes[name]))
+        try:
+            os.replace(pending, self.root / key)
+        except OSError:
+            # Another process published the same entry first.
+            shutil.rmtree(pending, ignore_errors=True)
+        self.evict(keep=key)
+
+    def discard(self, pending: Path) -> None:
+        """Remove an entry that was never completed."""
+        shutil.rmtree(pending, ignore_errors=True)
+
+    def size_bytes(self) -> int:
+        """Total size of all committed entries."""
+        return sum(size for _entry, size, _mtime in self._entries())
+
+    def evict(self, keep: str | None = None) -> None:
+        """Remove least recently used entries until the cache fits ``max_bytes``.
+
+        Unfinished entries older than ``pending_grace`` are removed first,
+        whether or not there is a cap.
+        """
+        self._sweep_pending()
+        if self.max_bytes is None:
+            return
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _entry, size, _mtime in entries)
+        for entry, size, _mtime in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def _sweep_pending(self) -> None:
+        cutoff = time.time() - self.pending_grace
+        for entry in self.root.iterdir():
+            if not entry.name.endswith(_PENDING_SUFFIX):
+                continue
+            try:
+                # The memmap is written in place, so the newest file
+                # mtime, not the directory's, shows whether it is alive.
+                touched = max(
+                    [entry.stat().st_mtime] + [f.stat().st_mtime for f in entry.iterdir()]
+                )
+            except OSError:
+                continue  # committed or discarded meanwhile
+            if touched < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _entries(self) -> list[tuple[Path, int, int]]:
+        out = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.endswith(_PENDING_SUFFIX):
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+            out.append((entry, size, entry.stat().st_mtime_ns))
+        return out
@@ -0,0 +1,254 @@
+"""Writers for decoded ``.datx`` runs, and :func:`load` to read them back.
+
+Every format stores the same three arrays as the historical gzipped
+pickle -- ``masses``, ``times`` and the ``(num_spectra, num_masses)``
+``intensities`` matrix:
+
+``"pickle"``
+    ``{'masses', 'times', 'intensities'}`` pickled through gzip (the
+    ``convert-all`` schema).  Needs the whole matrix at once.
+``"npz"``
+    An uncompressed ``.npz`` (as :func:`numpy.savez` writes), readable
+    with :func:`numpy.load`.
+``"npy"``
+    A directory of ``masses.npy``, ``times.npy`` and
+    ``intensities.npy``; :func:`load` memory-maps the matrix.
+``"chunked"``
+    A zip of ``masses.npy``, ``times.npy`` and the matrix in blocks of
+    ``chunk_scans`` scans, each compressed separately with ``codec`` at
+    ``level``.  Blocks are compressed in parallel threads (the codecs
+    release the GIL), which makes this the fastest compressed format.
+
+Except for ``"pickle"``, the matrix is streamed to disk one scan (or one
+block) at a time straight from the decode loop.  Scans are decoded
+without entering ``dx``'s spectrum cache (those already cached are read
+from it), so peak memory is one block, not the whole run.  Used through
+:meth:`advion_io.DataReader.save`.
+"""
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import pickle
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .data_reader import DatxFile
+
+__all__ = ["FORMATS", "CODECS", "load", "save"]
+
+FORMATS = ("pickle", "npz", "npy", "chunked")
+
+#: Compressors for the ``"chunked"`` format: ``name -> (compress, decompress)``.
+CODECS: dict[str, tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "bz2": (lambda data, level: bz2.compress(data, max(level, 1)), bz2.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+}
+
+_SUFFIX_FORMATS = {".npz": "npz"}
+_CHUNK_LAYOUT = "intensities.json"
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def save(
+    dx: "DatxFile",
+    path: str | Path,
+    format: str | None = None,
+    level: int = 6,
+    codec: str = "zlib",
+    chunk_scans: int = 256,
+    workers: int | None = None,
+) -> Path:
+    """Write the decoded run in ``dx`` to ``path``; returns the path.
+
+    Parameters
+    ----------
+    format:
+        One of :data:`FORMATS`.  ``None`` picks ``"npz"`` for a
+        ``.npz`` suffix and ``"pickle"`` otherwise.
+    level:
+        Compression level for ``"pickle"`` (gzip) and ``"chunked"``.
+    codec:
+        Compressor for ``"chunked"``; a key of :data:`CODECS`.
+    chunk_scans:
+        Scans per compressed block for ``"chunked"``.
+    workers:
+        Compression threads for ``"chunked"``; ``None`` uses the CPU
+        count and ``1`` compresses in the calling thread.
+    """
+    path = Path(path)
+    if format is None:
+        format = _SUFFIX_FORMATS.get(path.suffix.lower(), "pickle")
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r}; expected one of {FORMATS}")
+    if format == "chunked" and codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r}; expected one of {tuple(CODECS)}")
+    if chunk_scans < 1:
+        raise ValueError("chunk_scans must be at least 1")
+
+    if format == "pickle":
+        payload = {
+            "masses": dx.masses,
+            "times": dx.retention_times,
+            "intensities": dx.intensities,
+        }
+        with path.open("wb") as fh, gzip.GzipFile(
+            fileobj=fh, mode="wb", compresslevel=level
+        ) as gz:
+            # Protocol 5 would keep the shared arrays' read-only flag; with
+            # protocol 4 they unpickle writeable, as they always have.
+            pickle.dump(payload, gz, protocol=4)
+    elif format == "npy":
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "masses.npy", dx.masses)
+        np.save(path / "times.npy", dx.retention_times)
+        matrix = np.lib.format.open_memmap(
+            path / "intensities.npy",
+            mode="w+",
+            dtype=np.float32,
+            shape=(dx.num_spectra, dx.num_masses),
+        )
+        for i in range(dx.num_spectra):
+            matrix[i] = dx._row(i)
+        matrix.flush()
+        del matrix
+    else:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            _write_npy(zf, "masses.npy", dx.masses)
+            _write_npy(zf, "times.npy", dx.retention_times)
+            if format == "npz":
+                _write_rows(zf, dx)
+            else:
+                _write_chunks(zf, dx, codec, level, chunk_scans, workers)
+    return path
+
+
+def load(path: str | Path, mmap: bool = True) -> dict[str, np.ndarray]:
+    """Read back any format written by :func:`save`.
+
+    Returns ``{'masses', 'times', 'intensities'}``.  With ``mmap`` the
+    ``"npy"`` matrix is memory-mapped read-only instead of read.
+    """
+    path = Path(path)
+    if path.is_dir():
+        mode = "r" if mmap else None
+        return {
+            name: np.load(path / f"{name}.npy", mmap_mode=mode)
+            for name in ("masses", "times", "intensities")
+        }
+    with path.open("rb") as fh:
+        magic = fh.read(2)
+    if magic == _GZIP_MAGIC:
+        with gzip.open(path, "rb") as gz:
+            return pickle.load(gz)
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        out = {name: _read_npy(zf, f"{name}.npy") for name in ("masses", "times")}
+        if _CHUNK_LAYOUT not in names:
+            out["intensities"] = _read_npy(zf, "intensities.npy")
+            return out
+        layout = json.loads(zf.read(_CHUNK_LAYOUT))
+        decompress = CODECS[layout["codec"]][1]
+        n_scans, n_masses = layout["shape"]
+        matrix = np.empty((n_scans, n_masses), dtype=np.float32)
+        for k, first in enumerate(range(0, n_scans, layout["chunk_scans"])):
+            block = np.frombuffer(
+                decompress(zf.read(f"intensities/{k:06d}")), dtype="<f4"
+            )
+            matrix[first : first + block.size // max(n_masses, 1)] = block.reshape(
+                -1, n_masses
+            )
+        out["intensities"] = matrix
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+
+def _npy_header(shape: tuple[int, ...]) -> bytes:
+    """The ``.npy`` header of a C-ordered little-endian ``float32`` array."""
+    buf = io.BytesIO()
+    np.lib.format.write_array_header_2_0(
+        buf, {"descr": "<f4", "fortran_order": False, "shape": shape}
+    )
+    return buf.getvalue()
+
+
+def _write_npy(zf: zipfile.ZipFile, name: str, arr: np.ndarray) -> None:
+    with zf.open(name, "w", force_zip64=True) as fh:
+        np.lib.format.write_array(fh, np.asarray(arr), allow_pickle=False)
+
+
+def _read_npy(zf: zipfile.ZipFile, name: str) -> np.ndarray:
+    with zf.open(name) as fh:
+        return np.lib.format.read_array(fh, allow_pickle=False)
+
+
+def _write_rows(zf: zipfile.ZipFile, dx: "DatxFile") -> None:
+    """Stream the matrix into ``intensities.npy`` one decoded scan at a time."""
+    with zf.open("intensities.npy", "w", force_zip64=True) as fh:
+        fh.write(_npy_header((dx.num_spectra, dx.num_masses)))
+        for i in range(dx.num_spectra):
+            fh.write(dx._row(i).astype("<f4", copy=False).tobytes())
+
+
+def _write_chunks(
+    zf: zipfile.ZipFile,
+    dx: "DatxFile",
+    codec: str,
+    level: int,
+    chunk_scans: int,
+    workers: int | None,
+) -> None:
+    """Compress blocks of ``chunk_scans`` scans in parallel, writing them in order.
+
+    At most two blocks per worker are in flight, so memory stays bounded
+    by the block size whatever the run length.
+    """
+    compress = CODECS[codec][0]
+    n_scans, n_masses = dx.num_spectra, dx.num_masses
+    layout = {
+        "shape": [n_scans, n_masses],
+        "chunk_scans": chunk_scans,
+        "codec": codec,
+        "level": level,
+    }
+    zf.writestr(_CHUNK_LAYOUT, json.dumps(layout))
+
+    def block(first: int) -> bytes:
+        rows = np.empty((min(chunk_scans, n_scans - first), n_masses), dtype="<f4")
+        for j in range(rows.shape[0]):
+            rows[j] = dx._row(first + j)
+        return rows.tobytes()
+
+    starts = range(0, n_scans, chunk_scans)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for k, first in enumerate(starts):
+            zf.writestr(f"intensities/{k:06d}", compress(block(first), level))
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for k, first in enumerate(starts):
+            # Decoding stays on this thread; only compression is parallel.
+            pending.append((k, pool.submit(compress, block(first), level)))
+            if len(pending) >= 2 * workers:
+                done, future = pending.popleft()
+                zf.writestr(f"intensities/{done:06d}", future.result())
+        while pending:
+            done, future = pending.popleft()
+            zf.writestr(f"intensities/{done:06d}", future.result())
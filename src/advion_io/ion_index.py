@@ -0,0 +1,388 @@
+"""Inverted m/z index for "which scans contain this ion" queries.
+
+Finding the runs and scans in which an ion exceeds some intensity
+normally means decoding every archive.  :class:`IonIndex` instead keeps,
+per archive, one posting list per m/z bin: the sorted scan indices in
+which the bin has signal, each with its maximum intensity quantised to
+one byte.  A query reads only the postings of the bins it needs,
+intersects them across ions, and decodes just the candidate scans to
+confirm exact intensities.
+
+The index is a directory of per-archive shards, each a handful of
+``.npy`` files that are memory-mapped on query::
+
+    <root>/index.json                 bin width and intensity floor
+    <root>/<shard>/meta.json          archive path, fingerprint, scan count
+    <root>/<shard>/bins.npy           (n_bins,) int64 m/z bin ids, sorted
+    <root>/<shard>/offsets.npy        (n_bins + 1,) int64 CSR offsets
+    <root>/<shard>/scans.npy          (n_postings,) uint32 scan indices
+    <root>/<shard>/levels.npy         (n_postings,) uint8 quantised maxima
+
+Bin ``b`` covers ``[b * bin_width, (b + 1) * bin_width)``.  Levels are
+on a log scale, :data:`LEVELS_PER_OCTAVE` steps per doubling, rounded
+*up*, so a level is an upper bound of the true maximum and filtering on
+it never drops a real hit.
+
+Updates are incremental: an archive is re-indexed only when its
+fingerprint (see :class:`advion_io.DatxFile`) changed, and shards of
+archives that disappeared are removed.  Archives are indexed in
+parallel worker processes.
+
+.. code-block:: python
+
+    from advion_io.ion_index import IonIndex
+
+    index = IonIndex("ions.idx", bin_width=0.1)
+    index.update("/data/acquisitions")
+    for hit in index.query(301.1, threshold=5e4):
+        print(hit.path, hit.scan, hit.time, hit.intensity)
+"""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .batch import iter_shards, shard_name, staged_directory, update_shards
+from .data_reader import DatxFile
+
+__all__ = ["IonHit", "IonIndex", "IonIndexUpdate", "LEVELS_PER_OCTAVE"]
+
+#: Quantisation resolution of the stored per-bin maxima (about 9 %).
+LEVELS_PER_OCTAVE = 8
+
+_FORMAT_VERSION = 1
+_INDEX_META = "index.json"
+_SHARD_META = "meta.json"
+_BLOCK_SCANS = 256
+
+
+@dataclass(frozen=True)
+class IonIndexUpdate:
+    """What one :meth:`IonIndex.update` call did."""
+
+    added: int       # archives (re-)indexed
+    unchanged: int   # archives skipped because the fingerprint matched
+    removed: int     # shards dropped for archives that no longer exist
+    failed: int      # archives that could not be read
+
+
+@dataclass(frozen=True)
+class IonHit:
+    """One confirmed (or candidate) scan returned by :meth:`IonIndex.query`.
+
+    ``intensity`` is the smallest, over the queried ions, of the maximum
+    intensity within each ion's m/z window.  Unconfirmed hits carry the
+    quantised upper bound instead.
+    """
+
+    path: str
+    scan: int
+    time: float
+    intensity: float
+
+
+def _quantise(values: np.ndarray) -> np.ndarray:
+    """Map intensities to ``uint8`` levels that round *up* on a log scale."""
+    logs = np.log2(np.maximum(values.astype(np.float64), 1.0))
+    # The small offset keeps float rounding from ever producing a level
+    # below the true value.
+    levels = np.ceil(logs * LEVELS_PER_OCTAVE + 1e-9)
+    return np.clip(levels, 0, 255).astype(np.uint8)
+
+
+def _upper_bound(levels: np.ndarray) -> np.ndarray:
+    """Largest intensity a quantised level may stand for."""
+    bound = np.exp2(levels.astype(np.float64) / LEVELS_PER_OCTAVE)
+    bound[levels == 255] = np.inf
+    return bound
+
+
+def _bin_range(mz: float, tol: float, bin_width: float) -> np.ndarray:
+    lo = int(np.floor((mz - tol) / bin_width))
+    hi = int(np.floor((mz + tol) / bin_width))
+    return np.arange(lo, hi + 1, dtype=np.int64)
+
+
+def _build_shard(
+    path: str, fingerprint: str, shard: str, bin_width: float, min_intensity: float
+) -> None:
+    """Index one archive into ``shard``; top-level so it can run in a worker.
+
+    The shard is written to a pending directory and renamed into place,
+    so a concurrent query never sees half of it.
+    """
+    with staged_directory(Path(shard)) as pending:
+        with DatxFile(path, cache_bytes=0) as dx:
+            n_scans = dx.num_spectra
+            bin_ids = np.floor(dx.masses.astype(np.float64) / bin_width).astype(np.int64)
+            order = np.argsort(bin_ids, kind="stable")
+            if np.all(order == np.arange(order.size)):
+                order = None
+            sorted_ids = bin_ids if order is None else bin_ids[order]
+            unique_bins, starts = np.unique(sorted_ids, return_index=True)
+
+            scan_parts: list[np.ndarray] = []
+            col_parts: list[np.ndarray] = []
+            level_parts: list[np.ndarray] = []
+            block = np.empty((min(_BLOCK_SCANS, n_scans), dx.num_masses), dtype=np.float32)
+            for first in range(0, n_scans if dx.num_masses else 0, _BLOCK_SCANS):
+                count = min(_BLOCK_SCANS, n_scans - first)
+                for j in range(count):
+                    block[j] = dx.get_spectrum(first + j)
+                rows = block[:count] if order is None else block[:count, order]
+                # Per-scan maximum of every m/z bin.
+                bin_max = np.maximum.reduceat(rows, starts, axis=1)
+                scan_idx, cols = np.nonzero(bin_max > min_intensity)
+                scan_parts.append((scan_idx + first).astype(np.uint32))
+                col_parts.append(cols)
+                level_parts.append(_quantise(bin_max[scan_idx, cols]))
+
+        scans = np.concatenate(scan_parts) if scan_parts else np.zeros(0, np.uint32)
+        cols = np.concatenate(col_parts) if col_parts else np.zeros(0, np.int64)
+        levels = np.concatenate(level_parts) if level_parts else np.zeros(0, np.uint8)
+        # Group by bin; the stable sort keeps scans ascending inside each bin.
+        by_bin = np.argsort(cols, kind="stable")
+        scans, cols, levels = scans[by_bin], cols[by_bin], levels[by_bin]
+        present, counts = np.unique(cols, return_counts=True)
+        offsets = np.zeros(present.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        np.save(pending / "bins.npy", unique_bins[present].astype(np.int64))
+        np.save(pending / "offsets.npy", offsets)
+        np.save(pending / "scans.npy", scans)
+        np.save(pending / "levels.npy", levels)
+        meta = {"path": path, "fingerprint": fingerprint, "num_spectra": n_scans}
+        (pending / _SHARD_META).write_text(json.dumps(meta), encoding="utf-8")
+
+
+class _Shard:
+    """Memory-mapped postings of one archive."""
+
+    def __init__(self, directory: Path, meta: dict):
+        self.directory = directory
+        self.path: str = meta["path"]
+        self.fingerprint: str = meta["fingerprint"]
+        self.num_spectra: int = meta["num_spectra"]
+        self._arrays: dict[str, np.ndarray] | None = None
+
+    def _load(self) -> dict[str, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = {
+                name: np.load(self.directory / f"{name}.npy", mmap_mode="r")
+                for name in ("bins", "offsets", "scans", "levels")
+            }
+        return self._arrays
+
+    def candidates(self, bins: np.ndarray, threshold: float) -> tuple[np.ndarray, np.ndarray]:
+        """Scans whose level in any of ``bins`` may exceed ``threshold``.
+
+        Returns sorted unique scan indices and their largest upper bound.
+        """
+        arrays = self._load()
+        stored = arrays["bins"]
+        pos = np.searchsorted(stored, bins)
+        valid = pos < stored.size
+        pos = pos[valid]
+        pos = pos[stored[pos] == bins[valid]]
+        if pos.size == 0:
+            return np.zeros(0, np.int64), np.zeros(0)
+        offsets = arrays["offsets"]
+        spans = [slice(int(offsets[p]), int(offsets[p + 1])) for p in pos]
+        scans = np.concatenate([arrays["scans"][s] for s in spans]).astype(np.int64)
+        bound = _upper_bound(np.concatenate([arrays["levels"][s] for s in spans]))
+        keep = bound > threshold
+        scans, bound = scans[keep], bound[keep]
+        if len(spans) > 1:
+            # The same scan can appear in several bins: keep its best bound.
+            order = np.lexsort((-bound, scans))
+            scans, bound = scans[order], bound[order]
+            first = np.ones(scans.size, dtype=bool)
+            first[1:] = scans[1:] != scans[:-1]
+            scans, bound = scans[first], bound[first]
+        return scans, bound
+
+
+class IonIndex:
+    """An on-disk inverted m/z index over many ``.datx`` archives.
+
+    Parameters
+    ----------
+    root:
+        Index directory; created if absent.
+    bin_width:
+        Width of the m/z bins in Da.  Fixed when the index is created;
+        ``None`` uses the stored value (or 0.1 for a new index).
+    min_intensity:
+        Bin maxima at or below this are not indexed, which keeps the
+        postings small on noisy data.  Queries must use a threshold of
+        at least this value.  Fixed when the index is created; ``None``
+        uses the stored value (or 0 for a new index).
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        bin_width: float | None = None,
+        min_intensity: float | None = None,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path = self.root / _INDEX_META
+        if meta_path.is_file():
+            stored = json.loads(meta_path.read_text(encoding="utf-8"))
+            for name, value in (("bin_width", bin_width), ("min_intensity", min_intensity)):
+                if value is not None and float(value) != stored[name]:
+                    raise ValueError(
+                        f"index at {self.root} was built with {name}={stored[name]}; "
+                        f"use a new directory for {name}={value}"
+                    )
+        else:
+            stored = {
+                "version": _FORMAT_VERSION,
+                "bin_width": float(0.1 if bin_width is None else bin_width),
+                "min_intensity": float(0.0 if min_intensity is None else min_intensity),
+            }
+            if stored["bin_width"] <= 0:
+                raise ValueError("bin_width must be > 0")
+            meta_path.write_text(json.dumps(stored), encoding="utf-8")
+        self.bin_width: float = stored["bin_width"]
+        self.min_intensity: float = stored["min_intensity"]
+        self._shards: dict[str, _Shard] | None = None
+
+    # -- updating -------------------------------------------------------
+
+    def update(
+        self, paths: str | Path | Iterable[str | Path], workers: int | None = None
+    ) -> IonIndexUpdate:
+        """Index new or changed archives.
+
+        Parameters
+        ----------
+        paths:
+            A directory to walk recursively for ``.datx`` files, or an
+            iterable of archive paths.  For a directory, shards of
+            archives under it that no longer exist are removed.
+        workers:
+            Worker processes; ``None`` uses the CPU count and ``1``
+            indexes in-process.
+        """
+        def job(path: str, fp: str) -> tuple:
+            shard = str(self.root / shard_name(path))
+            return path, fp, shard, self.bin_width, self.min_intensity
+
+        added, unchanged, removed, failed = update_shards(
+            paths, self._load_shards(), _build_shard, job, workers
+        )
+        self._shards = None
+        return IonIndexUpdate(added=added, unchanged=unchanged, removed=removed, failed=failed)
+
+    def _load_shards(self) -> dict[str, _Shard]:
+        if self._shards is None:
+            self._shards = {
+                meta["path"]: _Shard(entry, meta)
+                for entry, meta in iter_shards(self.root, _SHARD_META)
+            }
+        return self._shards
+
+    # -- querying -------------------------------------------------------
+
+    @property
+    def paths(self) -> list[str]:
+        """The indexed archive paths."""
+        return sorted(self._load_shards())
+
+    def candidates(
+        self,
+        mz: float | Sequence[float],
+        threshold: float,
+        tol: float | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Scans that may contain every ion in ``mz`` above ``threshold``.
+
+        Uses the postings only; nothing is decoded.  Returns a mapping
+        of archive path to sorted scan indices, omitting archives with
+        no candidates.  ``tol`` is the half-width of each ion's m/z
+        window in Da (default: half a bin).
+        """
+        return {
+            path: scans
+            for path, (scans, _bound) in self._candidates(mz, threshold, tol).items()
+        }
+
+    def query(
+        self,
+        mz: float | Sequence[float],
+        threshold: float,
+        tol: float | None = None,
+        confirm: bool = True,
+    ) -> list[IonHit]:
+        """Return the scans in which every ion in ``mz`` exceeds ``threshold``.
+
+        Candidate scans come from the postings; with ``confirm`` (the
+        default) only those scans are decoded and checked against the
+        exact intensities in each ``mz ± tol`` window.  Without it the
+        candidates are returned as they are, which may include false
+        positives (bins are coarser than the window and levels are
+        rounded up) but never misses a hit.
+        """
+        mzs = np.atleast_1d(np.asarray(mz, dtype=np.float64))
+        tol = self.bin_width / 2 if tol is None else float(tol)
+        hits: list[IonHit] = []
+        for path, (scans, bound) in self._candidates(mzs, threshold, tol).items():
+            try:
+                dx = DatxFile(path, cache_bytes=0, spectra=confirm)
+            except (OSError, KeyError, ValueError) as exc:
+                logging.warning("skipping %s: %s", path, exc)
+                continue
+            with dx:
+                times = dx.retention_times
+                if not confirm:
+                    hits.extend(
+                        IonHit(path, int(s), float(times[s]), float(b))
+                        for s, b in zip(scans, bound)
+                    )
+                    continue
+                masses = dx.masses
+                windows = [
+                    np.flatnonzero((masses >= m - tol) & (masses <= m + tol)) for m in mzs
+                ]
+                for s in scans.tolist():
+                    spectrum = dx.get_spectrum(s)
+                    level = min(
+                        float(spectrum[w].max()) if w.size else 0.0 for w in windows
+                    )
+                    if level > threshold:
+                        hits.append(IonHit(path, s, float(times[s]), level))
+        return hits
+
+    def _candidates(
+        self, mz: float | Sequence[float], threshold: float, tol: float | None
+    ) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        if threshold < self.min_intensity:
+            raise ValueError(
+                f"threshold {threshold} is below the indexed floor {self.min_intensity}"
+            )
+        mzs = np.atleast_1d(np.asarray(mz, dtype=np.float64))
+        if mzs.size == 0:
+            raise ValueError("mz must be non-empty")
+        tol = self.bin_width / 2 if tol is None else float(tol)
+        ion_bins = [_bin_range(m, tol, self.bin_width) for m in mzs]
+        out: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for path, shard in sorted(self._load_shards().items()):
+            scans, bound = shard.candidates(ion_bins[0], threshold)
+            for bins in ion_bins[1:]:
+                if scans.size == 0:
+                    break
+                other, other_bound = shard.candidates(bins, threshold)
+                scans, i, j = np.intersect1d(
+                    scans, other, assume_unique=True, return_indices=True
+                )
+                bound = np.minimum(bound[i], other_bound[j])
+            if scans.size:
+                out[path] = (scans, bound)
+        return out
@@ -0,0 +1,296 @@
+"""Follow an Advion acquisition while :class:`DataWriter` is still writing it.
+
+:class:`advion_io.DataWriter` streams the mass axis, the ``.spectra``
+blob and the ``.scans`` index into its loose ``<folder>/<root_name>/``
+directory as scans arrive.  :class:`LiveReader` tails that directory:
+each :meth:`LiveReader.poll` reads only the bytes appended since the
+previous poll, so the cost per poll is proportional to the new data.
+
+.. code-block:: python
+
+    from advion_io import DatxFile
+
+    with DatxFile.follow("/data/MyRun") as live:
+        for index, spectrum in live.iter_scans(timeout=30.0):
+            plot(live.retention_times, live.tic)
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from .data_reader import (
+    DatxFile,
+    ScanIndex,
+    _parse_scan_records,
+    _read_only,
+    decode_intensities_blob,
+)
+
+__all__ = ["LiveReader"]
+
+
+class LiveReader:
+    """Incrementally read a loose ``DataWriter`` folder that is still growing.
+
+    Parameters
+    ----------
+    folder:
+        The ``<folder>/<root_name>/`` directory of the running acquisition.
+    poll_interval:
+        Seconds to sleep between polls in :meth:`iter_scans`.  The
+        default keeps the write-to-availability latency under 100 ms.
+    """
+
+    _INITIAL_CAPACITY = 256
+
+    def __init__(self, folder: str | Path, poll_interval: float = 0.05):
+        self.folder = Path(folder)
+        self.poll_interval = float(poll_interval)
+        self._spectra_fh = None
+        self._reset()
+        self.poll()
+
+    # -- context manager helpers ----------------------------------------
+
+    def __enter__(self) -> "LiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the open ``.spectra`` handle."""
+        if self._spectra_fh is not None:
+            self._spectra_fh.close()
+            self._spectra_fh = None
+
+    # -- public API -----------------------------------------------------
+
+    @property
+    def num_spectra(self) -> int:
+        """Number of scans seen so far."""
+        return self._n
+
+    @property
+    def num_masses(self) -> int:
+        """Number of m/z samples per scan (0 until the header is written)."""
+        return int(self.samples_per_scan)
+
+    # The axes are read-only views, not copies, so reading them on every
+    # scan stays O(1).  A view keeps showing the scans seen when it was
+    # taken; :meth:`poll` only writes past them (or into new arrays).
+
+    @property
+    def masses(self) -> np.ndarray:
+        """The m/z axis, or an empty array until it has been written.
+
+        The array is shared and read-only; copy it before modifying.
+        """
+        if self._masses is None:
+            return _read_only(np.zeros(0, dtype=np.float32))
+        return _read_only(self._masses.view())
+
+    @property
+    def retention_times(self) -> np.ndarray:
+        """Retention times of the scans seen so far (``float32``, read-only)."""
+        return _read_only(self._times[: self._n])
+
+    @property
+    def tic(self) -> np.ndarray:
+        """Stored TIC values of the scans seen so far (``float64``, read-only)."""
+        return _read_only(self._tics[: self._n])
+
+    @property
+    def scans(self) -> list[ScanIndex]:
+        """Index entries for the scans seen so far."""
+        return [
+            ScanIndex(
+                time=float(self._times[i]),
+                offset=int(self._offsets[i]),
+                size=int(self._sizes[i]),
+                tic=float(self._tics[i]),
+            )
+            for i in range(self._n)
+        ]
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the writer has zipped the folder into its ``.datx``."""
+        archive = self.folder.parent / f"{self.folder.name}.datx"
+        try:
+            archived = archive.stat().st_mtime_ns
+            written = self._member(DatxFile._SCANS_EXT).stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return archived >= written
+
+    def poll(self) -> int:
+        """Pick up scans appended since the last poll.
+
+        Returns the number of new scans.  If the writer replaced its
+        files (for example after promoting the data set to float
+        storage) the reader starts over from the new files.
+        """
+        scans_path = self._member(DatxFile._SCANS_EXT)
+        try:
+            st = scans_path.stat()
+        except FileNotFoundError:
+            return 0
+        if st.st_ino != self._scans_ino or st.st_size < self._scans_pos:
+            self._reset()
+            self._scans_ino = st.st_ino
+        if st.st_size == self._scans_pos:
+            return 0
+
+        with scans_path.open("rb") as fh:
+            fh.seek(self._scans_pos)
+            new = fh.read(st.st_size - self._scans_pos)
+
+        consumed = 0
+        if not self._header_done:
+            cut = new.find(b"<scan>")
+            if cut < 0 or not self._read_header(new[:cut].decode("utf-8")):
+                return 0
+            consumed = cut
+
+        # Only parse up to the last complete record; a partially written
+        # line is picked up by the next poll.
+        end = new.rfind(b"</scan>")
+        if end < consumed:
+            self._scans_pos += consumed
+            return 0
+        end += len(b"</scan>")
+        table = _parse_scan_records(new[consumed:end])
+        self._scans_pos += end
+        self._append(table)
+        return table.shape[0]
+
+    def get_spectrum(self, index: int) -> np.ndarray:
+        """Return the decoded intensities for scan ``index`` as ``float32``.
+
+        Scans are decoded on every call and not cached, so following a
+        long acquisition does not accumulate them; :meth:`iter_scans`
+        decodes each scan once.
+        """
+        if index < 0 or index >= self._n:
+            raise IndexError(f"spectrum index {index} out of range [0, {self._n})")
+        if self._spectra_fh is None:
+            self._spectra_fh = self._member(DatxFile._SPECTRA_EXT).open("rb")
+        self._spectra_fh.seek(int(self._offsets[index]))
+        chunk = self._spectra_fh.read(int(self._sizes[index]))
+        return decode_intensities_blob(chunk, self.samples_per_scan)
+
+    def generate_xic(self, mass_indices: Sequence[int]) -> np.ndarray:
+        """Sum intensities over a set of mass indices for the scans seen so far."""
+        mass_indices = np.asarray(list(mass_indices), dtype=np.int64)
+        xic = np.zeros(self._n, dtype=np.float64)
+        for i in range(self._n):
+            xic[i] = self.get_spectrum(i)[mass_indices].sum()
+        return xic.astype(np.float32)
+
+    def iter_scans(
+        self, start: int = 0, timeout: float | None = None
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield ``(index, spectrum)`` for every scan as it becomes available.
+
+        Polls every ``poll_interval`` seconds.  Stops once the writer has
+        created the ``.datx`` archive, or after ``timeout`` seconds
+        without new scans.
+        """
+        index = start
+        idle_since = time.monotonic()
+        while True:
+            while index < self._n:
+                yield index, self.get_spectrum(index)
+                index += 1
+                idle_since = time.monotonic()
+            if self.is_finished:
+                if self.poll() == 0:
+                    return
+                continue
+            if timeout is not None and time.monotonic() - idle_since >= timeout:
+                return
+            time.sleep(self.poll_interval)
+            self.poll()
+
+    def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+        return self.iter_scans()
+
+    # -- internals ------------------------------------------------------
+
+    def _member(self, ext: str) -> Path:
+        return self.folder / f"{self.folder.name}{ext}"
+
+    def _reset(self) -> None:
+        if self._spectra_fh is not None:
+            self._spectra_fh.close()
+            self._spectra_fh = None
+        self._scans_ino: int | None = None
+        self._scans_pos = 0
+        self._header_done = False
+        self.samples_per_scan = 0
+        self.data_type = ""
+        self.store_as_float = False
+        self.software_version = ""
+        self.firmware_version = ""
+        self.hardware_id = ""
+        self.date = ""
+        self._masses: np.ndarray | None = None
+        self._n = 0
+        capacity = self._INITIAL_CAPACITY
+        self._times = np.empty(capacity, dtype=np.float32)
+        self._offsets = np.empty(capacity, dtype=np.int64)
+        self._sizes = np.empty(capacity, dtype=np.int64)
+        self._tics = np.empty(capacity, dtype=np.float64)
+
+    def _read_header(self, header: str) -> bool:
+        """Parse the ``.scans`` header and load the mass axis.
+
+        Returns ``False`` (and consumes nothing) while either is still
+        incomplete on disk.
+        """
+        try:
+            samples = DatxFile._extract_int(header, "samplesPerScan")
+        except KeyError:
+            return False
+        try:
+            raw = self._member(DatxFile._MASSES_EXT).read_bytes()
+        except FileNotFoundError:
+            return False
+        if len(raw) != samples * 4:
+            return False
+        self.samples_per_scan = samples
+        self._masses = np.frombuffer(raw, dtype="<f4").copy()
+        self.data_type = DatxFile._extract_text(header, "dataType", "")
+        self.store_as_float = (
+            DatxFile._extract_text(header, "storeAsFloat", "").lower() == "true"
+        )
+        self.software_version = DatxFile._extract_text(header, "softwareVersion", "")
+        self.firmware_version = DatxFile._extract_text(header, "firmwareVersion", "")
+        self.hardware_id = DatxFile._extract_text(header, "hardwareID", "")
+        self.date = DatxFile._extract_text(header, "date", "")
+        self._header_done = True
+        return True
+
+    def _append(self, table: np.ndarray) -> None:
+        n_new = table.shape[0]
+        if n_new == 0:
+            return
+        needed = self._n + n_new
+        if needed > self._times.size:
+            capacity = max(needed, 2 * self._times.size)
+            for name in ("_times", "_offsets", "_sizes", "_tics"):
+                old = getattr(self, name)
+                grown = np.empty(capacity, dtype=old.dtype)
+                grown[: self._n] = old[: self._n]
+                setattr(self, name, grown)
+        sl = slice(self._n, needed)
+        self._times[sl] = table[:, 0]
+        self._offsets[sl] = table[:, 1]
+        self._sizes[sl] = table[:, 2]
+        self._tics[sl] = table[:, 3]
+        self._n = needed
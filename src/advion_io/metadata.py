@@ -0,0 +1,213 @@
+"""Parse-once model of the XML metadata inside a ``.datx`` archive.
+
+The ``.meta`` member names the hardware type, the scan mode and the
+acquisition segments; each segment points at an ion-source (``.ion``)
+and a tune-parameter (``.tune``) member, and the ``.method`` member
+holds the method settings.  :class:`DatxMetadata` parses each of these
+at most once per open file and caches the result, so metadata getters
+called in a loop (catalogue jobs, dashboards) cost a dictionary lookup
+rather than an XML parse.
+
+Used through :attr:`advion_io.DatxFile.metadata`:
+
+.. code-block:: python
+
+    with DatxFile("run.datx", spectra=False) as dx:
+        info = dx.metadata.meta
+        info.hardware_type, info.scan_mode_index, info.segments
+        dx.metadata.method["ionization/@type"]
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from xml.etree import ElementTree as ET
+
+if TYPE_CHECKING:
+    from .data_reader import DatxFile
+
+__all__ = ["DatxMetadata", "MetaInfo", "Segment", "xml_leaves"]
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One ``<segment>`` of the ``.meta`` member."""
+
+    start_time: float
+    ion_source_file: str = ""    # member name of the ion-source settings
+    tune_params_file: str = ""   # member name of the tune parameters
+
+
+@dataclass(frozen=True)
+class MetaInfo:
+    """The parsed ``.meta`` member."""
+
+    hardware_type: str = ""
+    scan_mode_index: int = 0
+    segments: tuple[Segment, ...] = ()
+    # Stripped text of the first element with each local tag name.
+    fields: dict[str, str] = field(default_factory=dict, compare=False)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def xml_leaves(xml: str) -> dict[str, str]:
+    """Flatten an XML document to ``{tag path: text}`` for its leaf nodes.
+
+    Paths are ``/``-joined local tag names below the root.  An
+    ``xsi:type`` attribute (how the scan mode and source type are
+    recorded) is reported as ``"<path>/@type"``.  Unparseable input
+    yields an empty mapping.
+    """
+    if not xml:
+        return {}
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError:
+        return {}
+    leaves: dict[str, str] = {}
+
+    def walk(element: ET.Element, prefix: str) -> None:
+        for child in element:
+            name = f"{prefix}{_local(child.tag)}"
+            kind = next(
+                (v for k, v in child.attrib.items() if _local(k) == "type"), None
+            )
+            if kind:
+                leaves[f"{name}/@type"] = kind
+            if len(child):
+                walk(child, f"{name}/")
+            elif (child.text or "").strip():
+                leaves[name] = child.text.strip()
+
+    walk(root, "")
+    return leaves
+
+
+def _parse_meta(meta_xml: str) -> MetaInfo:
+    """Build a :class:`MetaInfo` from one walk over the ``.meta`` tree."""
+    if not meta_xml:
+        return MetaInfo()
+    try:
+        root = ET.fromstring(meta_xml)
+    except ET.ParseError:
+        return MetaInfo()
+    fields: dict[str, str] = {}
+    segments: list[Segment] = []
+    for el in root.iter():
+        local = _local(el.tag)
+        fields.setdefault(local, (el.text or "").strip())
+        if local != "segment":
+            continue
+        start_time = 0.0
+        ion_file = ""
+        tune_file = ""
+        for child in el:
+            child_local = _local(child.tag)
+            text = (child.text or "").strip()
+            if child_local == "startTime":
+                try:
+                    start_time = float(text)
+                except ValueError:
+                    pass
+            elif child_local == "ionSourceFile":
+                ion_file = text
+            elif child_local == "tuneParamsFile":
+                tune_file = text
+        segments.append(Segment(start_time, ion_file, tune_file))
+    try:
+        scan_mode = int(fields.get("scanModeIndex") or "0")
+    except ValueError:
+        scan_mode = 0
+    return MetaInfo(
+        hardware_type=fields.get("hardwareType", ""),
+        scan_mode_index=scan_mode,
+        segments=tuple(segments),
+        fields=fields,
+    )
+
+
+class DatxMetadata:
+    """Lazily parsed, cached metadata of one open :class:`DatxFile`.
+
+    Every member is decoded and parsed at most once; results are shared
+    by all callers, so treat the returned mappings as read-only.
+    """
+
+    def __init__(self, dx: "DatxFile"):
+        self._dx = dx
+        self._meta: MetaInfo | None = None
+        self._basenames: dict[str, str] | None = None
+        self._texts: dict[str, str] = {}
+        self._leaves: dict[str, dict[str, str]] = {}
+
+    @property
+    def meta(self) -> MetaInfo:
+        """The ``.meta`` member: hardware type, scan mode and segments."""
+        if self._meta is None:
+            self._meta = _parse_meta(self._dx.meta_xml)
+        return self._meta
+
+    @property
+    def segments(self) -> tuple[Segment, ...]:
+        return self.meta.segments
+
+    @property
+    def method(self) -> dict[str, str]:
+        """Leaf settings of the ``.method`` member (see :func:`xml_leaves`)."""
+        if ".method" not in self._leaves:
+            self._leaves[".method"] = xml_leaves(self._dx.method_xml)
+        return self._leaves[".method"]
+
+    def tune(self, index: int = 0) -> dict[str, str]:
+        """Leaf settings of segment ``index``'s tune parameters."""
+        segment = self._segment(index)
+        return self.leaves(segment.tune_params_file if segment else "")
+
+    def ion_source(self, index: int = 0) -> dict[str, str]:
+        """Leaf settings of segment ``index``'s ion-source file."""
+        segment = self._segment(index)
+        return self.leaves(segment.ion_source_file if segment else "")
+
+    def leaves(self, name: str) -> dict[str, str]:
+        """:func:`xml_leaves` of member ``name``, parsed once."""
+        leaves = self._leaves.get(name)
+        if leaves is None:
+            leaves = self._leaves[name] = xml_leaves(self.member_text(name))
+        return leaves
+
+    def member_text(self, name: str) -> str:
+        """Text of member ``name`` (full path, basename or extension).
+
+        Missing members read as ``""``; invalid UTF-8 is replaced.
+        """
+        if not name:
+            return ""
+        text = self._texts.get(name)
+        if text is not None:
+            return text
+        blob = self._dx._raw(name)
+        if blob is None:
+            if self._basenames is None:
+                self._basenames = {}
+                for full in self._dx.list_files():
+                    self._basenames.setdefault(full.rsplit("/", 1)[-1], full)
+            full = self._basenames.get(name)
+            blob = self._dx._raw(full) if full is not None else None
+        if blob is None:
+            text = ""
+        else:
+            try:
+                text = blob.decode("utf-8")
+            except UnicodeDecodeError:
+                text = blob.decode("utf-8", errors="replace")
+        self._texts[name] = text
+        return text
+
+    def _segment(self, index: int) -> Segment | None:
+        segments = self.meta.segments
+        if 0 <= index < len(segments):
+            return segments[index]
+        return None
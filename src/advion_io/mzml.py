@@ -0,0 +1,280 @@
+"""Streaming export of a ``.datx`` run to indexed mzML.
+
+:func:`write_mzml` writes one ``<spectrum>`` per scan, decoding and
+encoding a single scan at a time -- without filling the reader's
+spectrum cache -- so memory use does not grow with the run length
+(apart from one byte offset per scan for the index).  Binary
+arrays are little-endian ``float32``, zlib-compressed and base64-encoded
+in fixed-size chunks straight into the output.  The file ends with the
+``indexedmzML`` spectrum index, its offset and a SHA-1 ``fileChecksum``
+computed while writing.
+
+Used through :meth:`advion_io.DataReader.export_mzml`:
+
+.. code-block:: python
+
+    with DataReader("run.datx") as dr:
+        dr.export_mzml("run.mzML", zero_trim=True)
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import zlib
+from importlib import metadata as importlib_metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .data_reader import DatxFile
+
+__all__ = ["centroid_spectrum", "write_mzml"]
+
+_PROFILE = '<cvParam cvRef="MS" accession="MS:1000128" name="profile spectrum" value=""/>'
+_CENTROID = '<cvParam cvRef="MS" accession="MS:1000127" name="centroid spectrum" value=""/>'
+_MZ_ARRAY = (
+    '<cvParam cvRef="MS" accession="MS:1000514" name="m/z array" value="" '
+    'unitCvRef="MS" unitAccession="MS:1000040" unitName="m/z"/>'
+)
+_INTENSITY_ARRAY = (
+    '<cvParam cvRef="MS" accession="MS:1000515" name="intensity array" value="" '
+    'unitCvRef="MS" unitAccession="MS:1000131" unitName="number of detector counts"/>'
+)
+
+
+def centroid_spectrum(
+    masses: np.ndarray, intensities: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a profile spectrum to one peak per run of non-zero samples.
+
+    Each peak sits at the intensity-weighted m/z of its run and carries
+    the run's maximum intensity.  Returns ``(mz, intensity)`` as
+    ``float32``.
+    """
+    nonzero = intensities > 0
+    if not nonzero.any():
+        empty = np.empty(0, dtype=np.float32)
+        return empty, empty
+    w = intensities[nonzero].astype(np.float64)
+    mz = masses[nonzero].astype(np.float64)
+    # Run boundaries in the compacted arrays: where the source index jumps.
+    idx = np.flatnonzero(nonzero)
+    starts = np.flatnonzero(np.diff(idx, prepend=-2) != 1)
+    centre = np.add.reduceat(w * mz, starts) / np.add.reduceat(w, starts)
+    apex = np.maximum.reduceat(w, starts)
+    return centre.astype(np.float32), apex.astype(np.float32)
+
+
+def write_mzml(
+    dx: "DatxFile",
+    path: str | Path,
+    zero_trim: bool = False,
+    centroid: bool = False,
+    level: int = 6,
+    chunk_bytes: int = 1 << 16,
+) -> Path:
+    """Write every scan of ``dx`` to an indexed mzML file; returns the path.
+
+    Parameters
+    ----------
+    zero_trim:
+        Drop zero-intensity samples.  Profile spectra keep the zeros
+        directly next to a non-zero sample so peak shapes stay closed.
+    centroid:
+        Write centroid spectra: profile runs go through
+        :func:`centroid_spectrum`, centroid runs just lose their zeros.
+    level:
+        zlib compression level of the binary arrays.
+    chunk_bytes:
+        Size of the compressed slices that are base64-encoded and
+        written at a time (rounded down to a multiple of 3).
+    """
+    path = Path(path)
+    chunk = max(3, chunk_bytes - chunk_bytes % 3)
+    native_centroid = (dx.data_type or "").lower() == "centroid"
+    is_centroid = centroid or native_centroid
+    masses = np.ascontiguousarray(dx.masses, dtype="<f4")
+    times = dx.retention_times
+    tics = dx.tic
+    n = dx.num_spectra
+    offsets: list[int] = []
+    # Untrimmed scans all share the mass axis: compress it once.
+    packed_masses = _pack(masses, level)
+
+    with path.open("wb") as fh:
+        out = _Output(fh)
+        out.write(
+            _header(dx, path, n, is_centroid, centroid and not native_centroid)
+        )
+        for i in range(n):
+            spectrum = dx._row(i)
+            if centroid and not native_centroid:
+                mz, intensity = centroid_spectrum(masses, spectrum)
+            elif zero_trim or centroid:
+                nonzero = spectrum > 0
+                keep = nonzero.copy()
+                if not is_centroid:
+                    keep[1:] |= nonzero[:-1]
+                    keep[:-1] |= nonzero[1:]
+                mz, intensity = masses[keep], spectrum[keep]
+            else:
+                mz, intensity = masses, spectrum
+            offsets.append(out.offset)
+            out.write(
+                _spectrum_open(
+                    i, mz, intensity, float(times[i]), float(tics[i]), is_centroid
+                )
+            )
+            packed_mz = packed_masses if mz is masses else _pack(mz, level)
+            _write_binary(out, packed_mz, _MZ_ARRAY, chunk)
+            _write_binary(out, _pack(intensity, level), _INTENSITY_ARRAY, chunk)
+            out.write("</binaryDataArrayList></spectrum>\n")
+        out.write("</spectrumList></run></mzML>\n")
+
+        index_offset = out.offset
+        out.write('<indexList count="1"><index name="spectrum">\n')
+        for i, offset in enumerate(offsets):
+            out.write(f'<offset idRef="scan={i + 1}">{offset}</offset>\n')
+        out.write("</index></indexList>\n")
+        out.write(f"<indexListOffset>{index_offset}</indexListOffset>\n<fileChecksum>")
+        out.raw(f"{out.sha1.hexdigest()}</fileChecksum></indexedmzML>\n".encode())
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+
+class _Output:
+    """Binary file wrapper tracking the byte offset and a running SHA-1."""
+
+    def __init__(self, fh: BinaryIO):
+        self._fh = fh
+        self.offset = 0
+        self.sha1 = hashlib.sha1()
+
+    def write(self, text: str | bytes) -> None:
+        data = text.encode() if isinstance(text, str) else text
+        self.sha1.update(data)
+        self.raw(data)
+
+    def raw(self, data: bytes) -> None:
+        self._fh.write(data)
+        self.offset += len(data)
+
+
+def _pack(array: np.ndarray, level: int) -> bytes:
+    return zlib.compress(np.ascontiguousarray(array, dtype="<f4").tobytes(), level)
+
+
+def _write_binary(out: _Output, packed: bytes, param: str, chunk: int) -> None:
+    """One ``<binaryDataArray>`` of ``packed``, base64-encoded ``chunk`` bytes at a time."""
+    encoded_length = 4 * ((len(packed) + 2) // 3)
+    out.write(
+        f'<binaryDataArray encodedLength="{encoded_length}">'
+        '<cvParam cvRef="MS" accession="MS:1000521" name="32-bit float" value=""/>'
+        '<cvParam cvRef="MS" accession="MS:1000574" name="zlib compression" value=""/>'
+        f"{param}<binary>"
+    )
+    view = memoryview(packed)
+    for start in range(0, len(view), chunk):
+        out.write(base64.b64encode(view[start : start + chunk]))
+    out.write("</binary></binaryDataArray>")
+
+
+def _cv(accession: str, name: str, value: object = "", unit: str = "") -> str:
+    return f'<cvParam cvRef="MS" accession="{accession}" name="{name}" value="{value}"{unit}/>'
+
+
+def _spectrum_open(
+    index: int,
+    mz: np.ndarray,
+    intensity: np.ndarray,
+    time: float,
+    tic: float,
+    is_centroid: bool,
+) -> str:
+    params = [
+        _cv("MS:1000511", "ms level", 1),
+        _cv("MS:1000579", "MS1 spectrum"),
+        _CENTROID if is_centroid else _PROFILE,
+        _cv("MS:1000285", "total ion current", repr(tic)),
+    ]
+    if mz.size:
+        apex = int(np.argmax(intensity))
+        params += [
+            _cv("MS:1000504", "base peak m/z", repr(float(mz[apex])),
+                ' unitCvRef="MS" unitAccession="MS:1000040" unitName="m/z"'),
+            _cv("MS:1000505", "base peak intensity", repr(float(intensity[apex])),
+                ' unitCvRef="MS" unitAccession="MS:1000131" unitName="number of detector counts"'),
+            _cv("MS:1000528", "lowest observed m/z", repr(float(mz[0])),
+                ' unitCvRef="MS" unitAccession="MS:1000040" unitName="m/z"'),
+            _cv("MS:1000527", "highest observed m/z", repr(float(mz[-1])),
+                ' unitCvRef="MS" unitAccession="MS:1000040" unitName="m/z"'),
+        ]
+    scan_time = _cv(
+        "MS:1000016", "scan start time", repr(time),
+        ' unitCvRef="UO" unitAccession="UO:0000010" unitName="second"',
+    )
+    return (
+        f'<spectrum index="{index}" id="scan={index + 1}" defaultArrayLength="{mz.size}">'
+        + "".join(params)
+        + '<scanList count="1">'
+        + _cv("MS:1000795", "no combination")
+        + f"<scan>{scan_time}</scan></scanList>"
+        + '<binaryDataArrayList count="2">'
+    )
+
+
+def _header(
+    dx: "DatxFile", path: Path, n: int, is_centroid: bool, peak_picked: bool
+) -> str:
+    source = dx.path
+    hardware = dx.metadata.meta.hardware_type
+    try:
+        version = importlib_metadata.version("advion-io")
+    except importlib_metadata.PackageNotFoundError:
+        version = "unknown"
+    processing = [_cv("MS:1000544", "Conversion to mzML")]
+    if peak_picked:
+        processing.append(_cv("MS:1000035", "peak picking"))
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<indexedmzML xmlns="http://psi.hupo.org/ms/mzml" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:schemaLocation="http://psi.hupo.org/ms/mzml '
+        'http://psidev.info/files/ms/mzML/xsd/mzML1.1.2_idx.xsd">\n'
+        f'<mzML xmlns="http://psi.hupo.org/ms/mzml" version="1.1.0" id={quoteattr(path.stem)}>\n'
+        '<cvList count="2">'
+        '<cv id="MS" fullName="Proteomics Standards Initiative Mass Spectrometry Ontology" '
+        'URI="https://raw.githubusercontent.com/HUPO-PSI/psi-ms-CV/master/psi-ms.obo"/>'
+        '<cv id="UO" fullName="Unit Ontology" '
+        'URI="https://raw.githubusercontent.com/bio-ontology-research-group/'
+        'unit-ontology/master/unit.obo"/>'
+        "</cvList>\n"
+        "<fileDescription><fileContent>"
+        + _cv("MS:1000579", "MS1 spectrum")
+        + (_CENTROID if is_centroid else _PROFILE)
+        + '</fileContent><sourceFileList count="1">'
+        f"<sourceFile id=\"SF1\" name={quoteattr(source.name)} "
+        f"location={quoteattr(source.parent.resolve().as_uri())}>"
+        + _cv("MS:1000776", "scan number only nativeID format")
+        + "</sourceFile></sourceFileList></fileDescription>\n"
+        f'<softwareList count="1"><software id="advion_io" version={quoteattr(version)}>'
+        + _cv("MS:1000799", "custom unreleased software tool", "advion_io")
+        + "</software></softwareList>\n"
+        '<instrumentConfigurationList count="1"><instrumentConfiguration id="IC1">'
+        + _cv("MS:1000031", "instrument model")
+        + f'<userParam name="hardware type" value={quoteattr(hardware)}/>'
+        "</instrumentConfiguration></instrumentConfigurationList>\n"
+        '<dataProcessingList count="1"><dataProcessing id="DP1">'
+        '<processingMethod order="0" softwareRef="advion_io">'
+        + "".join(processing)
+        + "</processingMethod></dataProcessing></dataProcessingList>\n"
+        f'<run id={quoteattr(source.stem)} defaultInstrumentConfigurationRef="IC1">'
+        f'<spectrumList count="{n}" defaultDataProcessingRef="DP1">\n'
+    )
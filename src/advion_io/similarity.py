@@ -0,0 +1,566 @@
+"""Spectral similarity search within a run or across a library of runs.
+
+Scans are mapped into a common vector space, either the native mass axis
+or fixed-width m/z bins, and L2-normalised.  The cosine similarity to a
+reference is then one matrix product, which is evaluated in row blocks
+so memory stays bounded however many scans are searched.
+
+Each run becomes a :class:`SpectrumMatrix`.  It is stored dense
+(``float32``) or, when few entries are non-zero, in CSR form
+(``data``/``indices``/``indptr``).  :class:`SimilarityIndex` persists
+one matrix per archive as ``.npy`` shards that are memory-mapped on
+search::
+
+    <root>/index.json             vector space (bin width, m/z range)
+    <root>/masses.npy             native mass axis (unbinned indexes only)
+    <root>/<shard>/meta.json      archive path, fingerprint, layout
+    <root>/<shard>/times.npy      retention times
+    <root>/<shard>/vectors.npy    dense layout, or
+    <root>/<shard>/{data,indices,indptr}.npy   CSR layout
+
+.. code-block:: python
+
+    from advion_io.similarity import SimilarityIndex, most_similar
+
+    # Within one run.
+    hits = most_similar("run.datx", reference, k=5)
+
+    # Across a library.
+    index = SimilarityIndex("spectra.idx", bin_width=1.0, mz_range=(50, 1000))
+    index.update("/data/acquisitions")
+    hits = index.search(reference, masses=reference_masses, k=10)
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from .batch import iter_shards, shard_name, staged_directory, update_shards
+from .data_reader import DatxFile
+
+__all__ = [
+    "SimilarityHit",
+    "SimilarityIndex",
+    "SimilarityIndexUpdate",
+    "SpectrumMatrix",
+    "most_similar",
+]
+
+_FORMAT_VERSION = 1
+_INDEX_META = "index.json"
+_SHARD_META = "meta.json"
+_BLOCK_SCANS = 256
+_BLOCK_ROWS = 65536
+# CSR is used when at most this fraction of entries is non-zero.
+_SPARSE_DENSITY = 0.25
+
+
+@dataclass(frozen=True)
+class SimilarityHit:
+    """One scan returned by a similarity search, best first."""
+
+    path: str
+    scan: int
+    time: float
+    score: float  # cosine similarity in [-1, 1] (in [0, 1] for intensities)
+
+
+@dataclass(frozen=True)
+class SimilarityIndexUpdate:
+    """What one :meth:`SimilarityIndex.update` call did."""
+
+    added: int       # archives (re-)indexed
+    unchanged: int   # archives skipped because the fingerprint matched
+    removed: int     # shards dropped for archives that no longer exist
+    failed: int      # archives that could not be read
+
+
+class _Space:
+    """The common vector space: the native mass axis or fixed m/z bins."""
+
+    def __init__(
+        self,
+        masses: np.ndarray | None = None,
+        bin_width: float | None = None,
+        mz_range: tuple[float, float] | None = None,
+    ):
+        self.masses = masses
+        self.bin_width = bin_width
+        self.mz_range = mz_range
+        if bin_width is None:
+            self.size = masses.size
+        else:
+            lo, hi = mz_range
+            self.size = int(np.ceil((hi - lo) / bin_width))
+
+    @classmethod
+    def for_masses(
+        cls, masses: np.ndarray, bin_width: float | None, mz_range: tuple[float, float] | None
+    ) -> "_Space":
+        """Build the space for a run with axis ``masses``."""
+        if bin_width is None:
+            return cls(masses=np.array(masses, dtype=np.float32))
+        if mz_range is None:
+            lo = np.floor(float(masses.min()) / bin_width) * bin_width
+            hi = (np.floor(float(masses.max()) / bin_width) + 1) * bin_width
+            mz_range = (float(lo), float(hi))
+        return cls(bin_width=float(bin_width), mz_range=(float(mz_range[0]), float(mz_range[1])))
+
+    def plan(self, masses: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+        """How to sum a spectrum on ``masses`` into this space.
+
+        Returns ``None`` for the identity, else ``(order, starts, cols)``
+        for ``np.add.reduceat(spectrum[order], starts)`` scattered into
+        ``cols``.  Masses outside the space are dropped.
+        """
+        masses = np.asarray(masses)
+        if self.bin_width is None:
+            if masses.shape == self.masses.shape and np.array_equal(masses, self.masses):
+                return None
+            raise ValueError(
+                "mass axis differs from the index axis; use a binned space (bin_width=...)"
+            )
+        lo, _hi = self.mz_range
+        cols = np.floor((masses.astype(np.float64) - lo) / self.bin_width).astype(np.int64)
+        inside = np.flatnonzero((cols >= 0) & (cols < self.size))
+        order = inside[np.argsort(cols[inside], kind="stable")]
+        sorted_cols = cols[order]
+        targets, starts = np.unique(sorted_cols, return_index=True)
+        return order, starts, targets
+
+    def project(self, rows: np.ndarray, plan) -> np.ndarray:
+        """Map ``(n, len(masses))`` spectra into ``(n, size)`` unit vectors."""
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float32))
+        if plan is None:
+            out = rows.copy()
+        else:
+            order, starts, targets = plan
+            out = np.zeros((rows.shape[0], self.size), dtype=np.float32)
+            if order.size:
+                out[:, targets] = np.add.reduceat(rows[:, order], starts, axis=1)
+        norms = np.sqrt(np.einsum("ij,ij->i", out, out, dtype=np.float64))
+        norms[norms == 0] = 1.0
+        out /= norms[:, None].astype(np.float32)
+        return out
+
+    def to_meta(self) -> dict:
+        return {"bin_width": self.bin_width, "mz_range": self.mz_range}
+
+
+class SpectrumMatrix:
+    """L2-normalised spectra of one run, one row per scan.
+
+    Holds either a dense ``(num_scans, dim)`` ``float32`` array or CSR
+    arrays; the arrays may be memory-maps.  Build one from an archive
+    with :meth:`from_datx`.
+    """
+
+    def __init__(
+        self,
+        dense: np.ndarray | None = None,
+        *,
+        data: np.ndarray | None = None,
+        indices: np.ndarray | None = None,
+        indptr: np.ndarray | None = None,
+        dim: int | None = None,
+    ):
+        if dense is not None:
+            self.dense = dense
+            self.shape = dense.shape
+        else:
+            self.dense = None
+            self.data, self.indices, self.indptr = data, indices, indptr
+            self.shape = (indptr.size - 1, int(dim))
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.dense is None
+
+    @classmethod
+    def from_datx(
+        cls,
+        dx: DatxFile,
+        bin_width: float | None = None,
+        mz_range: tuple[float, float] | None = None,
+        sparse: bool | None = None,
+    ) -> "SpectrumMatrix":
+        """Decode every scan of ``dx`` into unit vectors.
+
+        Rows are on the native mass axis, or in m/z bins of
+        ``bin_width`` over ``mz_range`` (default: the run's own range).
+        ``sparse=None`` picks CSR when at most a quarter of the entries
+        are non-zero.  Scans are projected in blocks as they are
+        decoded; open ``dx`` with ``cache_bytes=0`` to keep the decoded
+        spectra from being cached as well.
+        """
+        space = _Space.for_masses(dx.masses, bin_width, mz_range)
+        return cls._from_datx(dx, space, sparse)
+
+    @classmethod
+    def _from_datx(
+        cls, dx: DatxFile, space: _Space, sparse: bool | None
+    ) -> "SpectrumMatrix":
+        plan = space.plan(dx.masses)
+        n = dx.num_spectra
+        # Each projected block is kept dense only when a dense result was
+        # asked for; otherwise it is reduced to CSR parts right away, so a
+        # sparse build never holds more than one dense block.
+        dense_blocks: list[np.ndarray] = []
+        data_parts: list[np.ndarray] = []
+        index_parts: list[np.ndarray] = []
+        row_nnz = np.zeros(n, dtype=np.int64)
+        buf = np.empty((min(_BLOCK_SCANS, n), dx.num_masses), dtype=np.float32)
+        for first in range(0, n, _BLOCK_SCANS):
+            count = min(_BLOCK_SCANS, n - first)
+            for j in range(count):
+                buf[j] = dx.get_spectrum(first + j)
+            block = space.project(buf[:count], plan)
+            if sparse is False:
+                dense_blocks.append(block)
+                continue
+            rows, cols = np.nonzero(block)
+            data_parts.append(block[rows, cols])
+            index_parts.append(cols.astype(np.int32))
+            row_nnz[first : first + count] = np.bincount(rows, minlength=count)
+        if sparse is False:
+            if not dense_blocks:
+                return cls(np.zeros((0, space.size), np.float32))
+            return cls(np.concatenate(dense_blocks))
+        data = np.concatenate(data_parts) if data_parts else np.zeros(0, np.float32)
+        indices = np.concatenate(index_parts) if index_parts else np.zeros(0, np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(row_nnz, out=indptr[1:])
+        if sparse is None and data.size > _SPARSE_DENSITY * n * space.size:
+            # Too dense for CSR to pay off: scatter the parts back.
+            dense = np.zeros((n, space.size), dtype=np.float32)
+            dense[np.repeat(np.arange(n), row_nnz), indices] = data
+            return cls(dense)
+        return cls(data=data, indices=indices, indptr=indptr, dim=space.size)
+
+    def scores(self, queries: np.ndarray, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Cosine scores of rows ``start:stop`` against unit ``queries`` ``(q, dim)``.
+
+        Returns a ``(stop - start, q)`` ``float32`` array.
+        """
+        stop = self.shape[0] if stop is None else stop
+        if self.dense is not None:
+            return np.asarray(self.dense[start:stop]) @ queries.T
+        lo, hi = int(self.indptr[start]), int(self.indptr[stop])
+        row_ids = np.repeat(
+            np.arange(stop - start), np.diff(np.asarray(self.indptr[start : stop + 1]))
+        )
+        data = np.asarray(self.data[lo:hi])
+        cols = np.asarray(self.indices[lo:hi])
+        out = np.empty((stop - start, queries.shape[0]), dtype=np.float32)
+        for j, q in enumerate(queries):
+            out[:, j] = np.bincount(row_ids, weights=data * q[cols], minlength=stop - start)
+        return out
+
+    def top_k(
+        self, queries: np.ndarray, k: int, block_rows: int = _BLOCK_ROWS
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Best ``k`` rows per query; returns ``(scores, rows)``, each ``(q, k')``.
+
+        ``k' = min(k, num_scans)``; each row of the result is sorted best
+        first.  Rows are scored ``block_rows`` at a time.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((queries.shape[0], 0), dtype=np.int64)
+        for start in range(0, self.shape[0], block_rows):
+            stop = min(start + block_rows, self.shape[0])
+            block = self.scores(queries, start, stop).T  # (q, B)
+            rows = np.broadcast_to(np.arange(start, stop), block.shape)
+            best_scores, best_rows = _merge_top_k(
+                best_scores, best_rows, block, rows, k
+            )
+        return best_scores, best_rows
+
+
+def _merge_top_k(
+    scores_a: np.ndarray,
+    ids_a: np.ndarray,
+    scores_b: np.ndarray,
+    ids_b: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge two ``(q, *)`` candidate sets into the sorted top ``k`` per query."""
+    scores = np.concatenate([scores_a, scores_b], axis=1)
+    ids = np.concatenate([ids_a, ids_b], axis=1)
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, part, axis=1)
+        ids = np.take_along_axis(ids, part, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def _queries(space: _Space, reference: np.ndarray, masses: np.ndarray | None) -> np.ndarray:
+    reference = np.asarray(reference, dtype=np.float32)
+    if masses is None:
+        if space.bin_width is not None or reference.shape[-1] != space.size:
+            raise ValueError("pass the reference's masses= to map it into the search space")
+        plan = None
+    else:
+        plan = space.plan(masses)
+    return space.project(reference, plan)
+
+
+def most_similar(
+    dx: DatxFile | str | Path,
+    reference: np.ndarray,
+    k: int = 10,
+    masses: np.ndarray | None = None,
+    bin_width: float | None = None,
+) -> list[SimilarityHit]:
+    """Return the ``k`` scans of one run most similar to ``reference``.
+
+    Parameters
+    ----------
+    dx:
+        An open :class:`DatxFile` or a path to one.
+    reference:
+        Intensities on ``masses`` (default: the run's own mass axis).
+    bin_width:
+        Compare in m/z bins of this width rather than on the native axis.
+    """
+    if not isinstance(dx, DatxFile):
+        with DatxFile(dx, cache_bytes=0) as opened:
+            return most_similar(opened, reference, k, masses, bin_width)
+    space = _Space.for_masses(dx.masses, bin_width, None)
+    if masses is None:
+        masses = dx.masses
+    queries = space.project(reference, space.plan(masses))
+    matrix = SpectrumMatrix._from_datx(dx, space, None)
+    scores, rows = matrix.top_k(queries, k)
+    times = dx.retention_times
+    return [
+        SimilarityHit(str(dx.path), int(r), float(times[r]), float(s))
+        for s, r in zip(scores[0], rows[0])
+    ]
+
+
+def _build_shard(
+    path: str, fingerprint: str, shard: str, space_meta: dict, sparse: bool | None
+) -> None:
+    """Write one archive's :class:`SpectrumMatrix`; top-level for worker processes."""
+    shard = Path(shard)
+    with staged_directory(shard) as pending:
+        space = _space_from_meta(shard.parent, space_meta)
+        with DatxFile(path, cache_bytes=0) as dx:
+            matrix = SpectrumMatrix._from_datx(dx, space, sparse)
+            np.save(pending / "times.npy", np.asarray(dx.retention_times))
+        if matrix.is_sparse:
+            np.save(pending / "data.npy", matrix.data)
+            np.save(pending / "indices.npy", matrix.indices)
+            np.save(pending / "indptr.npy", matrix.indptr)
+        else:
+            np.save(pending / "vectors.npy", matrix.dense)
+        meta = {
+            "path": path,
+            "fingerprint": fingerprint,
+            "num_spectra": matrix.shape[0],
+            "sparse": matrix.is_sparse,
+        }
+        (pending / _SHARD_META).write_text(json.dumps(meta), encoding="utf-8")
+
+
+def _space_from_meta(root: Path, meta: dict) -> _Space:
+    if meta["bin_width"] is None:
+        return _Space(masses=np.load(root / "masses.npy"))
+    return _Space(bin_width=meta["bin_width"], mz_range=tuple(meta["mz_range"]))
+
+
+class _Shard:
+    def __init__(self, directory: Path, meta: dict, dim: int):
+        self.directory = directory
+        self.path: str = meta["path"]
+        self.fingerprint: str = meta["fingerprint"]
+        self.sparse: bool = meta["sparse"]
+        self._dim = dim
+        self._matrix: SpectrumMatrix | None = None
+        self._times: np.ndarray | None = None
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(self.directory / f"{name}.npy", mmap_mode="r")
+
+    @property
+    def matrix(self) -> SpectrumMatrix:
+        if self._matrix is None:
+            if self.sparse:
+                self._matrix = SpectrumMatrix(
+                    data=self._load("data"),
+                    indices=self._load("indices"),
+                    indptr=self._load("indptr"),
+                    dim=self._dim,
+                )
+            else:
+                self._matrix = SpectrumMatrix(self._load("vectors"))
+        return self._matrix
+
+    @property
+    def times(self) -> np.ndarray:
+        if self._times is None:
+            self._times = self._load("times")
+        return self._times
+
+
+class SimilarityIndex:
+    """Memory-mapped spectrum matrices of many archives, for top-k search.
+
+    Parameters
+    ----------
+    root:
+        Index directory; created if absent.
+    bin_width:
+        Compare spectra in m/z bins of this width.  ``None`` uses the
+        native mass axis, which then has to be identical for every
+        indexed run.  Fixed when the index is created.
+    mz_range:
+        ``(low, high)`` m/z covered by the bins.  Defaults to the range
+        of the first archive indexed; masses outside it are ignored.
+    sparse:
+        Shard layout: ``None`` chooses per archive by density, ``True``
+        and ``False`` force CSR or dense storage.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        bin_width: float | None = None,
+        mz_range: tuple[float, float] | None = None,
+        sparse: bool | None = None,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.sparse = sparse
+        meta_path = self.root / _INDEX_META
+        self._meta: dict | None = None
+        if meta_path.is_file():
+            self._meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if bin_width is not None and bin_width != self._meta["bin_width"]:
+                raise ValueError(
+                    f"index at {self.root} was built with bin_width="
+                    f"{self._meta['bin_width']}; use a new directory for {bin_width}"
+                )
+        self._bin_width = None if bin_width is None else float(bin_width)
+        self._mz_range = mz_range
+        self._space: _Space | None = None
+        self._shards: dict[str, _Shard] | None = None
+
+    @property
+    def space(self) -> _Space | None:
+        """The vector space, or ``None`` until the first archive is indexed."""
+        if self._space is None and self._meta is not None:
+            self._space = _space_from_meta(self.root, self._meta)
+        return self._space
+
+    def _fix_space(self, path: str) -> None:
+        """Define the vector space from the first archive indexed."""
+        with DatxFile.open_metadata(path) as dx:
+            space = _Space.for_masses(dx.masses, self._bin_width, self._mz_range)
+        if space.bin_width is None:
+            np.save(self.root / "masses.npy", space.masses)
+        self._meta = {"version": _FORMAT_VERSION, **space.to_meta()}
+        (self.root / _INDEX_META).write_text(json.dumps(self._meta), encoding="utf-8")
+        self._space = space
+
+    # -- updating -------------------------------------------------------
+
+    def update(
+        self, paths: str | Path | Iterable[str | Path], workers: int | None = None
+    ) -> SimilarityIndexUpdate:
+        """Index new or changed archives.
+
+        ``paths`` is a directory to walk for ``.datx`` files (shards of
+        archives under it that disappeared are removed) or an iterable
+        of archive paths.  ``workers`` as for :class:`concurrent.futures.ProcessPoolExecutor`;
+        ``1`` builds in-process.
+        """
+
+        def prepare(path: str) -> None:
+            if self._meta is None:
+                self._fix_space(path)
+
+        def job(path: str, fp: str) -> tuple:
+            return path, fp, str(self.root / shard_name(path)), self._meta, self.sparse
+
+        added, unchanged, removed, failed = update_shards(
+            paths, self._load_shards(), _build_shard, job, workers, prepare=prepare
+        )
+        self._shards = None
+        return SimilarityIndexUpdate(
+            added=added, unchanged=unchanged, removed=removed, failed=failed
+        )
+
+    def _load_shards(self) -> dict[str, _Shard]:
+        if self._shards is None:
+            dim = 0 if self.space is None else self.space.size
+            self._shards = {
+                meta["path"]: _Shard(entry, meta, dim)
+                for entry, meta in iter_shards(self.root, _SHARD_META)
+            }
+        return self._shards
+
+    # -- searching ------------------------------------------------------
+
+    @property
+    def paths(self) -> list[str]:
+        """The indexed archive paths."""
+        return sorted(self._load_shards())
+
+    def search(
+        self,
+        reference: np.ndarray,
+        k: int = 10,
+        masses: np.ndarray | None = None,
+        paths: Iterable[str | Path] | None = None,
+    ) -> list[SimilarityHit] | list[list[SimilarityHit]]:
+        """Return the ``k`` indexed scans most similar to ``reference``.
+
+        Parameters
+        ----------
+        reference:
+            One spectrum, or a ``(q, n)`` stack of spectra searched
+            together (then one result list per spectrum is returned).
+        masses:
+            The reference's m/z axis.  May be omitted when the index
+            uses the native axis and the reference is on it.
+        paths:
+            Restrict the search to these archives.
+        """
+        if self.space is None:
+            raise ValueError("the index is empty; call update() first")
+        single = np.ndim(reference) == 1
+        queries = _queries(self.space, reference, masses)
+        shards = self._load_shards()
+        if paths is not None:
+            wanted = {str(Path(p).resolve()) for p in paths}
+            shards = {p: s for p, s in shards.items() if p in wanted}
+        ordered = sorted(shards.items())
+
+        best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((queries.shape[0], 0), dtype=np.int64)
+        offsets = [0]
+        for _path, shard in ordered:
+            scores, rows = shard.matrix.top_k(queries, k)
+            best_scores, best_ids = _merge_top_k(
+                best_scores, best_ids, scores, rows + offsets[-1], k
+            )
+            offsets.append(offsets[-1] + shard.matrix.shape[0])
+
+        results = []
+        for scores, ids in zip(best_scores, best_ids):
+            which = np.searchsorted(offsets, ids, side="right") - 1
+            hits = []
+            for score, gid, s in zip(scores.tolist(), ids.tolist(), which.tolist()):
+                path, shard = ordered[s]
+                scan = gid - offsets[s]
+                hits.append(SimilarityHit(path, scan, float(shard.times[scan]), score))
+            results.append(hits)
+        return results[0] if single else results
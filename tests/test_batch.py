@@ -0,0 +1,38 @@
+"""Tests for the shared per-archive job plumbing (:mod:`advion_io.batch`)."""
+from __future__ import annotations
+
+import pytest
+
+from advion_io.batch import PENDING_SUFFIX, iter_shards, run_per_file, staged_directory
+
+
+def _half(path: str, value: int) -> float:
+    if value < 0:
+        raise ValueError(f"negative {value}")
+    return value / 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_per_file_reports_errors_per_job_in_order(workers):
+    jobs = [("a", 2), ("b", -1), ("c", 5)]
+    results = list(run_per_file(_half, jobs, workers))
+    assert [path for path, _ in results] == ["a", "b", "c"]
+    assert results[0][1] == 1.0 and results[2][1] == 2.5
+    assert isinstance(results[1][1], ValueError)
+    assert list(run_per_file(_half, [], workers)) == []
+
+
+def test_staged_directory_swaps_in_or_rolls_back(tmp_path):
+    target = tmp_path / "shard"
+    with staged_directory(target) as pending:
+        assert pending.name.endswith(PENDING_SUFFIX)
+        (pending / "meta.json").write_text('{"path": "x"}')
+    assert list(iter_shards(tmp_path, "meta.json")) == [(target, {"path": "x"})]
+
+    with pytest.raises(RuntimeError):
+        with staged_directory(target) as pending:
+            (pending / "meta.json").write_text('{"path": "y"}')
+            raise RuntimeError("build failed")
+    # The old shard survives and no pending directory is left behind.
+    assert [p.name for p in tmp_path.iterdir()] == ["shard"]
+    assert list(iter_shards(tmp_path, "meta.json")) == [(target, {"path": "x"})]
@@ -0,0 +1,100 @@
+"""Tests for the SQLite catalogue built from synthetic ``DataWriter`` archives."""
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+from advion_io import DataWriter
+from advion_io.catalog import Catalog, main
+
+
+def _write_run(folder, name, instrument, date, peak_index, scale=1, n_scans=4):
+    masses = np.arange(100.0, 101.0, 0.05, dtype=np.float32)
+    with DataWriter(folder, name, is_centroid=False) as w:
+        w.set_metadata("sw1", "fw1", instrument, "CMS-L")
+        w._date = date
+        w.write_spectrum_masses(masses)
+        for i in range(n_scans):
+            spec = np.full(masses.size, 10 * scale, dtype=np.int64)
+            spec[peak_index] = 1000 * scale * (i + 1)
+            w.write_scan_data(spec, retention_time=0.1 * i, tic=float(spec.sum()))
+        return w.create_datx_file(), masses
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "runs"
+    (root / "march").mkdir(parents=True)
+    (root / "april").mkdir()
+    a, masses = _write_run(root / "march", "A", "inst-1", "2026.03.05 10:00:00", 3)
+    b, _ = _write_run(root / "march", "B", "inst-2", "2026.03.20 09:30:00", 7, scale=100)
+    c, _ = _write_run(root / "april", "C", "inst-1", "2026.04.02 08:00:00", 11, scale=100)
+    return root, {"A": a, "B": b, "C": c}, masses
+
+
+def test_update_and_query(tree, tmp_path):
+    root, paths, masses = tree
+    with Catalog(tmp_path / "cat.sqlite") as cat:
+        result = cat.update(root, workers=2)
+        assert (result.added, result.unchanged, result.removed, result.failed) == (3, 0, 0, 0)
+
+        rows = cat.find_runs()
+        assert [r["path"] for r in rows] == [str(paths[k].resolve()) for k in "ABC"]
+        a = rows[0]
+        assert a["instrument_id"] == "inst-1"
+        assert a["hardware_type"] == "CMS-L"
+        assert a["acquired_at"] == "2026-03-05T10:00:00"
+        assert a["num_spectra"] == 4
+        assert a["rt_start"] == pytest.approx(0.0)
+        assert a["rt_end"] == pytest.approx(0.3)
+
+        march_inst1 = cat.find_runs("inst-1", since="2026-03-01", until="2026-04-01")
+        assert [r["path"] for r in march_inst1] == [str(paths["A"].resolve())]
+        big = cat.find_runs(min_tic=100_000)
+        assert {r["path"] for r in big} == {str(paths[k].resolve()) for k in "BC"}
+
+        scans = cat.scans(paths["A"])
+        assert [s["scan"] for s in scans] == [0, 1, 2, 3]
+        assert scans[2]["base_peak_intensity"] == pytest.approx(3000)
+        assert scans[2]["base_peak_mz"] == pytest.approx(float(masses[3]))
+        assert scans[2]["tic"] == pytest.approx(3000 + 10 * 19)
+
+
+def test_update_is_incremental(tree, tmp_path):
+    root, paths, _masses = tree
+    db = tmp_path / "cat.sqlite"
+    with Catalog(db) as cat:
+        cat.update(root, workers=1)
+        again = cat.update(root, workers=1)
+        assert (again.added, again.unchanged, again.removed) == (0, 3, 0)
+
+        _write_run(root / "march", "A", "inst-9", "2026.03.05 10:00:00", 3, n_scans=2)
+        os.utime(paths["A"], ns=(1, 1))
+        paths["C"].unlink()
+        changed = cat.update(root, workers=1)
+        assert (changed.added, changed.unchanged, changed.removed) == (1, 1, 1)
+        assert [r["instrument_id"] for r in cat.find_runs()] == ["inst-9", "inst-2"]
+        assert len(cat.scans(paths["A"])) == 2
+        # Scans of removed runs go with them.
+        assert cat.query("SELECT COUNT(*) AS n FROM scans")[0]["n"] == 2 + 4
+
+
+def test_metadata_only_update(tree, tmp_path):
+    root, paths, _masses = tree
+    with Catalog(tmp_path / "cat.sqlite") as cat:
+        cat.update(root, workers=1, base_peaks=False)
+        scans = cat.scans(paths["B"])
+        assert len(scans) == 4
+        assert scans[0]["base_peak_mz"] is None
+
+
+def test_cli(tree, tmp_path, capsys):
+    root, paths, _masses = tree
+    db = str(tmp_path / "cli.sqlite")
+    main(["update", db, str(root), "--workers", "1"])
+    assert "added 3" in capsys.readouterr().out
+    main(["runs", db, "--instrument", "inst-2"])
+    out = capsys.readouterr().out.strip().splitlines()
+    assert len(out) == 1 and out[0].endswith(str(paths["B"].resolve()))
@@ -94,6 +94,16 @@ def test_masses_and_times(dr):
     assert np.all(np.diff(times) > 0)
 
 
+def test_masses_and_times_copy_opt_in(dr):
+    assert dr.get_masses() is dr.get_masses()
+    assert not dr.get_masses().flags.writeable
+    for copy in (dr.get_masses(copy=True), dr.get_retention_times(copy=True)):
+        assert copy.flags.writeable
+        copy[0] = -1.0
+    assert dr.get_masses()[0] == pytest.approx(99.9, abs=1e-3)
+    assert dr.get_retention_times()[0] >= 0
+
+
 def test_get_TIC_matches_index(dr):
     expected = dr.get_TIC(0)
     assert expected == pytest.approx(3285908170.2841, rel=1e-9)
@@ -216,6 +226,166 @@ def test_delta_xic_and_averaged_delta(dr):
     assert avg.dtype == np.float32
 
 
+def _reference_delta(spectrum, bg, masses, threshold, min_width):
+    """The original one-scan-at-a-time Peak Express delta."""
+    delta = np.zeros_like(spectrum, dtype=np.float32)
+    nonzero = bg > 0
+    if nonzero.any():
+        d = (spectrum[nonzero] - bg[nonzero]) / bg[nonzero]
+        delta[nonzero] = np.where(d < threshold, 0.0, d)
+    is_peak = delta > 0
+    edges = np.diff(np.concatenate(([False], is_peak, [False])).astype(np.int8))
+    starts = np.where(edges == 1)[0]
+    ends = np.where(edges == -1)[0]
+    for s, e in zip(starts, ends):
+        end_mass = float(masses[e]) if e < masses.size else float(masses[-1])
+        if end_mass - float(masses[s]) < min_width:
+            delta[s:e] = 0.0
+    return delta
+
+
+@requires_example
+@pytest.mark.parametrize(
+    "params",
+    [(0.0, 10.0, 3.0, 0.4, 1_000_000), (0.0, 5.0, 1.0, 0.05, 0), (2.0, 20.0, 1.5, 0.2, 100)],
+)
+def test_delta_matrix_matches_per_scan_reference(params):
+    with DataReader(EXAMPLE_DATX) as r:
+        r.set_delta_background_parameters(*params)
+        bg = r.get_delta_background_spectrum()
+        masses = r.get_masses()
+        expected = np.stack(
+            [
+                _reference_delta(r.get_spectrum(i), bg, masses, params[2], params[3])
+                for i in range(r.get_num_spectra())
+            ]
+        )
+        assert np.count_nonzero(expected) > 0
+        matrix = r.get_delta_matrix()
+        assert matrix.dtype == np.float32
+        np.testing.assert_array_equal(matrix, expected)
+        np.testing.assert_array_equal(r.get_delta_matrix([5, 2, 5]), expected[[5, 2, 5]])
+        np.testing.assert_array_equal(r.get_delta_spectrum(40), expected[40])
+
+        cols = [100, 2500, 2501, 7000]
+        np.testing.assert_array_equal(
+            r.generate_delta_xic(cols),
+            np.array([float(row[cols].sum()) for row in expected], dtype=np.float32),
+        )
+        acc = np.zeros(r.get_num_masses())
+        for i in (3, 50, 90):
+            acc += expected[i]
+        np.testing.assert_array_equal(
+            r.get_averaged_delta_spectrum([3, 50, 90]), (acc / 3).astype(np.float32)
+        )
+        with pytest.raises(IndexError):
+            r.get_delta_matrix([0, 137])
+
+
+@requires_example
+@pytest.mark.parametrize("pad", [1, 32])
+def test_delta_xic_neighbourhood_matches_full_matrix(monkeypatch, pad):
+    import advion_io.data_reader as data_reader
+
+    monkeypatch.setattr(data_reader, "_DELTA_XIC_PAD", pad)
+    with DataReader(EXAMPLE_DATX) as r:
+        r.set_delta_background_parameters(0.0, 5.0, 1.0, 0.05, 0)
+        matrix = r.get_delta_matrix()
+        last = r.get_num_masses() - 1
+        for cols in ([0], [last], [3, 3, 40, 11760], list(range(0, last + 1, 997)), []):
+            np.testing.assert_array_equal(
+                r.generate_delta_xic(cols), matrix[:, cols].sum(axis=1)
+            )
+
+
+@requires_example
+def test_delta_background_reuse_and_sliding_window():
+    with DataReader(EXAMPLE_DATX) as r, DataReader(EXAMPLE_DATX) as fresh:
+        r.set_delta_background_parameters(0.0, 10.0, 3.0, 0.4, 0)
+        bg = r.get_delta_background_spectrum()
+        # Threshold and min_width do not touch the background.
+        r.set_delta_background_parameters(0.0, 10.0, 1.5, 0.2, 0)
+        assert r._ensure_background() is r._bg_cache[(0.0, 10.0, 0)]
+        np.testing.assert_array_equal(r.get_delta_background_spectrum(), bg)
+
+        for start in (2.0, 3.5, 1.0, 8.0, 0.0):
+            r.set_delta_background_parameters(start, start + 10.0, 3.0, 0.4, 100)
+            fresh.set_delta_background_parameters(start, start + 10.0, 3.0, 0.4, 100)
+            fresh._bg_window = None
+            np.testing.assert_allclose(
+                r.get_delta_background_spectrum(),
+                fresh.get_delta_background_spectrum(),
+                rtol=1e-6,
+            )
+
+
+@requires_example
+def test_sweep_delta_parameters_matches_individual_settings():
+    min_widths = [0.05, 0.3, 1.0, 5.0]
+    cols = [100, 2500, 2500, 7000]
+    with DataReader(EXAMPLE_DATX) as r:
+        r.set_delta_background_parameters(0.0, 5.0, 1.0, 0.05, 10)
+        # Just above a delta that occurs, in float64 only: both paths must
+        # still keep that sample, as thresholds are compared in float32.
+        deltas = r.get_delta_matrix()
+        sample = np.sort(deltas[deltas > 1.5])[np.count_nonzero(deltas > 1.5) // 2]
+        boundary = np.nextafter(float(sample), np.inf)
+        assert boundary > sample and np.float32(boundary) == sample
+        thresholds = [1.0, 2.5, 10.0, boundary]
+        ic = r.sweep_delta_parameters(thresholds, min_widths)
+        xic = r.sweep_delta_parameters(thresholds, min_widths, mass_indices=cols)
+        part = r.sweep_delta_parameters([2.5], [0.3], scan_indices=[7, 3])
+        assert ic.shape == xic.shape == (4, 4, r.get_num_spectra())
+        assert part.shape == (1, 1, 2)
+        assert np.count_nonzero(ic) > 0 and np.count_nonzero(xic) > 0
+        for i, threshold in enumerate(thresholds):
+            for j, min_width in enumerate(min_widths):
+                r.set_delta_background_parameters(0.0, 5.0, threshold, min_width, 10)
+                matrix = r.get_delta_matrix()
+                # Same samples kept; the sweep sums them in float64.
+                np.testing.assert_array_equal(
+                    ic[i, j], matrix.sum(axis=1, dtype=np.float64).astype(np.float32)
+                )
+                np.testing.assert_array_equal(
+                    xic[i, j],
+                    matrix[:, cols].sum(axis=1, dtype=np.float64).astype(np.float32),
+                )
+                np.testing.assert_allclose(
+                    xic[i, j], r.generate_delta_xic(cols), rtol=1e-6
+                )
+        np.testing.assert_array_equal(part[0, 0], ic[1, 1, [7, 3]])
+        with pytest.raises(IOError):
+            r.sweep_delta_parameters([0.5], [0.1])
+        with pytest.raises(IndexError):
+            r.sweep_delta_parameters([1.0], [0.1], mass_indices=[r.get_num_masses()])
+
+
+@requires_example
+def test_sparse_delta_matrix():
+    pytest.importorskip("scipy")
+    with DataReader(EXAMPLE_DATX) as r:
+        r.set_delta_background_parameters(0.0, 5.0, 1.0, 0.05, 0)
+        sparse = r.get_delta_matrix(range(20, 60), sparse=True)
+        assert sparse.shape == (40, r.get_num_masses())
+        np.testing.assert_array_equal(sparse.toarray(), r.get_delta_matrix(range(20, 60)))
+
+
+@requires_example
+def test_prefix_sums_leave_results_unchanged():
+    with DataReader(EXAMPLE_DATX) as r:
+        r.set_delta_background_parameters(2.0, 30.0, 3.0, 0.4, 1_000)
+        bg = r.get_delta_background_spectrum()
+        avg = r.get_averaged_spectrum(list(range(10, 60)))
+    with DataReader(EXAMPLE_DATX) as r:
+        sums = r.build_prefix_sums()
+        r.set_delta_background_parameters(2.0, 30.0, 3.0, 0.4, 1_000)
+        np.testing.assert_array_equal(r.get_delta_background_spectrum(), bg)
+        np.testing.assert_array_equal(r.get_averaged_spectrum(list(range(10, 60))), avg)
+        np.testing.assert_allclose(
+            sums.xic(500, 540), r.generate_xic(list(range(500, 540))), rtol=1e-6
+        )
+
+
 # ---------------------------------------------------------------------------
 # XML accessors
 # ---------------------------------------------------------------------------
@@ -333,6 +503,101 @@ def test_synthetic_scalar_channel_parsing(tmp_path):
         )
 
 
+def test_scalar_channels_aligned_to_times(tmp_path):
+    import struct
+    import zipfile
+
+    path = tmp_path / "chans.datx"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(
+            "x/x.scans",
+            '<?xml version="1.0"?><scans version="1.1">'
+            "<dataType>continuum</dataType><samplesPerScan>2</samplesPerScan>"
+            "<storeAsFloat>false</storeAsFloat></scans>",
+        )
+        z.writestr("x/x.masses", struct.pack("<2f", 100.0, 100.05))
+        z.writestr("x/x.spectra", b"")
+        z.writestr(
+            "x/x.0.scalar",
+            '<scalarChannel><name>A</name><entry time="2.0" value="20"/>'
+            '<entry time="1.0" value="10"/><entry time="4.0" value="40"/></scalarChannel>',
+        )
+        z.writestr("x/x.1.scalar", "<scalarChannel><name>B</name></scalarChannel>")
+        # C shares A's sample times (listed in order); D has its own.
+        z.writestr(
+            "x/x.2.scalar",
+            '<scalarChannel><name>C</name><entry time="1.0" value="1"/>'
+            '<entry time="2.0" value="2"/><entry time="4.0" value="4"/></scalarChannel>',
+        )
+        z.writestr(
+            "x/x.3.scalar",
+            '<scalarChannel><name>D</name><entry time="0.0" value="7"/>'
+            '<entry time="3.0" value="8"/></scalarChannel>',
+        )
+    with DataReader(path) as r:
+        at = [0.5, 1.0, 1.5, 3.0, 5.0]
+        previous = r.scalar_channels_at(at)
+        linear = r.scalar_channels_at(at, method="linear")
+        assert previous.shape == linear.shape == (4, 5)
+        assert previous.dtype == np.float32
+        assert len(r._scalar_bases) == 2
+        np.testing.assert_array_equal(previous[0], [np.nan, 10, 10, 20, 40])
+        np.testing.assert_array_equal(linear[0], [np.nan, 10, 15, 30, np.nan])
+        assert np.isnan(previous[1]).all() and np.isnan(linear[1]).all()
+        np.testing.assert_array_equal(previous[2], [np.nan, 1, 1, 2, 4])
+        np.testing.assert_array_equal(linear[2], [np.nan, 1, 1.5, 3, np.nan])
+        np.testing.assert_array_equal(previous[3], [7, 7, 7, 8, 8])
+        np.testing.assert_allclose(linear[3], [7 + 1 / 6, 7 + 1 / 3, 7.5, 8, np.nan])
+        assert r.scalar_channels_at().shape == (4, 0)
+        with pytest.raises(IOError):
+            r.scalar_channels_at(at, method="nearest")
+
+        times = r.get_scalar_channel_times(0)
+        assert times is r.get_scalar_channel_times(0)
+        assert not times.flags.writeable
+        copied = r.get_scalar_channel_values(0, copy=True)
+        copied[0] = -1.0
+        np.testing.assert_array_equal(r.get_scalar_channel_values(0), [20, 10, 40])
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [
+        # Bulk path: both layouts mixed, exponents, signs, whitespace.
+        '<entry><time>0.1</time><value>1e-05</value></entry>\n'
+        '<entry time="2E+2" value="-3.5"/>\n'
+        "<entry>\r\n  <time>7</time>\t<value>.25</value>\r\n</entry>",
+        # Fallbacks: value before time, comments, non-numeric text.
+        '<entry><value>2</value><time>1</time></entry><entry time="3" value="4"/>',
+        '<entry time="1" value="2"/><!-- 3 --><entry time="5" value="6"/>',
+        '<entry time="1" value="nan"/><entry time="x" value="2"/><entry time="3" value="4"/>',
+        '<entry time="1" value="2"/><attribute name="late" value="9"/>',
+        # Text that only looks numeric once letters are dropped, or that
+        # numpy cannot split: those entries are skipped, not misread.
+        '<entry time="1" value="1,5"/><entry time="3" value="4"/>',
+        '<entry time="1" value="1.5x"/><entry><time>2</time><value>2.5kg</value></entry>'
+        '<entry time="3" value="4"/>',
+        '<entry time="1" value="e"/><entry time="2" value="1-5"/><entry time="3" value="4"/>',
+    ],
+)
+def test_bulk_scalar_parser_matches_element_parser(entries):
+    from advion_io.data_reader import _parse_scalar_elements, _parse_scalar_xml
+
+    raw = (
+        '<?xml version="1.0"?>\n<scalarChannel version="1.0">\n'
+        f"<name>P</name><attribute><name>g</name><value>2</value></attribute>\n"
+        f"{entries}\n</scalarChannel>\n"
+    ).encode()
+    bulk = _parse_scalar_xml(raw)
+    reference = _parse_scalar_elements(raw)
+    assert bulk.name == reference.name == "P"
+    assert bulk.attributes == reference.attributes
+    assert bulk.times.dtype == bulk.values.dtype == np.float32
+    np.testing.assert_array_equal(bulk.times, reference.times)
+    np.testing.assert_array_equal(bulk.values, reference.values)
+    assert reference.times.size > 0
+
+
 def test_synthetic_aux_files_parsing(tmp_path):
     """`auxfiles` index + per-file bodies + isHTML→type rewriting."""
     import struct
@@ -176,6 +176,112 @@ def test_write_then_read_round_trip_intensities(writer_setup, tmp_path):
             np.testing.assert_array_equal(got, expected)
 
 
+def test_read_loose_folder_matches_archive(writer_setup):
+    path = writer_setup(n_scans=6, n_masses=30, with_scalar=True, with_aux=True)
+    folder = path.with_suffix("")
+    assert folder.is_dir()
+    with DataReader(path) as archived, DataReader(folder) as loose:
+        assert loose.get_num_spectra() == archived.get_num_spectra()
+        np.testing.assert_array_equal(loose.get_masses(), archived.get_masses())
+        np.testing.assert_array_equal(
+            loose.get_retention_times(), archived.get_retention_times()
+        )
+        for i in range(archived.get_num_spectra()):
+            np.testing.assert_array_equal(
+                loose.get_spectrum(i), archived.get_spectrum(i)
+            )
+        assert loose.get_hardware_type() == archived.get_hardware_type()
+        assert loose.get_method_xml() == archived.get_method_xml()
+        assert loose.get_scalar_channel_name(0) == "UV"
+        assert loose.get_aux_file_text(0) == "auxiliary body"
+
+
+def test_write_more_scans_after_create_datx_file(tmp_path):
+    masses = np.arange(100.0, 101.0, 0.1, dtype=np.float32)
+    spectra = np.arange(4 * masses.size).reshape(4, masses.size) % 7
+    with DataWriter(tmp_path, "Again", is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst", "CMS")
+        w.write_spectrum_masses(masses)
+        for i in range(2):
+            w.write_scan_data(spectra[i], retention_time=float(i), tic=float(spectra[i].sum()))
+        w.create_datx_file()
+        for i in range(2, 4):
+            w.write_scan_data(spectra[i], retention_time=float(i), tic=float(spectra[i].sum()))
+        path = w.create_datx_file()
+    for source in (path, path.with_suffix("")):
+        with DataReader(source) as r:
+            assert r.get_num_spectra() == 4
+            for i in range(4):
+                np.testing.assert_array_equal(r.get_spectrum(i), spectra[i])
+
+
+def _build_indexed(tmp_path, n_scans=9, scan_index=True):
+    rng = np.random.default_rng(5)
+    masses = np.arange(100.0, 101.5, 0.05, dtype=np.float32)
+    with DataWriter(tmp_path, "Idx", is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst-9", "CMS")
+        w.write_spectrum_masses(masses)
+        for i in range(n_scans):
+            spec = rng.integers(0, 900, size=masses.size)
+            w.write_scan_data(spec, retention_time=0.013 * i, tic=float(spec.sum()) + 0.25)
+        return w.create_datx_file(scan_index=scan_index)
+
+
+def test_scan_index_sidecar_round_trip(tmp_path):
+    import zipfile
+
+    from advion_io import DatxFile
+    from advion_io.data_reader import _parse_scan_records, _split_scans_xml
+
+    path = _build_indexed(tmp_path)
+    with zipfile.ZipFile(path) as zf:
+        assert "Idx/Idx.scanidx" in zf.namelist()
+        _header, records = _split_scans_xml(zf.read("Idx/Idx.scans"))
+    with DatxFile(path) as dx:
+        assert dx.hardware_id == "inst-9"
+        assert dx.num_masses == 30
+        index = dx.scan_index
+        expected = _parse_scan_records(records)
+        np.testing.assert_array_equal(index["time"], expected[:, 0])
+        np.testing.assert_array_equal(index["offset"], expected[:, 1])
+        np.testing.assert_array_equal(index["size"], expected[:, 2])
+        np.testing.assert_array_equal(index["tic"], expected[:, 3])
+        spectrum = dx.get_spectrum(8)
+    with DataReader(path) as r:
+        np.testing.assert_array_equal(r.get_spectrum(8), spectrum)
+
+
+def test_scan_index_sidecar_corrupt_falls_back_to_xml(tmp_path):
+    import zipfile
+
+    from advion_io import DatxFile
+    from advion_io.data_reader import _read_scan_index_sidecar
+
+    path = _build_indexed(tmp_path)
+    with DatxFile(path) as dx:
+        expected = dx.scan_index.copy()
+
+    sidecar = path.with_suffix("") / "Idx.scanidx"
+    data = bytearray(sidecar.read_bytes())
+    data[-1] ^= 0xFF
+    assert _read_scan_index_sidecar(bytes(data)) is None
+    with zipfile.ZipFile(path, "w") as zf:
+        for member in sorted(path.with_suffix("").iterdir()):
+            payload = bytes(data) if member == sidecar else member.read_bytes()
+            zf.writestr(f"Idx/{member.name}", payload)
+    with DatxFile(path) as dx:
+        np.testing.assert_array_equal(dx.scan_index, expected)
+
+
+def test_scan_index_sidecar_is_optional(tmp_path):
+    import zipfile
+
+    _build_indexed(tmp_path, scan_index=True)
+    path = _build_indexed(tmp_path, scan_index=False)
+    with zipfile.ZipFile(path) as zf:
+        assert not any(n.endswith(".scanidx") for n in zf.namelist())
+
+
 def test_write_scalar_channel(writer_setup):
     path = writer_setup(with_scalar=True)
     with DataReader(path) as r:
@@ -8,7 +8,8 @@ from __future__ import annotations
 import numpy as np
 import pytest
 
-from advion_io import DatxFile, decode_intensities_blob
+from advion_io import SCAN_INDEX_DTYPE, DatxFile, decode_intensities_blob
+from advion_io.data_reader import _parse_scan_records
 from example_data import EXAMPLE_DATX, SKIP_REASON
 
 
@@ -42,6 +43,15 @@ def test_masses_axis(dx):
     assert masses[-1] == pytest.approx(699.8, abs=1e-3)
 
 
+def test_axes_are_cached_and_read_only(dx):
+    for name in ("masses", "retention_times", "tic"):
+        axis = getattr(dx, name)
+        assert getattr(dx, name) is axis
+        assert not axis.flags.writeable
+        with pytest.raises(ValueError):
+            axis[0] = 0
+
+
 def test_retention_times(dx):
     rts = dx.retention_times
     assert rts.dtype == np.float32
@@ -50,6 +60,45 @@ def test_retention_times(dx):
     assert np.all(np.diff(rts) > 0)
 
 
+def test_scan_index_structured_array(dx):
+    index = dx.scan_index
+    assert index.dtype == SCAN_INDEX_DTYPE
+    assert index.shape == (dx.num_spectra,)
+    assert not index.flags.writeable
+    np.testing.assert_array_equal(index["time"].astype(np.float32), dx.retention_times)
+    np.testing.assert_array_equal(index["tic"], dx.tic)
+    # The legacy ScanIndex objects agree field by field.
+    for i in (0, dx.num_spectra - 1):
+        scan = dx.scans[i]
+        assert (scan.time, scan.offset, scan.size, scan.tic) == tuple(index[i].tolist())
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (b"", np.zeros((0, 4))),
+        (
+            b"<scan><time>1e-05</time><index>0</index><size>30</size><tic>4E2</tic></scan>\r\n"
+            b"<scan><time>0.5</time><index>30</index><size>12</size><tic>7.25</tic></scan>\r\n",
+            [[1e-05, 0, 30, 400.0], [0.5, 30, 12, 7.25]],
+        ),
+        # Whitespace inside elements and a trailing closing tag.
+        (
+            b"<scan><time> 2.0 </time><index> 8 </index><size>9</size><tic>1</tic></scan></scans>",
+            [[2.0, 8, 9, 1.0]],
+        ),
+        # Text numpy cannot split falls back to the per-record regex.
+        (
+            b"<scan><time>2</time><index>0</index><size>9</size><tic>1</tic></scan>"
+            b"<!-- 1,5 -->",
+            [[2.0, 0, 9, 1.0]],
+        ),
+    ],
+)
+def test_parse_scan_records(body, expected):
+    np.testing.assert_array_equal(_parse_scan_records(body), np.asarray(expected))
+
+
 def test_spectrum_shape_and_dtype(dx):
     spec = dx.get_spectrum(0)
     assert spec.dtype == np.float32
@@ -79,6 +128,287 @@ def test_full_intensity_matrix(dx):
     assert dx.intensities is I
 
 
+def test_spectra_share_one_backing_store(dx):
+    I = dx.intensities
+    spec = dx.get_spectrum(3)
+    assert np.shares_memory(spec, I)
+    assert not spec.flags.writeable
+    np.testing.assert_array_equal(spec, I[3])
+
+
+def test_spectrum_before_intensities_lands_in_store():
+    if not EXAMPLE_DATX.exists():
+        pytest.skip(SKIP_REASON)
+    with DatxFile(EXAMPLE_DATX) as fresh:
+        spec = fresh.get_spectrum(7)
+        assert fresh._decoded.sum() == 1
+        I = fresh.intensities
+        assert fresh._decoded.all()
+        assert np.shares_memory(spec, I)
+        np.testing.assert_array_equal(I[7], spec)
+
+
+@pytest.fixture
+def bounded():
+    """Opens the example with room for exactly ``rows`` decoded scans."""
+    if not EXAMPLE_DATX.exists():
+        pytest.skip(SKIP_REASON)
+    opened = []
+
+    def open_(rows):
+        f = DatxFile(EXAMPLE_DATX, cache_bytes=rows * 4 * 11999)
+        opened.append(f)
+        return f
+
+    yield open_
+    for f in opened:
+        f.close()
+
+
+def test_lru_cache_evicts_least_recently_used(bounded, dx):
+    f = bounded(2)
+    a = f.get_spectrum(0)
+    f.get_spectrum(1)
+    assert f.get_spectrum(0) is a          # hit; 0 becomes most recent
+    f.get_spectrum(2)                      # evicts 1
+    stats = f.cache_stats
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 3, 1)
+    assert stats.resident_bytes == 2 * 4 * 11999
+    assert stats.capacity_bytes == 2 * 4 * 11999
+    assert f.get_spectrum(0) is a
+    assert f.cache_stats.misses == 3
+    f.get_spectrum(1)
+    assert f.cache_stats.misses == 4
+    # Evicted rows are independent arrays and keep their values.
+    np.testing.assert_array_equal(a, dx.get_spectrum(0))
+    np.testing.assert_array_equal(f.intensities, dx.intensities)
+
+
+def test_cache_disabled(bounded, dx):
+    f = bounded(0)
+    first = f.get_spectrum(4)
+    assert f.get_spectrum(4) is not first
+    stats = f.cache_stats
+    assert (stats.hits, stats.misses, stats.resident_bytes) == (0, 2, 0)
+    np.testing.assert_array_equal(first, dx.get_spectrum(4))
+
+
+def test_default_cache_is_unbounded():
+    if not EXAMPLE_DATX.exists():
+        pytest.skip(SKIP_REASON)
+    with DatxFile(EXAMPLE_DATX) as f:
+        f.get_spectrum(0)
+        f.get_spectrum(0)
+        stats = f.cache_stats
+        assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 0)
+        assert stats.capacity_bytes is None
+        _ = f.intensities
+        assert f.cache_stats.resident_bytes == f.intensities.nbytes
+
+
+def test_metadata_only_open(dx):
+    with DatxFile.open_metadata(EXAMPLE_DATX) as meta:
+        assert not meta.has_spectra
+        assert meta.num_spectra == dx.num_spectra
+        assert meta.num_masses == dx.num_masses
+        assert meta.date == dx.date
+        assert meta.hardware_id == dx.hardware_id
+        np.testing.assert_array_equal(meta.retention_times, dx.retention_times)
+        np.testing.assert_array_equal(meta.tic, dx.tic)
+        assert "<acquisitionMetadata" in meta.meta_xml
+        # Only the scan index and .meta were read.
+        loaded = {name.rsplit(".", 1)[-1] for name in meta._files._blobs}
+        assert loaded == {"scans", "meta"}
+        with pytest.raises(RuntimeError, match="metadata only"):
+            meta.get_spectrum(0)
+        with pytest.raises(RuntimeError, match="metadata only"):
+            _ = meta.intensities
+
+
+def test_metadata_only_open_tolerates_missing_spectra(tmp_path):
+    import zipfile
+
+    path = tmp_path / "bare.datx"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(
+            "b/b.scans",
+            "<scans><samplesPerScan>3</samplesPerScan><dataType>continuum</dataType>"
+            "<scan><time>0.5</time><index>0</index><size>20</size><tic>7</tic></scan>",
+        )
+    with DatxFile(path, spectra=False) as meta:
+        assert meta.num_spectra == 1
+        assert meta.tic[0] == 7.0
+    with pytest.raises(ValueError):
+        DatxFile(path)
+
+
+@pytest.fixture(scope="module")
+def reference(dx):
+    return dx.intensities.copy()
+
+
+_LAZY_KEYS = [
+    5,
+    -1,
+    (5, 100),
+    (slice(10, 20), slice(2000, 2100)),
+    (slice(None, None, -7), slice(300, 40, -3)),
+    ([3, 1, 3], slice(0, 50)),
+    (slice(0, 4), [7, 2, 2, 11998]),
+    ([0, 5, 9], [10, 20, 30]),
+    (np.array([[1], [2]]), np.array([4, 5, 6])),
+    (7, [1, 2, 3]),
+    (np.arange(137) % 10 == 0, slice(500, 510)),
+    (slice(3, 6), np.arange(11999) < 25),
+    (Ellipsis, 42),
+    (slice(5, 5), slice(None)),
+    ([], slice(1, 3)),
+]
+
+
+@pytest.mark.parametrize("key", _LAZY_KEYS)
+def test_lazy_intensities_indexing_matches_numpy(reference, key):
+    with DatxFile(EXAMPLE_DATX) as f:
+        out = f.lazy_intensities[key]
+        expected = reference[key]
+        assert out.shape == expected.shape
+        assert out.dtype == np.float32
+        np.testing.assert_array_equal(out, expected)
+
+
+def test_lazy_intensities_decode_only_the_selection(reference):
+    with DatxFile(EXAMPLE_DATX) as f:
+        lazy = f.lazy_intensities
+        assert lazy.shape == reference.shape
+        assert lazy.dtype == np.float32 and lazy.ndim == 2 and len(lazy) == 137
+        # A mass window is decoded partially and bypasses the cache.
+        np.testing.assert_array_equal(lazy[10:20, 100:200], reference[10:20, 100:200])
+        assert f.cache_stats.misses == 0
+        assert f._store is None
+        # Full-width rows go through the cache, and are then reused.
+        np.testing.assert_array_equal(lazy[3], reference[3])
+        assert f.cache_stats.misses == 1
+        np.testing.assert_array_equal(lazy[3, 5:9], reference[3, 5:9])
+        assert f.cache_stats.misses == 1
+
+        mask = reference > 1e6
+        np.testing.assert_array_equal(lazy[mask], reference[mask])
+        np.testing.assert_array_equal(np.asarray(lazy), reference)
+        assert np.max(lazy) == reference.max()
+
+
+def test_lazy_intensities_rejects_bad_keys(dx):
+    lazy = dx.lazy_intensities
+    for key in (137, (0, 11999), (0, 0, 0), np.ones(5, dtype=bool), 1.5, (None, 0)):
+        with pytest.raises(IndexError):
+            lazy[key]
+    with DatxFile.open_metadata(EXAMPLE_DATX) as meta:
+        with pytest.raises(RuntimeError, match="metadata only"):
+            meta.lazy_intensities[0, :10]
+
+
+def test_value_selectors_match_masks(dx):
+    times, masses = dx.retention_times, dx.masses
+    assert dx._search_masses(300.0, "left") == np.searchsorted(masses, 300.0)
+    assert dx._mass_step == pytest.approx(0.05, rel=1e-4)
+    for t0, t1 in [(times[3], times[20]), (-1.0, 1e9), (times[-1] + 1, 1e9), (5.0, 4.0)]:
+        expected = np.flatnonzero((times >= t0) & (times <= t1))
+        np.testing.assert_array_equal(dx.scans_between(float(t0), float(t1)), expected)
+    for mz0, mz1 in [(masses[100], masses[200]), (150.02, 150.08), (0.0, 99.0), (650.0, 1e4)]:
+        expected = np.flatnonzero((masses >= mz0) & (masses <= mz1))
+        np.testing.assert_array_equal(dx.mass_indices_between(float(mz0), float(mz1)), expected)
+
+
+def test_nearest_mass_index(dx):
+    masses = dx.masses
+    rng = np.random.default_rng(0)
+    for mz in rng.uniform(90, 710, 200):
+        assert dx.nearest_mass_index(mz) == np.argmin(np.abs(masses.astype(np.float64) - mz))
+    assert dx.nearest_mass_index(float(masses[123]), tol_ppm=1) == 123
+    with pytest.raises(KeyError):
+        dx.nearest_mass_index(float(masses[123]) + 0.02, tol_ppm=10)
+
+
+def test_value_based_xic_and_average(dx):
+    cols = dx.mass_indices_between(250.0, 251.0)
+    np.testing.assert_array_equal(dx.generate_xic_between(250.0, 251.0), dx.generate_xic(cols))
+    rows = dx.scans_between(float(dx.retention_times[10]), float(dx.retention_times[15]))
+    np.testing.assert_array_equal(rows, np.arange(10, 16))
+    np.testing.assert_array_equal(
+        dx.get_averaged_spectrum_between(
+            float(dx.retention_times[10]), float(dx.retention_times[15])
+        ),
+        dx.get_averaged_spectrum(rows),
+    )
+
+
+def test_value_selectors_on_non_uniform_axis(tmp_path):
+    from advion_io import DataWriter
+
+    masses = np.geomspace(100, 1000, 500).astype(np.float32)
+    with DataWriter(tmp_path, "Geo", is_centroid=True) as w:
+        w.write_spectrum_masses(masses)
+        w.write_scan_data(np.ones(masses.size, dtype=np.int64), 0.0, 500.0)
+        path = w.create_datx_file()
+    with DatxFile(path) as f:
+        np.testing.assert_array_equal(
+            f.mass_indices_between(200.0, 300.0),
+            np.flatnonzero((masses >= 200.0) & (masses <= 300.0)),
+        )
+        assert f._mass_step == 0.0
+        assert f.nearest_mass_index(float(masses[250]) * 1.000001) == 250
+
+
+def test_prefix_sums_match_loops(reference, tmp_path):
+    with DatxFile(EXAMPLE_DATX) as f:
+        expected_mean = f.get_averaged_spectrum(range(20, 45))
+        sums = f.prefix_sums(path=tmp_path / "sat.npy", chunk_scans=16)
+        assert f.prefix_sums() is sums
+        assert sums.shape == reference.shape
+        # Integer-valued data are summed exactly.
+        np.testing.assert_array_equal(
+            sums.sum_spectrum(20, 45), reference[20:45].astype(np.float64).sum(axis=0)
+        )
+        np.testing.assert_array_equal(f.get_averaged_spectrum(range(20, 45)), expected_mean)
+        np.testing.assert_array_equal(
+            sums.xic(100, 200, 5, 9), reference[5:9, 100:200].astype(np.float64).sum(axis=1)
+        )
+        assert sums.total(0, 137) == reference.astype(np.float64).sum()
+        assert sums.total(3, 3) == 0.0
+        np.testing.assert_array_equal(sums.sum_spectrum(7, 7), np.zeros(f.num_masses))
+        with pytest.raises(IndexError):
+            sums.sum_spectrum(10, 138)
+        with pytest.raises(ValueError):
+            sums.mean_spectrum(4, 4)
+
+    # A second open memory-maps the saved table instead of rebuilding it.
+    with DatxFile(EXAMPLE_DATX) as f:
+        again = f.prefix_sums(path=tmp_path / "sat.npy")
+        assert isinstance(again.table, np.memmap)
+        assert f.cache_stats.misses == 0
+        mean = reference[20:23].mean(axis=0, dtype=np.float64).astype(np.float32)
+        np.testing.assert_array_equal(f.get_averaged_spectrum([20, 21, 22]), mean)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_mass_statistics_match_numpy(reference, workers):
+    with DatxFile(EXAMPLE_DATX) as f:
+        stats = f.mass_statistics(scan_range=(10, 120), block_scans=17, workers=workers)
+        # One streaming pass leaves the decoded cache empty.
+        assert f.cache_stats.resident_bytes == 0
+        with pytest.raises(ValueError):
+            f.mass_statistics(scan_range=(5, 5))
+        for bad in (0, -2):
+            with pytest.raises(ValueError):
+                f.mass_statistics(workers=bad)
+    rows = reference[10:120].astype(np.float64)
+    assert stats.count == 110
+    np.testing.assert_allclose(stats.mean, rows.mean(axis=0), rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(stats.variance, rows.var(axis=0), rtol=1e-9, atol=1e-6)
+    np.testing.assert_array_equal(stats.max, reference[10:120].max(axis=0))
+    np.testing.assert_allclose(stats.nonzero_fraction, (rows > 0).mean(axis=0), rtol=1e-12)
+
+
 def test_spectrum_index_bounds(dx):
     with pytest.raises(IndexError):
         dx.get_spectrum(-1)
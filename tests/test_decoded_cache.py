@@ -0,0 +1,99 @@
+"""Tests for the persistent decoded cache (``DatxFile(cache_dir=...)``)."""
+from __future__ import annotations
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from advion_io import DataReader, DatxFile
+from advion_io.decoded_cache import DecodedCache
+from example_data import EXAMPLE_DATX, SKIP_REASON
+
+
+@pytest.fixture(scope="module")
+def reference():
+    if not EXAMPLE_DATX.exists():
+        pytest.skip(SKIP_REASON)
+    with DatxFile(EXAMPLE_DATX) as dx:
+        yield dx.intensities.copy()
+
+
+def _entries(root):
+    return sorted(p.name for p in root.iterdir())
+
+
+def test_first_decode_writes_entry_and_reopen_memmaps(tmp_path, reference):
+    cache = tmp_path / "cache"
+    with DatxFile(EXAMPLE_DATX, cache_dir=cache) as dx:
+        key = dx._cache_key
+        assert _entries(cache) == []
+        np.testing.assert_array_equal(dx.intensities, reference)
+        assert _entries(cache) == [key]
+        assert sorted(p.name for p in (cache / key).iterdir()) == [
+            "intensities.npy",
+            "masses.npy",
+            "retention_times.npy",
+            "tic.npy",
+        ]
+
+    with DatxFile(EXAMPLE_DATX, cache_dir=cache) as dx:
+        intensities = dx.intensities
+        assert isinstance(intensities, np.memmap)
+        assert not intensities.flags.writeable
+        assert dx.cache_stats.misses == 0
+        np.testing.assert_array_equal(intensities, reference)
+        np.testing.assert_array_equal(dx.get_spectrum(5), reference[5])
+        assert isinstance(dx.masses, np.memmap)
+        assert dx.masses.shape == (dx.num_masses,)
+
+    with DataReader(EXAMPLE_DATX, cache_dir=cache) as r:
+        np.testing.assert_array_equal(r.get_intensities(), reference)
+
+
+def test_partial_decode_leaves_no_entry(tmp_path, reference):
+    cache = tmp_path / "cache"
+    with DatxFile(EXAMPLE_DATX, cache_dir=cache) as dx:
+        np.testing.assert_array_equal(dx.get_spectrum(3), reference[3])
+    assert _entries(cache) == []
+
+
+def test_fingerprint_tracks_archive_content(tmp_path, reference):
+    copy = tmp_path / "copy.datx"
+    shutil.copy(EXAMPLE_DATX, copy)
+    with DatxFile(EXAMPLE_DATX) as a, DatxFile(copy) as b:
+        assert a._files.fingerprint() == b._files.fingerprint()
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = DecodedCache(tmp_path, max_bytes=None)
+    axes = {
+        "masses": np.zeros(4, np.float32),
+        "retention_times": np.zeros(2, np.float32),
+        "tic": np.zeros(2),
+    }
+    for i, key in enumerate(("a", "b", "c")):
+        pending, matrix = cache.create(key, (2, 4))
+        matrix[:] = i
+        cache.commit(key, pending, matrix, axes)
+        os.utime(tmp_path / key, ns=(i * 10**9, i * 10**9))
+    assert _entries(tmp_path) == ["a", "b", "c"]
+
+    one_entry = cache.size_bytes() // 3
+    assert cache.lookup("a") is not None    # a becomes most recently used
+    cache.max_bytes = 2 * one_entry
+    cache.evict()
+    assert _entries(tmp_path) == ["a", "c"]
+    np.testing.assert_array_equal(cache.lookup("c")["intensities"], np.full((2, 4), 2))
+
+
+def test_evict_sweeps_abandoned_pending_entries(tmp_path):
+    cache = DecodedCache(tmp_path, pending_grace=60.0)
+    stale, _matrix = cache.create("stale", (2, 4))
+    fresh, _matrix = cache.create("fresh", (2, 4))
+    old = os.stat(stale).st_mtime - 3600
+    for path in (stale, *stale.iterdir()):
+        os.utime(path, (old, old))
+    cache.evict()
+    assert _entries(tmp_path) == [fresh.name]
@@ -0,0 +1,84 @@
+"""Tests for the save writers and loader (:mod:`advion_io.export`)."""
+from __future__ import annotations
+
+import gzip
+import pickle
+
+import numpy as np
+import pytest
+
+from advion_io import DataReader, DataWriter, DatxFile
+from advion_io.export import load, save
+
+MASSES = np.round(np.arange(100.0, 110.0, 0.05), 4).astype(np.float32)
+
+
+@pytest.fixture
+def run(tmp_path):
+    rng = np.random.default_rng(7)
+    spectra = np.zeros((37, MASSES.size), dtype=np.int64)
+    for i in range(spectra.shape[0]):
+        cols = rng.choice(MASSES.size, size=15, replace=False)
+        spectra[i, cols] = rng.integers(100, 100_000, size=15)
+    with DataWriter(tmp_path, "R", is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst", "CMS")
+        w.write_spectrum_masses(MASSES)
+        for i, spec in enumerate(spectra):
+            w.write_scan_data(spec, retention_time=0.01 * i, tic=float(spec.sum()))
+        return w.create_datx_file()
+
+
+def _assert_same(payload, dx):
+    assert set(payload) == {"masses", "times", "intensities"}
+    np.testing.assert_array_equal(payload["masses"], dx.masses)
+    np.testing.assert_array_equal(payload["times"], dx.retention_times)
+    np.testing.assert_array_equal(payload["intensities"], dx.intensities)
+    assert payload["intensities"].dtype == np.float32
+
+
+@pytest.mark.parametrize(
+    "name, kwargs",
+    [
+        ("out.pkgz", {}),
+        ("out.npz", {}),
+        ("out.dir", {"format": "npy"}),
+        ("out.zip", {"format": "chunked", "chunk_scans": 5, "workers": 1}),
+        ("out.zip", {"format": "chunked", "chunk_scans": 8, "workers": 2}),
+        ("out.zip", {"format": "chunked", "codec": "lzma", "level": 1}),
+        ("out.zip", {"format": "chunked", "codec": "bz2", "chunk_scans": 100}),
+    ],
+)
+def test_save_formats_round_trip(run, tmp_path, name, kwargs):
+    out = tmp_path / name
+    with DatxFile(run) as dx:
+        assert save(dx, out, **kwargs) == out
+        if name != "out.pkgz":
+            # Streamed formats must not fill the decoded store.
+            assert dx.cache_stats.resident_bytes == 0
+            assert not dx._decoded.any()
+        _assert_same(load(out), dx)
+
+
+def test_npz_and_npy_are_numpy_native(run, tmp_path):
+    with DatxFile(run) as dx:
+        save(dx, tmp_path / "a.npz")
+        with np.load(tmp_path / "a.npz") as npz:
+            _assert_same(dict(npz), dx)
+        save(dx, tmp_path / "b", format="npy")
+        loaded = load(tmp_path / "b")
+        assert isinstance(loaded["intensities"], np.memmap)
+        assert not loaded["intensities"].flags.writeable
+
+
+def test_reader_save_keeps_pickle_default_and_rejects_bad_options(run, tmp_path):
+    with DataReader(run) as dr:
+        dr.save(tmp_path / "a.pkgz", level=1)
+        with gzip.open(tmp_path / "a.pkgz", "rb") as gz:
+            payload = pickle.load(gz)
+        _assert_same(payload, dr._dx)
+        assert all(payload[name].flags.writeable for name in payload)
+        assert all(a.flags.writeable for a in load(tmp_path / "a.pkgz").values())
+        with pytest.raises(ValueError):
+            dr.save(tmp_path / "b", format="hdf5")
+        with pytest.raises(ValueError):
+            dr.save(tmp_path / "c", format="chunked", codec="zstd")
@@ -0,0 +1,121 @@
+"""Tests for the inverted m/z index (:mod:`advion_io.ion_index`)."""
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+from advion_io import DataWriter, DatxFile
+from advion_io.ion_index import IonIndex, _quantise, _upper_bound
+
+MASSES = np.round(np.arange(100.0, 110.0, 0.05), 4).astype(np.float32)
+
+
+def _write_run(folder, name, seed, n_scans=40):
+    rng = np.random.default_rng(seed)
+    spectra = rng.integers(0, 50, size=(n_scans, MASSES.size)).astype(np.int64)
+    spectra[rng.random(spectra.shape) < 0.7] = 0
+    # Sparse strong ions at a few fixed m/z values.
+    for col in (20, 41, 160):
+        hit = rng.random(n_scans) < 0.3
+        spectra[hit, col] = rng.integers(1_000, 200_000, size=hit.sum())
+    with DataWriter(folder, name, is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst", "CMS")
+        w.write_spectrum_masses(MASSES)
+        for i, spec in enumerate(spectra):
+            w.write_scan_data(spec, retention_time=0.01 * i, tic=float(spec.sum()))
+        return w.create_datx_file()
+
+
+def _brute_force(paths, mzs, threshold, tol):
+    expected = set()
+    for path in paths:
+        with DatxFile(path) as dx:
+            windows = [
+                np.flatnonzero((dx.masses >= m - tol) & (dx.masses <= m + tol)) for m in mzs
+            ]
+            levels = np.min(
+                [dx.intensities[:, w].max(axis=1) for w in windows], axis=0
+            )
+            expected |= {(str(path.resolve()), int(s)) for s in np.flatnonzero(levels > threshold)}
+    return expected
+
+
+@pytest.fixture
+def runs(tmp_path):
+    root = tmp_path / "runs"
+    (root / "a").mkdir(parents=True)
+    paths = [
+        _write_run(root / "a", "R1", 1),
+        _write_run(root / "a", "R2", 2),
+        _write_run(root, "R3", 3),
+    ]
+    return root, paths
+
+
+def test_quantised_levels_bound_the_true_value():
+    values = np.concatenate([[0, 0.5, 1, 2, 3], np.geomspace(1, 2**40, 2000)])
+    bound = _upper_bound(_quantise(values))
+    assert np.all(bound >= values)
+    finite = values < 2**31
+    assert np.all(bound[finite] <= np.maximum(values[finite], 1) * 2 ** (1 / 8) * 1.000001)
+
+
+@pytest.mark.parametrize(
+    "mzs, threshold",
+    [(101.0, 10_000), (102.05, 1_000), ([101.0, 102.05], 5_000), (108.0, 100), (105.0, 10)],
+)
+def test_query_matches_brute_force(runs, tmp_path, mzs, threshold):
+    root, paths = runs
+    index = IonIndex(tmp_path / "idx", bin_width=0.1)
+    index.update(root, workers=1)
+    hits = index.query(mzs, threshold, tol=0.02)
+    expected = _brute_force(paths, np.atleast_1d(mzs), threshold, 0.02)
+    assert {(h.path, h.scan) for h in hits} == expected
+
+    # Unconfirmed candidates are a superset and never miss a hit.
+    candidates = index.candidates(mzs, threshold, tol=0.02)
+    found = {(p, int(s)) for p, scans in candidates.items() for s in scans}
+    assert {(h.path, h.scan) for h in hits} <= found
+
+
+def test_hit_fields(runs, tmp_path):
+    root, paths = runs
+    index = IonIndex(tmp_path / "idx")
+    index.update(root, workers=2)
+    hit = index.query(101.0, 1_000, tol=0.01)[0]
+    with DatxFile(hit.path) as dx:
+        assert hit.time == pytest.approx(float(dx.retention_times[hit.scan]))
+        assert hit.intensity == dx.get_spectrum(hit.scan)[20]
+
+
+def test_update_is_incremental(runs, tmp_path):
+    root, paths = runs
+    index = IonIndex(tmp_path / "idx")
+    first = index.update(root, workers=1)
+    assert (first.added, first.unchanged, first.removed, first.failed) == (3, 0, 0, 0)
+    assert index.paths == sorted(str(p.resolve()) for p in paths)
+
+    again = index.update(root, workers=1)
+    assert (again.added, again.unchanged) == (0, 3)
+
+    _write_run(root / "a", "R1", 99)
+    paths[2].unlink()
+    changed = IonIndex(tmp_path / "idx").update(root, workers=1)
+    assert (changed.added, changed.unchanged, changed.removed) == (1, 1, 1)
+    assert len(index.paths) == 2
+    assert {(h.path, h.scan) for h in index.query(101.0, 5_000, tol=0.02)} == _brute_force(
+        paths[:2], [101.0], 5_000, 0.02
+    )
+    assert not [p for p in os.listdir(tmp_path / "idx") if p.endswith(".pending")]
+
+
+def test_index_parameters_are_fixed(tmp_path):
+    IonIndex(tmp_path / "idx", bin_width=0.5, min_intensity=100)
+    reopened = IonIndex(tmp_path / "idx")
+    assert (reopened.bin_width, reopened.min_intensity) == (0.5, 100)
+    with pytest.raises(ValueError):
+        IonIndex(tmp_path / "idx", bin_width=0.1)
+    with pytest.raises(ValueError):
+        reopened.query(101.0, 50)
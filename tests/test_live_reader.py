@@ -0,0 +1,116 @@
+"""Tests for :class:`advion_io.LiveReader` following a running ``DataWriter``."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from advion_io import DatxFile, DataWriter, LiveReader
+
+
+def _scan(rng, n_masses):
+    spec = rng.integers(0, 500, size=n_masses).astype(np.int64)
+    spec[n_masses // 2] += 10_000
+    return spec
+
+
+@pytest.fixture
+def running(tmp_path):
+    masses = np.arange(100.0, 102.0, 0.05, dtype=np.float32)
+    w = DataWriter(tmp_path, "Live", is_centroid=False)
+    w.set_metadata("v", "f", "inst-7", "CMS")
+    w.write_spectrum_masses(masses)
+    yield w, masses, tmp_path / "Live"
+    w.close()
+
+
+def test_empty_folder_has_no_scans(running):
+    _w, _masses, folder = running
+    with LiveReader(folder) as live:
+        assert live.num_spectra == 0
+        assert live.poll() == 0
+        assert live.retention_times.shape == (0,)
+
+
+def test_follow_picks_up_new_scans(running):
+    w, masses, folder = running
+    rng = np.random.default_rng(1)
+    scans = [_scan(rng, masses.size) for _ in range(7)]
+
+    for i in range(3):
+        w.write_scan_data(scans[i], retention_time=0.1 * i, tic=float(scans[i].sum()))
+
+    with DatxFile.follow(folder) as live:
+        assert live.num_spectra == 3
+        assert live.num_masses == masses.size
+        assert live.hardware_id == "inst-7"
+        np.testing.assert_array_equal(live.masses, masses)
+        assert live.poll() == 0
+        # The axes are shared read-only views, not per-access copies.
+        times, tic = live.retention_times, live.tic
+        for axis in (times, tic, live.masses):
+            assert not axis.flags.writeable
+        assert np.shares_memory(times, live.retention_times)
+
+        for i in range(3, 7):
+            w.write_scan_data(scans[i], retention_time=0.1 * i, tic=float(scans[i].sum()))
+        assert live.poll() == 4
+        assert live.num_spectra == 7
+        np.testing.assert_array_equal(times, live.retention_times[:3])
+        np.testing.assert_array_equal(tic, live.tic[:3])
+        # Spectra are decoded per call rather than kept for the whole run.
+        assert live.get_spectrum(4) is not live.get_spectrum(4)
+        np.testing.assert_allclose(
+            live.retention_times, 0.1 * np.arange(7, dtype=np.float32), rtol=1e-6
+        )
+        for i, expected in enumerate(scans):
+            np.testing.assert_array_equal(live.get_spectrum(i).astype(np.int64), expected)
+        np.testing.assert_allclose(live.tic, [float(s.sum()) for s in scans])
+
+        path = w.create_datx_file()
+        assert live.is_finished
+        with DatxFile(path) as dx:
+            np.testing.assert_array_equal(live.retention_times, dx.retention_times)
+            np.testing.assert_array_equal(live.generate_xic([5, 20]), dx.generate_xic([5, 20]))
+
+
+def test_partial_record_waits_for_next_poll(running):
+    w, masses, folder = running
+    rng = np.random.default_rng(2)
+    w.write_scan_data(_scan(rng, masses.size), 0.0, 1.0)
+    with LiveReader(folder) as live:
+        scans_path = folder / "Live.scans"
+        with scans_path.open("ab") as fh:
+            fh.write(b"<scan><time>0.1</time><index>")
+        assert live.poll() == 0
+        assert live.num_spectra == 1
+
+
+def test_iter_scans_stops_when_archive_is_written(running):
+    w, masses, folder = running
+    rng = np.random.default_rng(3)
+    for i in range(4):
+        w.write_scan_data(_scan(rng, masses.size), 0.1 * i, 1.0)
+    w.create_datx_file()
+    with LiveReader(folder, poll_interval=0.001) as live:
+        seen = [index for index, _spectrum in live.iter_scans(timeout=1.0)]
+    assert seen == [0, 1, 2, 3]
+
+
+def test_iter_scans_times_out_without_new_data(running):
+    w, masses, folder = running
+    w.write_scan_data(np.zeros(masses.size, dtype=np.int64), 0.0, 0.0)
+    with LiveReader(folder, poll_interval=0.001) as live:
+        seen = [index for index, _spectrum in live.iter_scans(timeout=0.02)]
+    assert seen == [0]
+
+
+def test_promotion_to_float_restarts_reader(running):
+    w, masses, folder = running
+    rng = np.random.default_rng(4)
+    w.write_scan_data(_scan(rng, masses.size), 0.0, 1.0)
+    with LiveReader(folder) as live:
+        assert live.num_spectra == 1
+        w.write_scan_data(np.full(masses.size, 2**33, dtype=np.int64), 0.1, 1.0)
+        live.poll()
+        assert live.num_spectra == 2
+        assert live.store_as_float
@@ -0,0 +1,59 @@
+"""Tests for the parse-once metadata model (:mod:`advion_io.metadata`)."""
+from __future__ import annotations
+
+from advion_io import DataReader, DatxFile
+from advion_io.metadata import MetaInfo, Segment, _parse_meta, xml_leaves
+from example_data import EXAMPLE_DATX, requires_example
+
+
+def test_xml_leaves_flattens_paths_and_xsi_type():
+    xml = (
+        '<method xmlns="urn:a" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        '<source xsi:type="ESI"><voltage> 3.5 </voltage><gas/></source>'
+        "<name>m1</name></method>"
+    )
+    assert xml_leaves(xml) == {
+        "source/@type": "ESI",
+        "source/voltage": "3.5",
+        "name": "m1",
+    }
+    assert xml_leaves("") == {}
+    assert xml_leaves("<broken") == {}
+
+
+def test_parse_meta_single_walk():
+    info = _parse_meta(
+        "<acquisitionMetadata>"
+        "<segment><startTime>0.0</startTime><ionSourceFile>a.ion</ionSourceFile>"
+        "<tuneParamsFile>a.tune</tuneParamsFile></segment>"
+        "<segment><startTime>bad</startTime></segment>"
+        "<hardwareType> CMS-L </hardwareType><scanModeIndex>x</scanModeIndex>"
+        "</acquisitionMetadata>"
+    )
+    assert info.hardware_type == "CMS-L"
+    assert info.scan_mode_index == 0
+    assert info.segments == (Segment(0.0, "a.ion", "a.tune"), Segment(0.0))
+    assert _parse_meta("") == MetaInfo()
+    assert _parse_meta("<oops") == MetaInfo()
+
+
+@requires_example
+def test_datx_metadata_is_parsed_once_and_matches_getters():
+    with DatxFile(EXAMPLE_DATX, spectra=False) as dx:
+        md = dx.metadata
+        assert dx.metadata is md
+        assert md.meta is md.meta
+        assert md.meta.hardware_type == "CMS-L"
+        assert md.segments[0].ion_source_file.endswith(".ion")
+        assert md.method is md.method
+        assert md.method == xml_leaves(dx.method_xml)
+        assert md.member_text("no-such-member") == ""
+
+    with DataReader(EXAMPLE_DATX) as dr:
+        md = dr._dx.metadata
+        assert dr.get_hardware_type() == md.meta.hardware_type
+        assert dr.get_scan_mode_index() == md.meta.scan_mode_index
+        assert dr.get_num_segments() == len(md.segments)
+        assert md.tune(0) == xml_leaves(dr.get_tune_parameters_xml(0))
+        assert md.ion_source(0) == xml_leaves(dr.get_ion_source_optimization_xml(0))
+        assert md.tune(99) == {}
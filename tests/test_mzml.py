@@ -0,0 +1,91 @@
+"""Tests for the streaming mzML export (:mod:`advion_io.mzml`)."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import re
+import zlib
+from xml.etree import ElementTree as ET
+
+import numpy as np
+import pytest
+
+from advion_io import DataReader, DataWriter
+from advion_io.mzml import centroid_spectrum
+
+NS = {"m": "http://psi.hupo.org/ms/mzml"}
+MASSES = np.round(np.arange(100.0, 110.0, 0.05), 4).astype(np.float32)
+
+
+@pytest.fixture
+def run(tmp_path):
+    rng = np.random.default_rng(3)
+    spectra = np.zeros((23, MASSES.size), dtype=np.int64)
+    for i in range(spectra.shape[0]):
+        for c in rng.choice(MASSES.size - 3, size=6, replace=False):
+            spectra[i, c : c + 3] = rng.integers(100, 10_000, size=3)
+    with DataWriter(tmp_path, "R", is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst", "CMS-L")
+        w.write_spectrum_masses(MASSES)
+        for i, spec in enumerate(spectra):
+            w.write_scan_data(spec, retention_time=0.01 * i, tic=float(spec.sum()))
+        return w.create_datx_file()
+
+
+def _arrays(spectrum):
+    out = []
+    for array in spectrum.iterfind("m:binaryDataArrayList/m:binaryDataArray", NS):
+        text = array.find("m:binary", NS).text or ""
+        assert int(array.get("encodedLength")) == len(text)
+        out.append(np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype="<f4"))
+    return out
+
+
+def test_centroid_spectrum_one_peak_per_run():
+    masses = np.arange(8, dtype=np.float32)
+    mz, intensity = centroid_spectrum(masses, np.array([0, 1, 3, 0, 0, 5, 0, 2], np.float32))
+    np.testing.assert_allclose(mz, [1.75, 5.0, 7.0])
+    np.testing.assert_array_equal(intensity, [3, 5, 2])
+    assert centroid_spectrum(masses, np.zeros(8, np.float32))[0].size == 0
+
+
+@pytest.mark.parametrize("zero_trim, centroid", [(False, False), (True, False), (False, True)])
+def test_export_mzml_round_trip_and_index(run, tmp_path, zero_trim, centroid):
+    out = tmp_path / "run.mzML"
+    with DataReader(run) as dr:
+        # A tiny chunk size exercises the chunked base64 encoding.
+        dr.export_mzml(out, zero_trim=zero_trim, centroid=centroid, chunk_bytes=7)
+        # Streamed: the export leaves the decoded store empty.
+        assert dr._dx.cache_stats.resident_bytes == 0
+        assert not dr._dx._decoded.any()
+        raw = out.read_bytes()
+        spectra = ET.fromstring(raw).findall(".//m:spectrum", NS)
+        assert len(spectra) == dr.get_num_spectra()
+        for i, spectrum in enumerate(spectra):
+            mz, intensity = _arrays(spectrum)
+            expected = dr.get_spectrum(i)
+            if centroid:
+                want_mz, want = centroid_spectrum(dr.get_masses(), expected)
+                np.testing.assert_array_equal(mz, want_mz)
+                np.testing.assert_array_equal(intensity, want)
+                continue
+            if zero_trim:
+                assert mz.size < MASSES.size
+            dense = np.zeros_like(expected)
+            dense[np.searchsorted(MASSES, mz)] = intensity
+            np.testing.assert_array_equal(dense, expected)
+            assert int(spectrum.get("defaultArrayLength")) == mz.size
+
+        # Retention times are seconds.
+        scan_time = spectra[5].find(".//m:scan/m:cvParam", NS)
+        assert scan_time.get("accession") == "MS:1000016"
+        assert scan_time.get("unitAccession") == "UO:0000010"
+        assert float(scan_time.get("value")) == pytest.approx(dr.get_retention_times()[5])
+
+    offsets = [int(v) for v in re.findall(rb'<offset idRef="scan=\d+">(\d+)<', raw)]
+    assert len(offsets) == len(spectra)
+    assert all(raw[o:].startswith(b'<spectrum index="%d"' % i) for i, o in enumerate(offsets))
+    index_offset = int(re.search(rb"<indexListOffset>(\d+)<", raw).group(1))
+    assert raw[index_offset:].startswith(b"<indexList ")
+    head, checksum = re.search(rb"^(.*<fileChecksum>)([0-9a-f]{40})<", raw, re.S).groups()
+    assert hashlib.sha1(head).hexdigest().encode() == checksum
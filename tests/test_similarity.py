@@ -0,0 +1,148 @@
+"""Tests for spectral similarity search (:mod:`advion_io.similarity`)."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from advion_io import DataWriter, DatxFile
+from advion_io.similarity import SimilarityIndex, SpectrumMatrix, most_similar
+
+MASSES = np.round(np.arange(100.0, 120.0, 0.05), 4).astype(np.float32)
+
+
+def _write_run(folder, name, seed, n_scans=60, masses=MASSES):
+    rng = np.random.default_rng(seed)
+    spectra = np.zeros((n_scans, masses.size), dtype=np.int64)
+    for i in range(n_scans):
+        cols = rng.choice(masses.size, size=12, replace=False)
+        spectra[i, cols] = rng.integers(100, 100_000, size=12)
+    with DataWriter(folder, name, is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst", "CMS")
+        w.write_spectrum_masses(masses)
+        for i, spec in enumerate(spectra):
+            w.write_scan_data(spec, retention_time=0.01 * i, tic=float(spec.sum()))
+        return w.create_datx_file()
+
+
+def _binned_unit(intensities, masses, lo, width, size):
+    out = np.zeros((intensities.shape[0], size))
+    cols = np.floor((masses.astype(np.float64) - lo) / width).astype(int)
+    for c in range(size):
+        out[:, c] = intensities[:, cols == c].sum(axis=1)
+    norms = np.linalg.norm(out, axis=1)
+    norms[norms == 0] = 1
+    return out / norms[:, None]
+
+
+@pytest.fixture
+def runs(tmp_path):
+    root = tmp_path / "runs"
+    root.mkdir()
+    return root, [_write_run(root, f"R{i}", i) for i in range(3)]
+
+
+def test_matrix_auto_density_agrees_with_forced_layouts(tmp_path):
+    rng = np.random.default_rng(11)
+    dense_masses = MASSES[:40]
+    with DataWriter(tmp_path, "D", is_centroid=False) as w:
+        w.set_metadata("v", "f", "inst", "CMS")
+        w.write_spectrum_masses(dense_masses)
+        for i in range(9):
+            spec = rng.integers(1, 1000, size=dense_masses.size)
+            w.write_scan_data(spec, retention_time=0.01 * i, tic=float(spec.sum()))
+        path = w.create_datx_file()
+    with DatxFile(path) as dx:
+        auto = SpectrumMatrix.from_datx(dx)
+        forced_dense = SpectrumMatrix.from_datx(dx, sparse=False)
+        forced_sparse = SpectrumMatrix.from_datx(dx, sparse=True)
+    assert not auto.is_sparse and forced_sparse.is_sparse
+    np.testing.assert_array_equal(auto.dense, forced_dense.dense)
+    rebuilt = np.zeros(forced_sparse.shape, dtype=np.float32)
+    rows = np.repeat(np.arange(forced_sparse.shape[0]), np.diff(forced_sparse.indptr))
+    rebuilt[rows, forced_sparse.indices] = forced_sparse.data
+    np.testing.assert_array_equal(rebuilt, forced_dense.dense)
+
+
+@pytest.mark.parametrize("sparse", [None, True, False])
+def test_matrix_top_k_matches_brute_force(runs, sparse):
+    _root, paths = runs
+    with DatxFile(paths[0]) as dx:
+        matrix = SpectrumMatrix.from_datx(dx, sparse=sparse)
+        intensities = dx.intensities.astype(np.float64)
+    assert matrix.is_sparse == (sparse is not False)
+    unit = intensities / np.linalg.norm(intensities, axis=1)[:, None]
+    queries = unit[[3, 17]].astype(np.float32)
+    scores, rows = matrix.top_k(queries, 5, block_rows=7)
+    expected = unit @ unit[[3, 17]].T
+    for q in range(2):
+        order = np.argsort(-expected[:, q], kind="stable")[:5]
+        np.testing.assert_array_equal(rows[q], order)
+        np.testing.assert_allclose(scores[q], expected[order, q], rtol=1e-5)
+    assert rows[0, 0] == 3 and scores[0, 0] == pytest.approx(1.0)
+
+
+def test_most_similar_within_a_run(runs):
+    _root, paths = runs
+    with DatxFile(paths[1]) as dx:
+        reference = dx.get_spectrum(42).copy()
+    hits = most_similar(paths[1], reference, k=3)
+    assert [h.scan for h in hits][0] == 42
+    assert hits[0].score == pytest.approx(1.0)
+    assert hits[0].time == pytest.approx(0.42)
+    assert hits[0].score >= hits[1].score >= hits[2].score
+
+
+def test_index_search_across_runs(runs, tmp_path):
+    root, paths = runs
+    index = SimilarityIndex(tmp_path / "idx", bin_width=0.5, mz_range=(100, 120))
+    result = index.update(root, workers=2)
+    assert (result.added, result.failed) == (3, 0)
+
+    with DatxFile(paths[2]) as dx:
+        reference = dx.get_spectrum(10).copy()
+    hits = index.search(reference, masses=MASSES, k=4)
+    assert (hits[0].path, hits[0].scan) == (str(paths[2].resolve()), 10)
+    assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+
+    # Brute force over every run in the same binned space.
+    query = _binned_unit(reference[None, :].astype(np.float64), MASSES, 100, 0.5, 40)[0]
+    expected = []
+    for path in paths:
+        with DatxFile(path) as dx:
+            unit = _binned_unit(dx.intensities.astype(np.float64), MASSES, 100, 0.5, 40)
+        expected += [(float(s), str(path.resolve()), i) for i, s in enumerate(unit @ query)]
+    expected.sort(key=lambda e: -e[0])
+    np.testing.assert_allclose([h.score for h in hits], [e[0] for e in expected[:4]], rtol=1e-5)
+
+    # Several references at once, restricted to one run.
+    both = index.search(np.stack([reference, reference]), masses=MASSES, k=2, paths=[paths[0]])
+    assert len(both) == 2 and all(h.path == str(paths[0].resolve()) for h in both[0])
+
+
+def test_index_is_incremental_and_persistent(runs, tmp_path):
+    root, paths = runs
+    index = SimilarityIndex(tmp_path / "idx")
+    index.update(root, workers=1)
+    reopened = SimilarityIndex(tmp_path / "idx")
+    again = reopened.update(root, workers=1)
+    assert (again.added, again.unchanged) == (0, 3)
+    with DatxFile(paths[0]) as dx:
+        reference = dx.get_spectrum(5).copy()
+    hit = reopened.search(reference, k=1)[0]
+    assert (hit.path, hit.scan) == (str(paths[0].resolve()), 5)
+
+    paths[1].unlink()
+    assert reopened.update(root, workers=1).removed == 1
+    assert len(reopened.paths) == 2
+
+
+def test_native_index_rejects_other_mass_axes(runs, tmp_path):
+    root, _paths = runs
+    other = _write_run(tmp_path, "Other", 9, masses=MASSES + np.float32(0.01))
+    index = SimilarityIndex(tmp_path / "idx")
+    index.update(root, workers=1)
+    assert index.update([other], workers=1).failed == 1
+    with pytest.raises(ValueError):
+        index.search(np.ones(5))
+    with pytest.raises(ValueError):
+        SimilarityIndex(tmp_path / "idx", bin_width=1.0)